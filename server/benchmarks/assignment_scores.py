@@ -0,0 +1,135 @@
+"""
+Compare the instructor score dashboard before and after moving the aggregation into SQL.
+
+    python -m benchmarks.assignment_scores --assignments 60 --students 500
+"""
+import argparse
+import random
+from sqlalchemy import insert
+from models import db, User, Course, Week, Assignment, Score
+from routes.assignment_scores import get_assignment_score_summaries
+from benchmarks.common import create_benchmark_app, time_call, report
+
+def legacy_assignment_score_summaries(instructor_id):
+    """
+    The original per-assignment implementation of AllAssignmentScoresResource.
+    It had no ORDER BY and returned assignments in table (id) order until the
+    assignment.week_id index made SQLite return them grouped by week, so the
+    id order it was written against is spelled out here.
+    """
+    courses = Course.query.filter_by(creator_user_id=instructor_id).all()
+    course_ids = [course.id for course in courses]
+    weeks = Week.query.filter(Week.course_id.in_(course_ids)).all()
+    week_ids = [week.id for week in weeks]
+    assignments = Assignment.query.filter(Assignment.week_id.in_(week_ids)).order_by(Assignment.id).all()
+
+    assignments_data = []
+    for assignment in assignments:
+        scores = Score.query.filter_by(assignment_id=assignment.id).all()
+        if scores:
+            total_percentage = sum((score.score / score.max_score) * 100 if score.max_score > 0 else 0 for score in scores)
+            average_percentage = total_percentage / len(scores)
+            submission_count = len(scores)
+        else:
+            average_percentage = 0
+            submission_count = 0
+
+        week = Week.query.get(assignment.week_id)
+        course = Course.query.get(week.course_id) if week else None
+        assignments_data.append({
+            'id': assignment.id,
+            'name': assignment.name,
+            'week_id': assignment.week_id,
+            'week_name': week.name if week else 'Unknown',
+            'course_id': course.id if course else None,
+            'course_name': course.name if course else 'Unknown',
+            'average_percentage': average_percentage,
+            'submission_count': submission_count
+        })
+    return assignments_data
+
+def seed(courses, weeks_per_course, assignments, students, submission_rate):
+    rng = random.Random(42)
+    instructor = User(email="bench-instructor@mail.com", fname="Bench", lname="Instructor", is_instructor=True)
+    db.session.add(instructor)
+    db.session.flush()
+
+    db.session.execute(insert(User), [
+        {"email": f"bench-student-{i}@mail.com", "fname": "Bench", "lname": f"Student {i}", "is_instructor": False}
+        for i in range(students)
+    ])
+    student_ids = [row.id for row in db.session.query(User.id).filter_by(is_instructor=False)]
+
+    week_ids = []
+    for c in range(courses):
+        course = Course(name=f"Bench Course {c}", description="Benchmark", creator_user_id=instructor.id)
+        db.session.add(course)
+        db.session.flush()
+        for w in range(weeks_per_course):
+            week = Week(name=f"Week {w}", course_id=course.id, user_id=instructor.id)
+            db.session.add(week)
+            db.session.flush()
+            week_ids.append(week.id)
+
+    db.session.execute(insert(Assignment), [
+        {"name": f"Assignment {a}", "description": "Benchmark", "week_id": week_ids[a % len(week_ids)]}
+        for a in range(assignments)
+    ])
+    assignment_ids = [row.id for row in db.session.query(Assignment.id)]
+
+    score_rows = []
+    for assignment_id in assignment_ids:
+        for student_id in student_ids:
+            if rng.random() < submission_rate:
+                max_score = rng.choice([0, 5, 10, 20])
+                score_rows.append({
+                    "student_id": student_id,
+                    "assignment_id": assignment_id,
+                    "score": rng.randint(0, max_score),
+                    "max_score": max_score
+                })
+    if score_rows:
+        db.session.execute(insert(Score), score_rows)
+    db.session.commit()
+    return instructor.id, len(score_rows)
+
+def same_results(legacy, current):
+    """Whether both implementations return the same rows in the same order, up to float rounding"""
+    def rounded(rows):
+        return [dict(row, average_percentage=round(row['average_percentage'], 9)) for row in rows]
+    return rounded(legacy) == rounded(current)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--courses", type=int, default=4)
+    parser.add_argument("--weeks", type=int, default=12)
+    parser.add_argument("--assignments", type=int, default=60)
+    parser.add_argument("--students", type=int, default=500)
+    parser.add_argument("--submission-rate", type=float, default=0.8)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    app = create_benchmark_app()
+    with app.app_context():
+        instructor_id, submissions = seed(args.courses, args.weeks, args.assignments, args.students, args.submission_rate)
+        print(f"Seeded {args.assignments} assignments and {submissions} submissions")
+
+        def run_legacy():
+            db.session.expunge_all()
+            return legacy_assignment_score_summaries(instructor_id)
+
+        def run_current():
+            db.session.expunge_all()
+            return get_assignment_score_summaries(instructor_id)
+
+        legacy, legacy_seconds = time_call(run_legacy, args.repeat)
+        current, current_seconds = time_call(run_current, args.repeat)
+
+        assert same_results(legacy, current), "The grouped query no longer matches the legacy implementation"
+        report("AllAssignmentScoresResource (median of %d runs)" % args.repeat, [
+            ("per-assignment ORM (legacy)", legacy_seconds),
+            ("grouped SQL aggregate", current_seconds),
+        ])
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+import statistics
+import time
+from factory import create_app
+
+def create_benchmark_app():
+    """App backed by a throwaway in-memory database, with no background workers."""
+    return create_app({
+        "TESTING": True,
+        "SQLALCHEMY_DATABASE_URI": "sqlite://",
+        "JOB_WORKER_THREADS": 0
+    })
+
+def time_call(func, repeat):
+    """Run ``func`` ``repeat`` times and return (last result, median seconds)."""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - started)
+    return result, statistics.median(timings)
+
+def report(title, rows):
+    print(f"\n{title}")
+    width = max(len(name) for name, _ in rows)
+    baseline = rows[0][1]
+    for name, seconds in rows:
+        print(f"  {name.ljust(width)}  {seconds * 1000:10.2f} ms  {baseline / seconds:6.1f}x")
@@ -0,0 +1,93 @@
+"""
+Compare regrading an assignment question by question against the vectorized
+answer key regrade, and reading the answer key per submission against the
+cached key.
+
+    python -m benchmarks.grading --questions 50 --submissions 5000
+"""
+import argparse
+import json
+import random
+from sqlalchemy import insert
+from models import db, User, Course, Week, Assignment, Question, Score
+from services.grading import answer_keys, get_answer_key, load_answer_key, regrade_assignment
+from benchmarks.common import create_benchmark_app, time_call, report
+
+def legacy_regrade(assignment_id):
+    """Reload every question and score and compare answers one by one, as the submission handler used to."""
+    questions = Question.query.filter_by(assignment_id=assignment_id).all()
+    for score in Score.query.filter_by(assignment_id=assignment_id).all():
+        answers = json.loads(score.answers)
+        score.score = sum(1 for question in questions if answers.get(str(question.id)) == question.correct_option)
+        score.max_score = len(questions)
+    db.session.flush()
+
+def seed(questions, submissions):
+    rng = random.Random(42)
+    instructor = User(email="bench-instructor@mail.com", fname="Bench", lname="Instructor", is_instructor=True)
+    db.session.add(instructor)
+    db.session.flush()
+    course = Course(name="Bench Course", description="Benchmark", creator_user_id=instructor.id)
+    db.session.add(course)
+    db.session.flush()
+    week = Week(name="Week 1", course_id=course.id, user_id=instructor.id)
+    db.session.add(week)
+    db.session.flush()
+    assignment = Assignment(name="Quiz", description="Benchmark", week_id=week.id)
+    db.session.add(assignment)
+    db.session.flush()
+
+    db.session.execute(insert(Question), [
+        {"description": f"Question {q}?", "option1": "A", "option2": "B", "option3": "C", "option4": "D",
+         "correct_option": rng.randint(1, 4), "assignment_id": assignment.id}
+        for q in range(questions)
+    ])
+    question_ids = [row.id for row in db.session.query(Question.id)]
+    db.session.execute(insert(User), [
+        {"email": f"student{s}@mail.com", "fname": "Bench", "lname": f"Student {s}", "is_instructor": False}
+        for s in range(submissions)
+    ])
+    student_ids = [row.id for row in db.session.query(User.id).filter(User.is_instructor == False)]
+    db.session.execute(insert(Score), [
+        {"student_id": student_id, "assignment_id": assignment.id, "score": 0, "max_score": questions,
+         "answers": json.dumps({question_id: rng.randint(1, 4) for question_id in question_ids})}
+        for student_id in student_ids
+    ])
+    db.session.commit()
+    return assignment.id
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--questions", type=int, default=50)
+    parser.add_argument("--submissions", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    app = create_benchmark_app()
+    with app.app_context():
+        assignment_id = seed(args.questions, args.submissions)
+        print(f"Seeded {args.submissions} submissions of {args.questions} questions")
+
+        def run(regrade):
+            regrade(assignment_id)
+            db.session.rollback()
+
+        _, legacy_seconds = time_call(lambda: run(legacy_regrade), args.repeat)
+        _, current_seconds = time_call(lambda: run(regrade_assignment), args.repeat)
+        report("Assignment regrade (median of %d runs)" % args.repeat, [
+            ("Question by question", legacy_seconds),
+            ("Vectorized answer key", current_seconds),
+        ])
+
+        # What every submission pays for its answer key
+        answer_keys.clear()
+        _, uncached_seconds = time_call(lambda: load_answer_key(assignment_id), args.repeat * 100)
+        _, cached_seconds = time_call(lambda: get_answer_key(assignment_id), args.repeat * 100)
+        report("Answer key per submission (median of %d runs)" % (args.repeat * 100), [
+            ("Read every question", uncached_seconds),
+            ("Cached, version checked", cached_seconds),
+        ])
+        print(f"Answer key cache: {answer_keys.get_stats()}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Time importing a question bank through the bulk import endpoint.
+
+    python -m benchmarks.question_import --questions 10000
+"""
+import argparse
+import json
+import time
+from models import db, Course, Week, Assignment
+from benchmarks.common import create_benchmark_app
+
+def seed(app):
+    with app.app_context():
+        instructor_id = app.test_client().post("/api/v1/auth/signup", data={
+            "email": "bench-instructor@mail.com", "password": "password123", "password_confirm": "password123",
+            "fname": "Bench", "lname": "Instructor", "is_instructor": "true"
+        }).json["user"]["id"]
+        course = Course(name="Bench Course", description="Benchmark", creator_user_id=instructor_id)
+        db.session.add(course)
+        db.session.flush()
+        week = Week(name="Week 1", course_id=course.id, user_id=instructor_id)
+        db.session.add(week)
+        db.session.flush()
+        assignment = Assignment(name="Question bank", description="Benchmark", week_id=week.id)
+        db.session.add(assignment)
+        db.session.commit()
+        return assignment.id
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--questions", type=int, default=10000)
+    args = parser.parse_args()
+
+    app = create_benchmark_app()
+    app.config["HINT_PREGENERATE"] = False
+    assignment_id = seed(app)
+    client = app.test_client()
+    client.post("/api/v1/auth/login", data={"email": "bench-instructor@mail.com", "password": "password123"})
+    body = json.dumps({"questions": [{
+        "question_description": f"Question {i}: which option is correct?",
+        "option1": "Alpha", "option2": "Beta", "option3": "Gamma", "option4": "Delta",
+        "correct_option": i % 4 + 1
+    } for i in range(args.questions)]})
+
+    started = time.perf_counter()
+    response = client.post(f"/api/v1/question/import/{assignment_id}", data=body, content_type="application/json")
+    elapsed = time.perf_counter() - started
+    print(f"{response.status_code}: {response.json['message']}")
+    print(f"Imported {args.questions} questions in {elapsed * 1000:.1f} ms")
+
+if __name__ == "__main__":
+    main()
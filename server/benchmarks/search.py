@@ -0,0 +1,78 @@
+"""
+Compare searching material text with LIKE against the FTS5 content search.
+
+    python -m benchmarks.search --materials 2000 --words 2000
+"""
+import argparse
+import random
+from types import SimpleNamespace
+from sqlalchemy import insert
+from models import db, User, Course, Week, Material, MaterialText
+from services.search import search_material_contents
+from benchmarks.common import create_benchmark_app, time_call, report
+
+VOCABULARY = [f"term{i}" for i in range(5000)]
+RARE_WORD = "backpropagation"
+
+def legacy_content_search(instructor_id, query, limit):
+    """A LIKE scan over the extracted text, the only option without an index."""
+    return db.session.query(Material.id).join(MaterialText, MaterialText.material_id == Material.id).join(
+        Week, Week.id == Material.week_id).join(Course, Course.id == Week.course_id).filter(
+        Course.creator_user_id == instructor_id,
+        MaterialText.text.ilike(f"%{query}%")
+    ).limit(limit).all()
+
+def seed(materials, words):
+    rng = random.Random(42)
+    instructor = User(email="bench-instructor@mail.com", fname="Bench", lname="Instructor", is_instructor=True)
+    db.session.add(instructor)
+    db.session.flush()
+    course = Course(name="Bench Course", description="Benchmark", creator_user_id=instructor.id)
+    db.session.add(course)
+    db.session.flush()
+    week = Week(name="Week 1", course_id=course.id, user_id=instructor.id)
+    db.session.add(week)
+    db.session.flush()
+
+    db.session.execute(insert(Material), [
+        {"name": f"Material {m}", "week_id": week.id, "duration": 30, "filename": f"{m}.pdf"}
+        for m in range(materials)
+    ])
+    material_ids = [row.id for row in db.session.query(Material.id)]
+    texts = []
+    for material_id in material_ids:
+        text = rng.choices(VOCABULARY, k=words)
+        # One material in a hundred mentions the searched word
+        if rng.random() < 0.01:
+            text[rng.randrange(words)] = RARE_WORD
+        texts.append({"material_id": material_id, "content_hash": str(material_id), "source_path": "",
+                      "source_mtime": 0, "source_size": 0, "text": " ".join(text)})
+    db.session.execute(insert(MaterialText), texts)
+    db.session.commit()
+    return instructor.id
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--materials", type=int, default=2000)
+    parser.add_argument("--words", type=int, default=2000)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    app = create_benchmark_app()
+    with app.app_context():
+        instructor_id = seed(args.materials, args.words)
+        print(f"Seeded {args.materials} materials of {args.words} words")
+        user = SimpleNamespace(id=instructor_id, is_instructor=True)
+
+        _, legacy_seconds = time_call(lambda: legacy_content_search(instructor_id, RARE_WORD, args.limit), args.repeat)
+        hits, current_seconds = time_call(lambda: search_material_contents(user, RARE_WORD, args.limit), args.repeat)
+
+        print(f"Hits on the first page: {len(hits[0])}")
+        report("Material content search (median of %d runs)" % args.repeat, [
+            ("LIKE scan (no index)", legacy_seconds),
+            ("FTS5 with snippets", current_seconds),
+        ])
+
+if __name__ == "__main__":
+    main()
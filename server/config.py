@@ -6,3 +6,53 @@ TESTING = False
 REMEMBER_COOKIE_SAMESITE = "None"
 REMEMBER_COOKIE_SECURE = True
 WTF_CSRF_ENABLED = False
+
+# Whisper model used for video transcripts, unloaded after WHISPER_IDLE_TIMEOUT idle seconds
+WHISPER_MODEL_SIZE = 'base'
+WHISPER_IDLE_TIMEOUT = 600
+
+# Background jobs (video transcription, ...) run on in-process worker threads;
+# set JOB_WORKER_THREADS = 0 and run `python worker.py` to use separate processes.
+# A running job's worker renews its lease every JOB_HEARTBEAT_INTERVAL seconds; a job
+# whose lease is older than JOB_LEASE_TIMEOUT seconds is requeued (its worker died)
+JOB_WORKER_THREADS = 1
+JOB_POLL_INTERVAL = 2.0
+JOB_HEARTBEAT_INTERVAL = 30
+JOB_LEASE_TIMEOUT = 120
+
+# Material Q&A sends only the RAG_TOP_K best matching chunks of RAG_CHUNK_SIZE
+# words (consecutive chunks share RAG_CHUNK_OVERLAP words) to the model
+RAG_CHUNK_SIZE = 200
+RAG_CHUNK_OVERLAP = 50
+RAG_TOP_K = 4
+
+# Answers to material questions are cached in-process for ANSWER_CACHE_TTL seconds;
+# a new question asking the same way reuses a cached answer if its word overlap
+# (weighted Jaccard) is at least ANSWER_CACHE_SIMILARITY (1 = exact matches only)
+ANSWER_CACHE_TTL = 86400
+ANSWER_CACHE_SIMILARITY = 0.85
+
+# 'gemini' for the real API, 'fake' for a deterministic offline model (tests, demos, benchmarks)
+LLM_CLIENT = 'gemini'
+
+# Every model call must finish within LLM_TIMEOUT seconds (retries included); at most
+# LLM_MAX_CONCURRENCY run at once. Transient errors are retried LLM_MAX_RETRIES times and
+# LLM_BREAKER_THRESHOLD failed calls in a row stop all calls for LLM_BREAKER_COOLDOWN seconds
+LLM_TIMEOUT = 30
+LLM_MAX_CONCURRENCY = 8
+LLM_MAX_RETRIES = 2
+LLM_BREAKER_THRESHOLD = 5
+LLM_BREAKER_COOLDOWN = 30
+
+# Generate question hints in the background when a question is created or edited
+HINT_PREGENERATE = True
+
+# Course-wide pre-generation of summaries and hints (see pregenerate.py):
+# parallel model calls and the rate they are started at, in calls per second
+PREGENERATE_WORKERS = 4
+PREGENERATE_RATE = 2.0
+
+# Collection endpoints return PAGE_SIZE rows per page unless ?limit= asks for
+# another size, which is capped at MAX_PAGE_SIZE
+PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
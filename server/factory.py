@@ -4,6 +4,7 @@ from flask_cors import CORS
 from flask_migrate import Migrate
 from models import db, init_db, User
 from routes import init_routes
+from services.jobs import start_worker_threads
 
 login_manager = LoginManager()
 
@@ -11,14 +12,17 @@ login_manager = LoginManager()
 def load_user(user_id):
     return User.query.get(user_id)
 
-def create_app():
+def create_app(config=None):
     app = Flask(__name__)
     CORS(app, supports_credentials=True)
     app.config.from_pyfile('config.py')
+    if config:
+        app.config.update(config)
     db.init_app(app)
     migrate = Migrate(app, db)
     init_db(app)
     login_manager.init_app(app)
 
     init_routes(app)
+    start_worker_threads(app)
     return app
\ No newline at end of file
@@ -73,6 +73,11 @@ def run_migrations_online():
                 directives[:] = []
                 logger.info('No changes in schema detected.')
 
+    # the FTS5 search index (models/search_index.py) and its shadow tables are not
+    # in the metadata, keep autogenerate from dropping them
+    def include_object(object, name, type_, reflected, compare_to):
+        return not (type_ == "table" and reflected and name.startswith("search_index"))
+
     connectable = current_app.extensions['migrate'].db.get_engine()
 
     with connectable.connect() as connection:
@@ -80,6 +85,7 @@ def run_migrations_online():
             connection=connection,
             target_metadata=target_metadata,
             process_revision_directives=process_revision_directives,
+            include_object=include_object,
             **current_app.extensions['migrate'].configure_args
         )
 
@@ -0,0 +1,34 @@
+"""added search index
+
+Revision ID: 9b2f6d4e1a73
+Revises: a4d81f6c2e90
+Create Date: 2026-10-18 15:18:42.118204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from models.search_index import SEARCH_INDEX_DDL, rebuild_search_index
+
+
+# revision identifiers, used by Alembic.
+revision = '9b2f6d4e1a73'
+down_revision = 'a4d81f6c2e90'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # FTS5 virtual table and the triggers keeping it in sync, then index the existing catalog
+    connection = op.get_bind()
+    for statement in SEARCH_INDEX_DDL:
+        connection.execute(sa.text(statement))
+    rebuild_search_index(connection)
+
+
+def downgrade():
+    for trigger in ('course_insert', 'course_update', 'course_delete', 'week_delete',
+                    'material_insert', 'material_update', 'material_delete',
+                    'material_text_insert', 'material_text_update', 'material_text_delete',
+                    'assignment_insert', 'assignment_update', 'assignment_delete'):
+        op.execute(f'DROP TRIGGER IF EXISTS search_index_{trigger}')
+    op.execute('DROP TABLE IF EXISTS search_index')
@@ -13,6 +13,11 @@ from .enrollment import Enrollment
 from .score import Score
 from .material_doubt import MaterialDoubt
 from .enrollment_request import EnrollmentRequest
+from .material_text import MaterialText
+from .material_chunk_index import MaterialChunkIndex
+from .material_summary import MaterialSummary
+from .background_job import BackgroundJob
+from . import search_index
 
 def init_db(app):
     with app.app_context():
@@ -11,3 +11,5 @@ class Assignment(db.Model):
     week_id = db.Column(db.Integer, db.ForeignKey("week.id"), nullable=False)
     week = db.relationship("Week", backref="assignments")
     questions = db.relationship("Question", backref="question", cascade="all, delete-orphan")
+
+    __table_args__ = (db.Index("ix_assignment_week_id", "week_id"),)
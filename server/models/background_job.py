@@ -0,0 +1,19 @@
+from models import db
+from sqlalchemy.sql import func
+
+class BackgroundJob(db.Model):
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    kind = db.Column(db.String(50), nullable=False)
+    payload = db.Column(db.Text, nullable=True)  # JSON
+    status = db.Column(db.String(20), nullable=False, default="queued")  # queued, running, done, failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    result = db.Column(db.Text, nullable=True)  # JSON
+    error = db.Column(db.Text, nullable=True)
+    created_by = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=True)
+    created_at = db.Column(db.DateTime, default=func.now())
+    started_at = db.Column(db.DateTime, nullable=True)
+    heartbeat_at = db.Column(db.DateTime, nullable=True)  # renewed by the worker running the job
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    # Workers poll for the oldest queued job
+    __table_args__ = (db.Index("ix_background_job_status_id", "status", "id"),)
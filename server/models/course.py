@@ -8,6 +8,7 @@ class Course(db.Model):
     creator_user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
     created_at = db.Column(db.DateTime, default=func.now())  
     thumbnail_path = db.Column(db.String(255))  
+    content_version = db.Column(db.Integer, nullable=False, default=0, server_default="0")  # bumped on every change to the course tree
     weeks = db.relationship("Week", backref="week",cascade="all,delete-orphan")
 
     enrollments = db.relationship("Enrollment", back_populates="course", cascade="all, delete-orphan")
@@ -9,3 +9,8 @@ class Enrollment(db.Model):
     
     student = db.relationship("User", back_populates="enrollments")
     course = db.relationship("Course", back_populates="enrollments")
+
+    __table_args__ = (
+        db.Index("uq_enrollment_student_course", "student_id", "course_id", unique=True),
+        db.Index("ix_enrollment_course_id", "course_id"),
+    )
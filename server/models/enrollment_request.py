@@ -10,4 +10,9 @@ class EnrollmentRequest(db.Model):
     created_at = db.Column(db.DateTime, default=func.now())
     
     student = db.relationship("User", backref="enrollment_requests")
-    course = db.relationship("Course", backref="enrollment_requests")
\ No newline at end of file
+    course = db.relationship("Course", backref="enrollment_requests")
+
+    __table_args__ = (
+        db.Index("ix_enrollment_request_course_status", "course_id", "status"),
+        db.Index("ix_enrollment_request_student_id", "student_id"),
+    )
@@ -11,4 +11,6 @@ class Material(db.Model):
     transcript_path = db.Column(db.String(255))
     created_at = db.Column(db.DateTime, default=func.now())  
     #course = db.relationship("Week", backref="materials")
-    reviews = db.relationship("Review", backref="review", cascade="all, delete-orphan")
\ No newline at end of file
+    reviews = db.relationship("Review", backref="review", cascade="all, delete-orphan")
+
+    __table_args__ = (db.Index("ix_material_week_id", "week_id"),)
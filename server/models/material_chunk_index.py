@@ -0,0 +1,14 @@
+from models import db
+from sqlalchemy.sql import func
+
+class MaterialChunkIndex(db.Model):
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    material_id = db.Column(db.Integer, db.ForeignKey("material.id"), nullable=False, unique=True)
+    content_hash = db.Column(db.String(64), nullable=False)  # MaterialText.content_hash the index was built from
+    chunk_size = db.Column(db.Integer, nullable=False)
+    chunk_overlap = db.Column(db.Integer, nullable=False)
+    chunk_count = db.Column(db.Integer, nullable=False)
+    data = db.Column(db.LargeBinary, nullable=False)  # .npz archive, see services/retrieval.py
+    built_at = db.Column(db.DateTime, default=func.now())
+
+    material = db.relationship("Material", backref=db.backref("chunk_index", uselist=False, cascade="all, delete-orphan"))
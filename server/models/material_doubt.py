@@ -10,4 +10,9 @@ class MaterialDoubt(db.Model):
     
     # Relationships
     material = db.relationship("Material", backref="doubts")
-    student = db.relationship("User", backref="material_doubts")
\ No newline at end of file
+    student = db.relationship("User", backref="material_doubts")
+
+    __table_args__ = (
+        db.Index("ix_material_doubt_material_created", "material_id", "created_at"),
+        db.Index("ix_material_doubt_student_created", "student_id", "created_at"),
+    )
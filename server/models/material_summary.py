@@ -0,0 +1,17 @@
+from models import db
+from sqlalchemy.sql import func
+
+class MaterialSummary(db.Model):
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    material_id = db.Column(db.Integer, db.ForeignKey("material.id"), nullable=False)
+    content_hash = db.Column(db.String(64), nullable=False)  # MaterialText.content_hash the summary was made from
+    prompt_version = db.Column(db.Integer, nullable=False)
+    topic = db.Column(db.String(255), nullable=False)
+    summary = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, default=func.now())
+
+    material = db.relationship("Material", backref=db.backref("summaries", cascade="all, delete-orphan"))
+
+    __table_args__ = (
+        db.Index("uq_material_summary_key", "material_id", "content_hash", "prompt_version", unique=True),
+    )
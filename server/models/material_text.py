@@ -0,0 +1,14 @@
+from models import db
+from sqlalchemy.sql import func
+
+class MaterialText(db.Model):
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    material_id = db.Column(db.Integer, db.ForeignKey("material.id"), nullable=False, unique=True)
+    content_hash = db.Column(db.String(64), nullable=False)  # sha256 of the source file
+    source_path = db.Column(db.String(255), nullable=False)
+    source_mtime = db.Column(db.Float, nullable=False)
+    source_size = db.Column(db.Integer, nullable=False)
+    text = db.Column(db.Text, nullable=False)
+    extracted_at = db.Column(db.DateTime, default=func.now())
+
+    material = db.relationship("Material", backref=db.backref("extracted_text", uselist=False, cascade="all, delete-orphan"))
@@ -10,4 +10,9 @@ class Question(db.Model):
     option4 = db.Column(db.String(255), nullable=False)
     correct_option = db.Column(db.Integer, nullable=False)  
     created_at = db.Column(db.DateTime, default=func.now()) 
-    assignment_id = db.Column(db.Integer, db.ForeignKey("assignment.id"), nullable=False)
\ No newline at end of file
+    assignment_id = db.Column(db.Integer, db.ForeignKey("assignment.id"), nullable=False)
+    hint = db.Column(db.Text)
+    hint_source_hash = db.Column(db.String(64))  # hash of the text and options the hint was generated for
+    hint_generated_at = db.Column(db.DateTime)
+
+    __table_args__ = (db.Index("ix_question_assignment_id", "assignment_id"),)
@@ -6,4 +6,7 @@ class Review(db.Model):
     material_id = db.Column(db.Integer, db.ForeignKey("material.id"), nullable=False)
     comment = db.Column(db.Text, nullable=False)
     rating = db.Column(db.Integer)
-    user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
\ No newline at end of file
+    user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
+
+    # One review per user per material
+    __table_args__ = (db.Index("uq_review_material_user", "material_id", "user_id", unique=True),)
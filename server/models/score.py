@@ -8,7 +8,15 @@ class Score(db.Model):
     score = db.Column(db.Integer, nullable=False)
     max_score = db.Column(db.Integer, nullable=False)
     submitted_at = db.Column(db.DateTime, default=func.now())
+    # Normalized {question id: option} JSON, kept so the score can be regraded
+    answers = db.Column(db.Text, nullable=True)
     
     # Define relationships
     student = db.relationship("User", backref="scores")
-    assignment = db.relationship("Assignment", backref="scores")
\ No newline at end of file
+    assignment = db.relationship("Assignment", backref="scores")
+
+    # One score per student per assignment, and fast per-assignment aggregates
+    __table_args__ = (
+        db.Index("uq_score_student_assignment", "student_id", "assignment_id", unique=True),
+        db.Index("ix_score_assignment_id", "assignment_id"),
+    )
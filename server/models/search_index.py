@@ -0,0 +1,150 @@
+"""
+FTS5 full-text index over the course catalog, used by SearchResource.
+
+``search_index`` is an SQLite virtual table rather than a model. It holds one
+row per course, material and assignment and is kept in sync by triggers, so
+every write path (resources, jobs, cascades) updates it without having to know
+about it. Rows are addressed by ``rowid = id * 4 + kind code`` which lets the
+triggers update and delete them without scanning the index.
+
+Materials also carry their extracted text (``material_text.text``, which
+includes video transcripts) in the ``content`` column.
+"""
+from sqlalchemy import event, text
+from models import db
+
+SEARCH_INDEX_TABLE = "search_index"
+
+SEARCH_INDEX_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5(
+        title, body, content,
+        kind UNINDEXED, object_id UNINDEXED, course_id UNINDEXED, week_id UNINDEXED,
+        prefix='2 3', tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    # Courses
+    """
+    CREATE TRIGGER IF NOT EXISTS search_index_course_insert AFTER INSERT ON course BEGIN
+        INSERT INTO search_index(rowid, title, body, content, kind, object_id, course_id, week_id)
+        VALUES (new.id * 4 + 1, new.name, coalesce(new.description, ''), '', 'course', new.id, new.id, NULL);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS search_index_course_update AFTER UPDATE OF name, description ON course BEGIN
+        UPDATE search_index SET title = new.name, body = coalesce(new.description, '')
+        WHERE rowid = new.id * 4 + 1;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS search_index_course_delete AFTER DELETE ON course BEGIN
+        DELETE FROM search_index WHERE rowid = old.id * 4 + 1;
+    END
+    """,
+    # Weeks are not indexed, but deleting one removes whatever of its content is still indexed
+    """
+    CREATE TRIGGER IF NOT EXISTS search_index_week_delete BEFORE DELETE ON week BEGIN
+        DELETE FROM search_index WHERE rowid IN (
+            SELECT id * 4 + 2 FROM material WHERE week_id = old.id
+            UNION ALL
+            SELECT id * 4 + 3 FROM assignment WHERE week_id = old.id
+        );
+    END
+    """,
+    # Materials
+    """
+    CREATE TRIGGER IF NOT EXISTS search_index_material_insert AFTER INSERT ON material BEGIN
+        INSERT INTO search_index(rowid, title, body, content, kind, object_id, course_id, week_id)
+        VALUES (new.id * 4 + 2, new.name, '',
+                coalesce((SELECT text FROM material_text WHERE material_id = new.id), ''),
+                'material', new.id, (SELECT course_id FROM week WHERE id = new.week_id), new.week_id);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS search_index_material_update AFTER UPDATE OF name ON material BEGIN
+        UPDATE search_index SET title = new.name WHERE rowid = new.id * 4 + 2;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS search_index_material_delete AFTER DELETE ON material BEGIN
+        DELETE FROM search_index WHERE rowid = old.id * 4 + 2;
+    END
+    """,
+    # Extracted material text
+    """
+    CREATE TRIGGER IF NOT EXISTS search_index_material_text_insert AFTER INSERT ON material_text BEGIN
+        UPDATE search_index SET content = new.text WHERE rowid = new.material_id * 4 + 2;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS search_index_material_text_update AFTER UPDATE OF text ON material_text BEGIN
+        UPDATE search_index SET content = new.text WHERE rowid = new.material_id * 4 + 2;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS search_index_material_text_delete AFTER DELETE ON material_text BEGIN
+        UPDATE search_index SET content = '' WHERE rowid = old.material_id * 4 + 2;
+    END
+    """,
+    # Assignments
+    """
+    CREATE TRIGGER IF NOT EXISTS search_index_assignment_insert AFTER INSERT ON assignment BEGIN
+        INSERT INTO search_index(rowid, title, body, content, kind, object_id, course_id, week_id)
+        VALUES (new.id * 4 + 3, new.name, coalesce(new.description, ''), '',
+                'assignment', new.id, (SELECT course_id FROM week WHERE id = new.week_id), new.week_id);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS search_index_assignment_update AFTER UPDATE OF name, description ON assignment BEGIN
+        UPDATE search_index SET title = new.name, body = coalesce(new.description, '')
+        WHERE rowid = new.id * 4 + 3;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS search_index_assignment_delete AFTER DELETE ON assignment BEGIN
+        DELETE FROM search_index WHERE rowid = old.id * 4 + 3;
+    END
+    """,
+]
+
+REBUILD_SEARCH_INDEX_SQL = [
+    "DELETE FROM search_index",
+    """
+    INSERT INTO search_index(rowid, title, body, content, kind, object_id, course_id, week_id)
+    SELECT id * 4 + 1, name, coalesce(description, ''), '', 'course', id, id, NULL FROM course
+    """,
+    """
+    INSERT INTO search_index(rowid, title, body, content, kind, object_id, course_id, week_id)
+    SELECT material.id * 4 + 2, material.name, '', coalesce(material_text.text, ''),
+           'material', material.id, week.course_id, material.week_id
+    FROM material
+    JOIN week ON week.id = material.week_id
+    LEFT JOIN material_text ON material_text.material_id = material.id
+    """,
+    """
+    INSERT INTO search_index(rowid, title, body, content, kind, object_id, course_id, week_id)
+    SELECT assignment.id * 4 + 3, assignment.name, coalesce(assignment.description, ''), '',
+           'assignment', assignment.id, week.course_id, assignment.week_id
+    FROM assignment
+    JOIN week ON week.id = assignment.week_id
+    """,
+]
+
+def rebuild_search_index(connection):
+    """Refill the index from the catalog tables, e.g. after restoring a backup"""
+    for statement in REBUILD_SEARCH_INDEX_SQL:
+        connection.execute(text(statement))
+
+@event.listens_for(db.metadata, "after_create")
+def create_search_index(target, connection, **kw):
+    """Create the index and its triggers along with the tables, filling it if it is new."""
+    if connection.dialect.name != "sqlite":
+        return
+    exists = connection.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+        {"name": SEARCH_INDEX_TABLE}
+    ).first()
+    for statement in SEARCH_INDEX_DDL:
+        connection.execute(text(statement))
+    if not exists:
+        rebuild_search_index(connection)
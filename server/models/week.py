@@ -7,4 +7,6 @@ class Week(db.Model):
     created_at = db.Column(db.DateTime, default=func.now())  
     course_id = db.Column(db.Integer, db.ForeignKey("course.id"), nullable=False)
     user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
-    materials = db.relationship("Material", backref="material", cascade="all, delete-orphan")
\ No newline at end of file
+    materials = db.relationship("Material", backref="material", cascade="all, delete-orphan")
+
+    __table_args__ = (db.Index("ix_week_course_id", "course_id"),)
@@ -0,0 +1,32 @@
+import argparse
+from factory import create_app
+from services.pregeneration import KINDS, pregenerate_course
+
+def print_progress(report):
+    done = report["generated"] + report["failed"]
+    print(f"\r{done} generated ({report['failed']} failed)", end="", flush=True)
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-generate the summaries and question hints of a course")
+    parser.add_argument("--course-id", type=int, required=True, help="Course to walk")
+    parser.add_argument("--workers", type=int, help="Parallel model calls (default: PREGENERATE_WORKERS)")
+    parser.add_argument("--rate", type=float, help="Model calls started per second, 0 for no limit (default: PREGENERATE_RATE)")
+    parser.add_argument("--only", choices=KINDS, help="Only generate summaries or hints")
+    args = parser.parse_args()
+
+    app = create_app({'JOB_WORKER_THREADS': 0})
+    with app.app_context():
+        workers = args.workers or app.config["PREGENERATE_WORKERS"]
+        rate = args.rate if args.rate is not None else app.config["PREGENERATE_RATE"]
+        kinds = (args.only,) if args.only else KINDS
+        report = pregenerate_course(app, args.course_id, kinds=kinds, workers=workers, rate=rate, progress=print_progress)
+
+    print()
+    if report["interrupted"]:
+        print("Interrupted, run again to resume")
+    print(f"Generated {report['generated']}, already up to date {report['up_to_date']}, "
+          f"skipped {report['skipped']}, failed {report['failed']}")
+    print(f"{report['elapsed_seconds']}s, {report['generated_per_second']} items/s")
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,19 @@
 from flask_restful import Api
-from .assignment import AssignmentResource, CreateAssignmentResource, DeleteAssignmentResource
-from .submission import AssignmentSubmissionResource, AssignmentScoreResource
+from .assignment import AssignmentResource, CreateAssignmentResource, DeleteAssignmentResource, AssignmentRegradeResource
+from .submission import AssignmentSubmissionResource, AssignmentScoreResource, AnswerKeyCacheStatsResource
 from .auth import SignupResource, LoginResource, LogoutResource
 from .course import CourseResource, CreateCourseResource, InstructorCoursesResource, DeleteCourseResource, EnrolledCoursesResource, EnrollStudentResource, SingleCourseResource, CourseEditResource
-from .material import MaterialResource, MaterialCreateResource, MaterialDeleteResource, MaterialEditResource
-from .question import QuestionCreateResource, QuestionListResource, QuestionDeleteResource
-from .review import ReviewResource, ReviewDeleteResource, InstructorReviewsResource
+from .material import MaterialResource, MaterialCreateResource, MaterialDeleteResource, MaterialEditResource, TranscriptionStatsResource
+from .question import QuestionCreateResource, QuestionImportResource, QuestionListResource, QuestionEditResource, QuestionDeleteResource
+from .review import ReviewResource, ReviewDeleteResource, InstructorReviewsResource, InstructorReviewMaterialsResource
 from .user import UserProfileResource, UserStudentListResource, DeleteUserResource
 from .week import WeekCreateResource, WeekDeletionResource, WeekEditResource, WeekResource
-from .ai import AskResource, QuestionHintResource, SummarizeResource
+from .ai import AskResource, AskStreamResource, QuestionHintResource, QuestionHintStreamResource, SummarizeResource, SummarizeStreamResource, SummaryPrewarmResource, AnswerCacheStatsResource, LLMStatsResource
 from .assignment_scores import AssignmentScoresResource, AllAssignmentScoresResource
 from .material_doubts import MaterialDoubtCreateResource, MaterialDoubtsResource, AllMaterialDoubtsResource, StudentDoubtsResource
 from .search import SearchResource
-from .enrollment_request import EnrollmentRequestResource, StudentEnrollmentRequestsResource, InstructorEnrollmentRequestsResource, EnrollmentRequestActionResource
+from .enrollment_request import EnrollmentRequestResource, StudentEnrollmentRequestsResource, InstructorEnrollmentRequestsResource, EnrollmentRequestActionResource, EnrollmentRequestBulkActionResource
+from .job import JobStatusResource
 
 
 def init_routes(app):
@@ -22,8 +23,10 @@ def init_routes(app):
     api.add_resource(AssignmentResource, '/assignment/<int:assignment_id>')
     api.add_resource(CreateAssignmentResource, '/assignment/create/<int:week_id>')
     api.add_resource(DeleteAssignmentResource, '/assignment/delete/<int:assignment_id>')
+    api.add_resource(AssignmentRegradeResource, '/assignment/regrade/<int:assignment_id>')
     api.add_resource(AssignmentSubmissionResource, '/assignment/submit/<int:assignment_id>')
     api.add_resource(AssignmentScoreResource, '/assignment/score/<int:assignment_id>')
+    api.add_resource(AnswerKeyCacheStatsResource, '/assignment/cache/stats')
     
     # Assignment Scores Routes (for instructor dashboard)
     api.add_resource(AssignmentScoresResource, '/assignment/<int:assignment_id>/scores')
@@ -55,17 +58,21 @@ def init_routes(app):
     api.add_resource(MaterialCreateResource, '/material/create/<int:week_id>')
     api.add_resource(MaterialDeleteResource, '/material/delete/<int:material_id>')
     api.add_resource(MaterialEditResource, '/material/edit/<int:material_id>')
+    api.add_resource(TranscriptionStatsResource, '/material/transcription/stats')
 
 
     # Question Routes
     api.add_resource(QuestionCreateResource, '/question/create/<int:assignment_id>')
+    api.add_resource(QuestionImportResource, '/question/import/<int:assignment_id>')
     api.add_resource(QuestionListResource, '/question/<int:assignment_id>')
+    api.add_resource(QuestionEditResource, '/question/edit/<int:question_id>')
     api.add_resource(QuestionDeleteResource, '/question/delete/<int:question_id>')
 
     # Review Routes
     api.add_resource(ReviewResource, '/review/<int:material_id>')
     api.add_resource(ReviewDeleteResource, '/review/delete/<int:review_id>')
     api.add_resource(InstructorReviewsResource, '/review/instructor')
+    api.add_resource(InstructorReviewMaterialsResource, '/review/instructor/materials')
 
     # User Routes
     api.add_resource(UserProfileResource, '/user')
@@ -80,8 +87,14 @@ def init_routes(app):
 
     # AI Routes
     api.add_resource(AskResource, '/ask')
+    api.add_resource(AskStreamResource, '/ask/stream')
+    api.add_resource(AnswerCacheStatsResource, '/ask/cache/stats')
+    api.add_resource(LLMStatsResource, '/ai/stats')
     api.add_resource(QuestionHintResource, '/question_hint')
+    api.add_resource(QuestionHintStreamResource, '/question_hint/stream')
     api.add_resource(SummarizeResource, '/summarize')
+    api.add_resource(SummarizeStreamResource, '/summarize/stream')
+    api.add_resource(SummaryPrewarmResource, '/summarize/prewarm/<int:course_id>')
     
     # Search Route
     api.add_resource(SearchResource, '/search')
@@ -90,4 +103,8 @@ def init_routes(app):
     api.add_resource(EnrollmentRequestResource, '/enrollment-request')
     api.add_resource(StudentEnrollmentRequestsResource, '/enrollment-request/student')
     api.add_resource(InstructorEnrollmentRequestsResource, '/enrollment-request/instructor')
-    api.add_resource(EnrollmentRequestActionResource, '/enrollment-request/<int:request_id>/action')
\ No newline at end of file
+    api.add_resource(EnrollmentRequestActionResource, '/enrollment-request/<int:request_id>/action')
+    api.add_resource(EnrollmentRequestBulkActionResource, '/enrollment-request/bulk-action')
+
+    # Background job routes
+    api.add_resource(JobStatusResource, '/job/<int:job_id>')
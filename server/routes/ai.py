@@ -1,104 +1,85 @@
 import os
-from flask import Flask, request, jsonify
+import json
+from flask import Flask, Response, request, jsonify, current_app, stream_with_context
 from flask_restful import Resource
-from google import genai
+from flask_login import login_required, current_user
 from google.genai import types
-import docx                
-import PyPDF2              
-from PIL import Image      
-import pytesseract
-from dotenv import load_dotenv
-
-load_dotenv()
-
-# Initialize Google Gemini API client
-client = genai.Client(api_key=os.getenv("GOOGLE_API_KEY"))
-
-def extract_text_from_pdf(file_path):
-  
-    text = ""
-    try:
-        with open(file_path, "rb") as f:
-            pdf = PyPDF2.PdfReader(f)
-            for page in pdf.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    # Clean the text of problematic Unicode characters
-                    page_text = ''.join(char if ord(char) < 0xF000 else ' ' for char in page_text)
-                    text += page_text + "\n"
-    except Exception as e:
-        print(f"Error processing PDF {file_path}: {e}")
-    return text
-
-def extract_text_from_docx(file_path):
-    try:
-        doc = docx.Document(file_path)
-        fullText = [para.text for para in doc.paragraphs]
-        return "\n".join(fullText)
-    except Exception as e:
-        print(f"Error processing DOCX {file_path}: {e}")
-        return ""
-
-def extract_text_from_image(file_path):
-    try:
-        image = Image.open(file_path)
-        text = pytesseract.image_to_string(image)
-        return text
-    except Exception as e:
-        print(f"Error processing image {file_path}: {e}")
-        return ""
-
-def extract_text_from_file(file_path):
-    _, ext = os.path.splitext(file_path)
-    ext = ext.lower()
-    if ext == ".pdf":
-        return extract_text_from_pdf(file_path)
-    elif ext in [".docx", ".doc"]:
-        return extract_text_from_docx(file_path)
-    elif ext in [".png", ".jpg", ".jpeg"]:
-        return extract_text_from_image(file_path)
-    else:
-        return ""
-
-def extract_topic_heading(question):
-    try:
-        response = client.models.generate_content(
-            model="gemini-2.0-flash",
-            contents=f"Extract a short topic heading from this question: {question}",
-        )
-        topic_heading = response.text.strip()
-        return topic_heading
-    except Exception as e:
-        print(f"Error extracting topic: {e}")
-        return "Unknown Topic"
+from services.llm import (
+    MODEL, LLMUnavailableError, gateway, generate_content, generate_content_stream, topic_response_config,
+    parse_topic_response, local_topic_heading
+)
+from services.material_text import get_material_source_path, get_material_text, get_material_content_hash
+from services.retrieval import retrieve_relevant_chunks
+from services.summaries import (
+    SUMMARY_SYSTEM_INSTRUCTION, summarize_material, build_summary_prompt, get_cached_summary, store_summary
+)
+from services.hints import HINT_SYSTEM_INSTRUCTION, build_hint_prompt, generate_hint, get_stored_hint, store_hint
+from services.jobs import enqueue_job
+from services.pregeneration import KINDS as PREGENERATION_KINDS
+from services.answer_cache import answer_cache, DEFAULT_TTL, DEFAULT_SIMILARITY
+
+ASK_SYSTEM_INSTRUCTION = "You are an experienced teacher with strict instructions to stay within the defined scope."
+
+def sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def sse_response(events):
+    """
+    Stream server-sent events. Every stream ends with a "done" event carrying
+    the same body as the non-streaming endpoint, or an "error" event.
+    """
+    return Response(
+        stream_with_context(events),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+def load_material_text(material_id):
+    """Return (material, text, None) or (None, None, error response) for a material to ask about"""
+    # Import Material model
+    from models.material import Material
+
+    # Fetch material from database
+    material = Material.query.get(material_id)
+    if not material:
+        return None, None, ({"error": f"Material with ID {material_id} not found."}, 404)
+
+    # Videos are answered from their transcript, everything else from the file itself
+    file_path = get_material_source_path(material)
+
+    if not file_path or not os.path.exists(file_path):
+        return None, None, ({"error": f"File for material ID {material_id} not found at {file_path}."}, 404)
+
+    all_text = get_material_text(material, file_path) or ""
+    # Don't print the text directly to avoid encoding issues
+    print(f"Extracted text length: {len(all_text) if all_text else 0} characters")
+
+    if not all_text.strip():
+        return None, None, ({"error": "No text could be extracted from the material."}, 400)
+    return material, all_text, None
 
 class AskResource(Resource):
-    def post(self):
-        data = request.get_json(force=True)
-        question = data.get("question", "").strip()
-        material_id = data.get("material_id")
-
-        if not question:
-            return {"error": "Question is required."}, 400
+    def prepare(self, question, material_id):
+        """
+        Everything that happens before the model call. Returns ("answer", body)
+        when the question is answered without the model, ("error", response) or
+        ("prompt", context) with what is needed to generate the answer.
+        """
+        context = {"material": None, "material_name": "General Knowledge", "content_hash": None}
 
-        all_text = ""
-        material_name = "General Knowledge"
-        courses_context = None
-        
         # If the user is logged in and asking about a specific material, record it as a doubt
-        from flask_login import current_user
-        if current_user.is_authenticated and material_id:  
+        if current_user.is_authenticated and material_id:
             try:
                 # Import MaterialDoubt model
                 from models.material_doubt import MaterialDoubt
-                
+
                 # Create a new doubt record
                 new_doubt = MaterialDoubt(
                     material_id=material_id,
                     student_id=current_user.id,
                     doubt_text=question
                 )
-                
+
                 # Add to database
                 from models import db
                 db.session.add(new_doubt)
@@ -110,121 +91,188 @@ class AskResource(Resource):
 
         # CASE 1: If material_id is provided, only provide answers from that material
         if material_id:
-            # Import Material model
-            from models.material import Material
-            
-            # Fetch material from database
-            material = Material.query.get(material_id)
-            if not material:
-                return {"error": f"Material with ID {material_id} not found."}, 404
-                
-            # Get file path based on material type
-            file_path = None
-            file_name = material.filename
-            material_name = material.name
-            _, ext = os.path.splitext(file_name)
-            ext = ext.lower()
-            
-            # For videos, use transcript if available
-            if ext == ".mp4" and material.transcript_path:
-                # Convert relative path to absolute path
-                transcript_path = material.transcript_path.lstrip('/')
-                file_path = os.path.join(os.getcwd(), transcript_path)
-            else:
-                # For PDFs and other files, use the material file path
-                material_path = material.file_path.lstrip('/')
-                file_path = os.path.join(os.getcwd(), material_path)
-                
-            if not os.path.exists(file_path):
-                return {"error": f"File for material ID {material_id} not found at {file_path}."}, 404
-
-            all_text = extract_text_from_file(file_path)
-            print(f"Extracted text length: {len(all_text) if all_text else 0} characters")
-
-            if not all_text.strip():
-                return {"error": "No text could be extracted from the material."}, 400
+            material, all_text, error = load_material_text(material_id)
+            if error:
+                return "error", error
+            context["material"] = material
+            context["material_name"] = material.name
+
+            # Repeated (or near-identical) questions about the same file are answered from the cache
+            content_hash = get_material_content_hash(material)
+            context["content_hash"] = content_hash
+            if content_hash:
+                cached = answer_cache.get(
+                    material.id, content_hash, question,
+                    ttl=current_app.config.get("ANSWER_CACHE_TTL", DEFAULT_TTL),
+                    threshold=current_app.config.get("ANSWER_CACHE_SIMILARITY", DEFAULT_SIMILARITY)
+                )
+                if cached:
+                    return "answer", {**cached, "cached": True}
 
-            # Skip to prompt generation for material
+            # Use material context - STRICT material only
+            # Only the excerpts most relevant to the question are sent, not the whole file
+            excerpts = "\n\n---\n\n".join(retrieve_relevant_chunks(material, all_text, question))
+            context["prompt"] = f"""Question: {question} Background material (relevant excerpts) from '{material.name}': {excerpts} Provide hints and guidance instead of direct answers. Don't do the work for the student."""
 
         # CASE 2: No material_id provided - ONLY answer questions related to enrolled courses
         elif current_user.is_authenticated and not current_user.is_instructor:
             # Import enrollment model to get enrolled courses
             from models.enrollment import Enrollment
             from models.course import Course
-            
+
             # Get all courses the student is enrolled in
             enrolled_courses = Course.query.join(Enrollment).filter(Enrollment.student_id == current_user.id).all()
-            
+
             if not enrolled_courses:
-                return jsonify({
-                    "topic": "Not Enrolled", 
+                return "answer", {
+                    "topic": "Not Enrolled",
                     "answer": "You are not enrolled in any courses. Please enroll in courses to get help with course-related questions.",
                     "material_name": "No Courses"
-                })
-            
+                }
+
             # Create a context with the student's courses
             course_names = [course.name for course in enrolled_courses]
             course_descriptions = [f"{course.name}: {course.description}" for course in enrolled_courses]
             courses_context = "\n".join(course_descriptions)
-            material_name = "Enrolled Courses"
-        
+            context["material_name"] = "Enrolled Courses"
+
+            # For students with enrolled courses - STRICT courses only
+            context["prompt"] = f"""Question: {question}
+
+The student is enrolled in these courses:
+{courses_context}
+
+You are a teacher helping a student learn about their enrolled courses.
+STRICTLY ENFORCE: ONLY answer if the question is directly related to these specific courses.
+If the question is not about these courses, respond with EXACTLY:
+"I can only answer questions related to your enrolled courses. Please ask something about {', '.join(course_names)}."
+
+Provide hints and guidance instead of direct answers. Don't do the work for the student."""
+
         # CASE 3: User is not a student or not authenticated - instructors handle differently
         else:
             # For instructors or unauthenticated users, return a generic response
             if current_user.is_authenticated and current_user.is_instructor:
-                return jsonify({
-                    "topic": "Instructor Mode", 
+                return "answer", {
+                    "topic": "Instructor Mode",
                     "answer": "As an instructor, you can view course materials directly or check student doubts to answer their questions.",
                     "material_name": "Instructor Guide"
-                })
+                }
             else:
-                return jsonify({
-                    "topic": "Authentication Required", 
+                return "answer", {
+                    "topic": "Authentication Required",
                     "answer": "Please log in as a student and enroll in courses to ask questions.",
                     "material_name": "Login Required"
-                })
+                }
 
-        topic_heading = extract_topic_heading(question)
+        print(f"Using prompt type: {'Material-specific' if material_id else 'Enrolled-courses-only'}")
+        return "prompt", context
 
-        try:
-            # Only two possible prompts: material-specific or enrolled-courses
-            if material_id and all_text.strip():
-                # CASE 1: Use material context if available - STRICT material only
-                prompt = f"""Question: {question} Background material from '{material_name}': {all_text} Provide hints and guidance instead of direct answers. Don't do the work for the student."""
-            else:
-                # CASE 2: For students with enrolled courses - STRICT courses only
-                prompt = f"""Question: {question}
+    def remember(self, context, question, result):
+        if context["content_hash"]:
+            answer_cache.put(context["material"].id, context["content_hash"], question, result)
 
-The student is enrolled in these courses:
-{courses_context}
+    def post(self):
+        data = request.get_json(force=True)
+        question = data.get("question", "").strip()
+        material_id = data.get("material_id")
 
-You are a teacher helping a student learn about their enrolled courses.
-STRICTLY ENFORCE: ONLY answer if the question is directly related to these specific courses.
-If the question is not about these courses, respond with EXACTLY:
-"I can only answer questions related to your enrolled courses. Please ask something about {', '.join(course_names)}."
+        if not question:
+            return {"error": "Question is required."}, 400
 
-Provide hints and guidance instead of direct answers. Don't do the work for the student."""
-            
-            print(f"Using prompt type: {'Material-specific' if material_id else 'Enrolled-courses-only'}")
-            
-            response = client.models.generate_content(
-                model="gemini-2.0-flash",
-                config=types.GenerateContentConfig(
-                    system_instruction="You are an experienced teacher with strict instructions to stay within the defined scope.",
-                ),
-                contents=prompt,
+        kind, context = self.prepare(question, material_id)
+        if kind == "error":
+            return context
+        if kind == "answer":
+            return jsonify(context)
+
+        try:
+            # The topic heading comes back in the same response, no second round-trip
+            response = generate_content(
+                model=MODEL,
+                config=topic_response_config(ASK_SYSTEM_INSTRUCTION, "answer"),
+                contents=context["prompt"],
             )
-            answer = response.text.strip()
+            topic_heading, answer = parse_topic_response(response.text, "answer", question)
 
+        except LLMUnavailableError as e:
+            return {"error": str(e)}, 503
         except Exception as e:
             return {"error": f"Gemini API error: {str(e)}"}, 500
 
         # Return material name along with the answer
-        return jsonify({
-            "topic": topic_heading, 
+        result = {
+            "topic": topic_heading,
             "answer": answer,
-            "material_name": material_name
-        })
+            "material_name": context["material_name"]
+        }
+        self.remember(context, question, result)
+        return jsonify({**result, "cached": False})
+
+class AskStreamResource(AskResource):
+    def post(self):
+        data = request.get_json(force=True)
+        question = data.get("question", "").strip()
+        material_id = data.get("material_id")
+
+        if not question:
+            return {"error": "Question is required."}, 400
+
+        kind, context = self.prepare(question, material_id)
+        if kind == "error":
+            return context
+        if kind == "answer":
+            return sse_response(iter([sse_event("done", context)]))
+
+        def events():
+            # Streamed text is not JSON, so the heading is derived from the question
+            topic_heading = local_topic_heading(question)
+            yield sse_event("meta", {"topic": topic_heading, "material_name": context["material_name"]})
+
+            parts = []
+            try:
+                for text in generate_content_stream(
+                    model=MODEL,
+                    config=types.GenerateContentConfig(system_instruction=ASK_SYSTEM_INSTRUCTION),
+                    contents=context["prompt"],
+                ):
+                    parts.append(text)
+                    yield sse_event("token", {"text": text})
+            except Exception as e:
+                yield sse_event("error", {"error": f"Gemini API error: {str(e)}"})
+                return
+
+            result = {
+                "topic": topic_heading,
+                "answer": "".join(parts).strip(),
+                "material_name": context["material_name"]
+            }
+            self.remember(context, question, result)
+            yield sse_event("done", {**result, "cached": False})
+
+        return sse_response(events())
+
+class AnswerCacheStatsResource(Resource):
+    @login_required
+    def get(self):
+        try:
+            if not current_user.is_instructor:
+                return {"error": "User is not an instructor"}, 403
+
+            return {"answer_cache": answer_cache.get_stats()}, 200
+        except Exception as e:
+            return {"error": f"Failed to get answer cache stats: {str(e)}"}, 500
+
+class LLMStatsResource(Resource):
+    @login_required
+    def get(self):
+        try:
+            if not current_user.is_instructor:
+                return {"error": "User is not an instructor"}, 403
+
+            return {"llm": gateway.get_stats()}, 200
+        except Exception as e:
+            return {"error": f"Failed to get AI service stats: {str(e)}"}, 500
 
 class QuestionHintResource(Resource):
     def post(self):
@@ -236,31 +284,78 @@ class QuestionHintResource(Resource):
 
         try:
             # Fetch question from database
+            from models import db
             from models.question import Question
             question_data = Question.query.get(question_id)
-            
+
             if not question_data:
                 return {"error": "Question not found."}, 404
-                
+
             question = question_data.description
-            options = [question_data.option1, question_data.option2, question_data.option3, question_data.option4]
-            
-            # Initialize Gemini model            
-            prompt = f"Question: {question}\nOptions: {', '.join(options)}\nProvide hints without revealing the answer.\n\nDo not state the correct answer explicitly. Instead, provide logical reasoning and indirect clues to help the student figure it out."
-            
-            response = client.models.generate_content(
-                model="gemini-2.0-flash",
-                config=types.GenerateContentConfig(
-                    system_instruction="You are an experienced teacher who gives hints about the correct answer without revealing it.",
-                ),
-                contents=prompt,
-            )
-            hint = response.text.strip()
 
+            # Hints are generated once per question (usually in the background on creation)
+            hint = get_stored_hint(question_data)
+            cached = hint is not None
+            if not cached:
+                hint = generate_hint(question_data)
+                store_hint(question_data, hint)
+                db.session.commit()
+
+        except LLMUnavailableError as e:
+            return {"error": str(e)}, 503
         except Exception as e:
+            db.session.rollback()
             return {"error": f"Error: {str(e)}"}, 500
 
-        return jsonify({"question": question, "hint": hint})
+        return jsonify({"question": question, "hint": hint, "cached": cached})
+
+class QuestionHintStreamResource(Resource):
+    def post(self):
+        data = request.get_json(force=True)
+        question_id = data.get("question_id")
+
+        if not question_id:
+            return {"error": "Question ID is required."}, 400
+
+        # Fetch question from database
+        from models import db
+        from models.question import Question
+        question_data = Question.query.get(question_id)
+
+        if not question_data:
+            return {"error": "Question not found."}, 404
+
+        question = question_data.description
+        hint = get_stored_hint(question_data)
+        if hint is not None:
+            return sse_response(iter([sse_event("done", {"question": question, "hint": hint, "cached": True})]))
+
+        prompt = build_hint_prompt(question_data)
+
+        def events():
+            parts = []
+            try:
+                for text in generate_content_stream(
+                    model=MODEL,
+                    config=types.GenerateContentConfig(system_instruction=HINT_SYSTEM_INSTRUCTION),
+                    contents=prompt,
+                ):
+                    parts.append(text)
+                    yield sse_event("token", {"text": text})
+            except Exception as e:
+                yield sse_event("error", {"error": f"Error: {str(e)}"})
+                return
+
+            hint = "".join(parts).strip()
+            try:
+                store_hint(question_data, hint)
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                print(f"Error storing hint for question {question_id}: {str(e)}")
+            yield sse_event("done", {"question": question, "hint": hint, "cached": False})
+
+        return sse_response(events())
 
 class SummarizeResource(Resource):
     def post(self):
@@ -270,64 +365,104 @@ class SummarizeResource(Resource):
         if not material_id:
             return {"error": "Material ID is required."}, 400
 
-        # Import Material model
-        from models.material import Material
-        
-        # Fetch material from database
-        material = Material.query.get(material_id)
-        if not material:
-            return {"error": f"Material with ID {material_id} not found."}, 404
-            
-        # Get file path based on material type
-        file_path = None
-        file_name = material.filename
-        _, ext = os.path.splitext(file_name)
-        ext = ext.lower()
-        
-        # For videos, use transcript if available
-        if ext == ".mp4" and material.transcript_path:
-            # Convert relative path to absolute path
-            transcript_path = material.transcript_path.lstrip('/')
-            file_path = os.path.join(os.getcwd(), transcript_path)
-        else:
-            # For PDFs and other files, use the material file path
-            material_path = material.file_path.lstrip('/')
-            file_path = os.path.join(os.getcwd(), material_path)
-            
-        if not os.path.exists(file_path):
-            return {"error": f"File for material ID {material_id} not found at {file_path}."}, 404
-
-        all_text = extract_text_from_file(file_path)
-        # Don't print the text directly to avoid encoding issues
-        print(f"Extracted text length: {len(all_text) if all_text else 0} characters")
-
-        if not all_text.strip():
-            return {"error": "No text could be extracted from the material."}, 400
+        material, all_text, error = load_material_text(material_id)
+        if error:
+            return error
 
         try:
             # Get material name for better context
             material_name = material.name
-            
-            # Initialize Gemini model            
-            prompt = f"Create a summary of the following material titled '{material_name}' in bullet points.\n\n{all_text}"
-            
-            response = client.models.generate_content(
-                model="gemini-2.0-flash",
-                config=types.GenerateContentConfig(
-                    system_instruction="You are a helpful AI assistant that creates concise, informative summaries.",
-                ),
-                contents=prompt,
-            )
-            answer = response.text.strip()
+
+            # Served from the stored summary unless the file changed since it was generated
+            topic_heading, answer, cached = summarize_material(material, all_text)
+        except LLMUnavailableError as e:
+            return {"error": str(e)}, 503
         except Exception as e:
             return {"error": f"Gemini API error: {str(e)}"}, 500
 
-        topic_heading = extract_topic_heading(answer)
-        
         # Return material name along with the summary
         return jsonify({
-            "topic": topic_heading, 
+            "topic": topic_heading,
             "summary": answer,
-            "material_name": material_name
+            "material_name": material_name,
+            "cached": cached
         })
 
+class SummarizeStreamResource(Resource):
+    def post(self):
+        data = request.get_json(force=True)
+        material_id = data.get("material_id")
+
+        if not material_id:
+            return {"error": "Material ID is required."}, 400
+
+        material, all_text, error = load_material_text(material_id)
+        if error:
+            return error
+
+        material_name = material.name
+        content_hash = get_material_content_hash(material)
+        stored = get_cached_summary(material.id, content_hash) if content_hash else None
+        if stored:
+            return sse_response(iter([sse_event("done", {
+                "topic": stored.topic,
+                "summary": stored.summary,
+                "material_name": material_name,
+                "cached": True
+            })]))
+
+        def events():
+            yield sse_event("meta", {"material_name": material_name})
+
+            parts = []
+            try:
+                for text in generate_content_stream(
+                    model=MODEL,
+                    config=types.GenerateContentConfig(system_instruction=SUMMARY_SYSTEM_INSTRUCTION),
+                    contents=build_summary_prompt(material_name, all_text),
+                ):
+                    parts.append(text)
+                    yield sse_event("token", {"text": text})
+            except Exception as e:
+                yield sse_event("error", {"error": f"Gemini API error: {str(e)}"})
+                return
+
+            summary = "".join(parts).strip()
+            topic_heading = local_topic_heading(summary)
+            if content_hash:
+                store_summary(material.id, content_hash, topic_heading, summary)
+            yield sse_event("done", {
+                "topic": topic_heading,
+                "summary": summary,
+                "material_name": material_name,
+                "cached": False
+            })
+
+        return sse_response(events())
+
+class SummaryPrewarmResource(Resource):
+    @login_required
+    def post(self, course_id):
+        from models import db, Course
+        try:
+            if not current_user.is_instructor:
+                return {"error": "Only instructors can pre-generate summaries"}, 403
+
+            course = Course.query.get(course_id)
+            if not course:
+                return {"error": "Course not found"}, 404
+            if course.creator_user_id != current_user.id:
+                return {"error": "Unauthorized"}, 403
+
+            # Hints can be pre-generated in the same run with {"kinds": ["summaries", "hints"]}
+            data = request.get_json(silent=True) or {}
+            kinds = data.get("kinds") or ["summaries"]
+            if not isinstance(kinds, list) or any(kind not in PREGENERATION_KINDS for kind in kinds):
+                return {"error": f"kinds must be a list of: {', '.join(PREGENERATION_KINDS)}"}, 400
+
+            job = enqueue_job("pregenerate_course", {"course_id": course_id, "kinds": kinds}, current_user.id)
+            db.session.commit()
+            return {"message": "Summary generation queued", "job_id": job.id}, 202
+        except Exception as e:
+            db.session.rollback()
+            return {"error": f"Failed to queue summary generation: {str(e)}"}, 500
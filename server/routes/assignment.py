@@ -1,7 +1,9 @@
 from flask import request
 from flask_restful import Resource
 from flask_login import login_required, current_user
-from models import db, Assignment, Week
+from models import db, Assignment, Course, Score, Week
+from services.course_cache import bump_course_version
+from services.grading import answer_keys, regrade_assignment
 from datetime import datetime
 
 
@@ -56,6 +58,7 @@ class CreateAssignmentResource(Resource):
                 week_id=week_id
             )
             db.session.add(new_assignment)
+            bump_course_version(week.course_id)
             db.session.commit()
             
             assignment_data = {
@@ -81,9 +84,37 @@ class DeleteAssignmentResource(Resource):
             if not assignment:
                 return {'error': 'Assignment not found'}, 404
             
+            # Students' grades are never deleted along with an assignment
+            if db.session.query(Score.id).filter_by(assignment_id=assignment_id).first():
+                return {'error': 'Assignment has submissions and cannot be deleted'}, 400
+            
+            bump_course_version(assignment.week.course_id)
+            answer_keys.invalidate(assignment_id)
             db.session.delete(assignment)
             db.session.commit()
             return {'message': 'Assignment deleted'}, 200
         except Exception as e:
             db.session.rollback()
-            return {'error': f'Failed to delete assignment: {str(e)}'}, 500
\ No newline at end of file
+            return {'error': f'Failed to delete assignment: {str(e)}'}, 500
+
+class AssignmentRegradeResource(Resource):
+    @login_required
+    def post(self, assignment_id):
+        try:
+            if not current_user.is_instructor:
+                return {'error': 'Access denied. Only instructors can regrade assignments'}, 403
+            
+            assignment = Assignment.query.get(assignment_id)
+            if not assignment:
+                return {'error': 'Assignment not found'}, 404
+            course = Course.query.get(assignment.week.course_id)
+            if course.creator_user_id != current_user.id:
+                return {'error': 'User is not the creator of the course'}, 403
+            
+            # Every stored submission against the current answer key, in one bulk update
+            counts = regrade_assignment(assignment_id)
+            db.session.commit()
+            return {'message': 'Assignment regraded', **counts}, 200
+        except Exception as e:
+            db.session.rollback()
+            return {'error': f'Failed to regrade assignment: {str(e)}'}, 500
@@ -1,8 +1,7 @@
-from flask import request
 from flask_restful import Resource
 from flask_login import login_required, current_user
-from models import db, Assignment, Score, Week, Course, Material
-from sqlalchemy import func
+from models import db, Assignment, Score, Week, Course
+from sqlalchemy import func, case, cast, Float
 
 class AssignmentScoresResource(Resource):
     @login_required
@@ -61,6 +60,46 @@ class AssignmentScoresResource(Resource):
         except Exception as e:
             return {'error': f'Failed to retrieve scores: {str(e)}'}, 500
 
+def get_assignment_score_summaries(instructor_id):
+    """Average percentage and submission count of every assignment in the instructor's courses, by assignment id."""
+    percentage = case(
+        (Score.max_score > 0, cast(Score.score, Float) / Score.max_score * 100),
+        else_=0
+    )
+    rows = db.session.query(
+        Assignment.id,
+        Assignment.name,
+        Assignment.week_id,
+        Week.name.label('week_name'),
+        Course.id.label('course_id'),
+        Course.name.label('course_name'),
+        func.coalesce(func.avg(percentage), 0).label('average_percentage'),
+        func.count(Score.id).label('submission_count')
+    ).join(
+        Week, Week.id == Assignment.week_id
+    ).join(
+        Course, Course.id == Week.course_id
+    ).outerjoin(
+        Score, Score.assignment_id == Assignment.id
+    ).filter(
+        Course.creator_user_id == instructor_id
+    ).group_by(
+        Assignment.id, Week.id, Course.id
+    ).order_by(
+        Assignment.id
+    ).all()
+
+    return [{
+        'id': row.id,
+        'name': row.name,
+        'week_id': row.week_id,
+        'week_name': row.week_name,
+        'course_id': row.course_id,
+        'course_name': row.course_name,
+        'average_percentage': row.average_percentage,
+        'submission_count': row.submission_count
+    } for row in rows]
+
 class AllAssignmentScoresResource(Resource):
     @login_required
     def get(self):
@@ -69,55 +108,16 @@ class AllAssignmentScoresResource(Resource):
             if not current_user.is_instructor:
                 return {'error': 'Access denied. Only instructors can view all scores'}, 403
             
-            # Get all assignments for courses taught by this instructor
-            # First, get all courses taught by this instructor
-            courses = Course.query.filter_by(creator_user_id=current_user.id).all()
-            
-            if not courses:
+            has_courses = db.session.query(Course.id).filter_by(creator_user_id=current_user.id).first()
+            if not has_courses:
                 return {'message': 'No courses found for this instructor', 'assignments': []}, 200
             
-            course_ids = [course.id for course in courses]
+            # Averages and counts are computed by the database in a single grouped query
+            assignments_data = get_assignment_score_summaries(current_user.id)
             
-            # Get all weeks for these courses
-            weeks = Week.query.filter(Week.course_id.in_(course_ids)).all()
-            week_ids = [week.id for week in weeks]
-            
-            # Get all assignments for these weeks
-            assignments = Assignment.query.filter(Assignment.week_id.in_(week_ids)).all()
-            
-            if not assignments:
+            if not assignments_data:
                 return {'message': 'No assignments found for your courses', 'assignments': []}, 200
             
-            # For each assignment, get average score
-            assignments_data = []
-            for assignment in assignments:
-                # Get all scores for this assignment
-                scores = Score.query.filter_by(assignment_id=assignment.id).all()
-                
-                # Calculate average percentage if there are scores
-                if scores:
-                    total_percentage = sum((score.score / score.max_score) * 100 if score.max_score > 0 else 0 for score in scores)
-                    average_percentage = total_percentage / len(scores)
-                    submission_count = len(scores)
-                else:
-                    average_percentage = 0
-                    submission_count = 0
-                
-                # Get week and course information
-                week = Week.query.get(assignment.week_id)
-                course = Course.query.get(week.course_id) if week else None
-                
-                assignments_data.append({
-                    'id': assignment.id,
-                    'name': assignment.name,
-                    'week_id': assignment.week_id,
-                    'week_name': week.name if week else 'Unknown',
-                    'course_id': course.id if course else None,
-                    'course_name': course.name if course else 'Unknown',
-                    'average_percentage': average_percentage,
-                    'submission_count': submission_count
-                })
-            
             return {'assignments': assignments_data}, 200
             
         except Exception as e:
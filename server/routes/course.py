@@ -1,7 +1,10 @@
-from flask import request
+from flask import request, Response
 from flask_restful import Resource
 from flask_login import login_required, current_user
-from models import db, Course, Material, Enrollment, User
+from models import db, Course, Enrollment, User, Week, Assignment
+from sqlalchemy.orm import selectinload
+from services.course_cache import course_snapshots, bump_course_version
+from services.pagination import get_page_args, paginate, page_response, InvalidPageError
 import os
 from werkzeug.utils import secure_filename
 
@@ -11,7 +14,9 @@ ALLOWED_EXTENSIONS = {"jpg", "jpeg", "png"}
 class CourseResource(Resource):
     def get(self):
         try:
-            courses = Course.query.all()
+            page = get_page_args()
+            query = db.session.query(Course.id, Course.name, Course.description, Course.thumbnail_path)
+            courses, next_cursor = paginate(query, [Course.id], page, key=lambda course: (course.id,))
             course_data = []
             for course in courses:
                 course_data.append({
@@ -20,10 +25,73 @@ class CourseResource(Resource):
                     'description': course.description,
                     'thumbnail_path': course.thumbnail_path
                 })
-            return {'courses': course_data}, 200
+            return page_response(page, next_cursor, query, courses=course_data), 200
+        except InvalidPageError as e:
+            return {'error': str(e)}, 400
         except Exception as e:
             return {'error': f'Failed to get courses: {str(e)}'}, 500
 
+def build_course_tree(course_id):
+    """Serialize a course with its weeks, materials, assignments and questions."""
+    # Load the whole course tree up front, one query per level instead of per week
+    course = Course.query.options(
+        selectinload(Course.weeks).selectinload(Week.materials),
+        selectinload(Course.weeks).selectinload(Week.assignments).selectinload(Assignment.questions)
+    ).filter_by(id=course_id).first()
+
+    # Calculate total course duration and prepare weeks data
+    total_course_duration = 0
+    weeks_data = []
+    
+    for week in course.weeks:
+        total_week_duration = 0
+        materials_data = []
+        
+        for material in week.materials:
+            total_week_duration += material.duration
+            materials_data.append({
+                "material_id": material.id,
+                "material_name": material.name,
+                "duration": material.duration,
+                "file_path": material.file_path,
+                "type": "video"  # Default type, can be updated based on actual data
+            })
+        
+        # Assignments for this week
+        for assignment in week.assignments:
+            materials_data.append({
+                "material_id": assignment.id,
+                "material_name": assignment.name,
+                "description": assignment.description,
+                "isAssignment": True,
+                "assignment_id": assignment.id,
+                "type": "assignment",
+                "due_date": assignment.due_date.isoformat() if assignment.due_date else None,
+                "questions": [{
+                    "id": question.id,
+                    "description": question.description,
+                    "options": [question.option1, question.option2, question.option3, question.option4],
+                    "correct_answer": question.correct_option
+                } for question in assignment.questions]
+            })
+        
+        total_course_duration += total_week_duration
+        weeks_data.append({
+            "id": week.id,
+            "name": week.name,
+            "materials": materials_data
+        })
+    
+    # Prepare the course data with weeks and materials
+    return {
+        "id": course.id,
+        "name": course.name,
+        "description": course.description,
+        "thumbnail_path": course.thumbnail_path,
+        "duration": total_course_duration,
+        "weeks": weeks_data
+    }
+
 class SingleCourseResource(Resource):
     @login_required
     def get(self, course_id):
@@ -47,63 +115,18 @@ class SingleCourseResource(Resource):
                 if not enrollment:
                     return {'error': 'You are not enrolled in this course'}, 403
             
-            # Calculate total course duration and prepare weeks data
-            total_course_duration = 0
-            weeks_data = []
-            
-            for week in course.weeks:
-                total_week_duration = 0
-                materials_data = []
-                materials = Material.query.filter_by(week_id=week.id).all()
-                
-                for material in materials:
-                    total_week_duration += material.duration
-                    materials_data.append({
-                        "material_id": material.id,
-                        "material_name": material.name,
-                        "duration": material.duration,
-                        "file_path": material.file_path,
-                        "type": "video"  # Default type, can be updated based on actual data
-                    })
-                
-                # Get assignments for this week
-                from models import Assignment
-                assignments = Assignment.query.filter_by(week_id=week.id).all()
-                for assignment in assignments:
-                    materials_data.append({
-                        "material_id": assignment.id,
-                        "material_name": assignment.name,
-                        "description": assignment.description,
-                        "isAssignment": True,
-                        "assignment_id": assignment.id,
-                        "type": "assignment",
-                        "due_date": assignment.due_date.isoformat() if assignment.due_date else None,
-                        "questions": [{
-                            "id": question.id,
-                            "description": question.description,
-                            "options": [question.option1, question.option2, question.option3, question.option4],
-                            "correct_answer": question.correct_option
-                        } for question in assignment.questions]
-                    })
-                
-                total_course_duration += total_week_duration
-                weeks_data.append({
-                    "id": week.id,
-                    "name": week.name,
-                    "materials": materials_data
-                })
-            
-            # Prepare the course data with weeks and materials
-            course_data = {
-                "id": course.id,
-                "name": course.name,
-                "description": course.description,
-                "thumbnail_path": course.thumbnail_path,
-                "duration": total_course_duration,
-                "weeks": weeks_data
-            }
-            
-            return {'course': course_data}, 200
+            # The tree only changes when content_version is bumped, so reuse the serialized snapshot
+            snapshot = course_snapshots.get(course)
+            if snapshot is None:
+                snapshot = course_snapshots.store(course, {'course': build_course_tree(course_id)})
+
+            if request.if_none_match.contains(snapshot.etag):
+                response = Response(status=304)
+            else:
+                response = Response(snapshot.body, status=200, mimetype='application/json')
+            response.set_etag(snapshot.etag)
+            response.headers['Cache-Control'] = 'private, no-cache'
+            return response
         except Exception as e:
             return {'error': f'Failed to get course: {str(e)}'}, 500
 
@@ -114,7 +137,9 @@ class InstructorCoursesResource(Resource):
             if not current_user.is_instructor:
                 return {'error': 'User is not an instructor'}, 403
             
-            courses = Course.query.filter_by(creator_user_id=current_user.id).all()
+            courses = Course.query.options(
+                selectinload(Course.weeks).selectinload(Week.materials)
+            ).filter_by(creator_user_id=current_user.id).all()
             course_data = []
 
             for course in courses:
@@ -124,9 +149,8 @@ class InstructorCoursesResource(Resource):
                 for week in course.weeks:
                     total_week_duration = 0
                     materials_data = []
-                    materials = Material.query.filter_by(week_id=week.id).all()
 
-                    for material in materials:
+                    for material in week.materials:
                         total_week_duration += material.duration
                         materials_data.append({
                             "material_id": material.id,
@@ -249,6 +273,7 @@ class DeleteCourseResource(Resource):
             
             db.session.delete(course)
             db.session.commit()
+            course_snapshots.invalidate(course_id)
             return {'message': 'Course deleted'}, 200
         except Exception as e:
             db.session.rollback()
@@ -283,6 +308,7 @@ class CourseEditResource(Resource):
             
             course.name = data['name']
             course.description = data['description']
+            bump_course_version(course.id)
             
             # Handle thumbnail update if provided
             file = request.files.get('thumbnail')
@@ -1,7 +1,11 @@
 from flask import request
 from flask_restful import Resource
 from flask_login import login_required, current_user
+from sqlalchemy import and_, insert, select, update
 from models import db, EnrollmentRequest, Course, User, Enrollment
+from services.pagination import get_page_args, paginate, page_response, InvalidPageError
+
+ENROLLMENT_REQUEST_STATUSES = ("pending", "approved", "rejected")
 
 class EnrollmentRequestResource(Resource):
     @login_required
@@ -60,21 +64,42 @@ class StudentEnrollmentRequestsResource(Resource):
     def get(self):
         """Get all enrollment requests for the current student"""
         try:
-            requests = EnrollmentRequest.query.filter_by(student_id=current_user.id).all()
+            page = get_page_args()
+            status = request.args.get("status")
+            if status and status not in ENROLLMENT_REQUEST_STATUSES:
+                return {"error": f"status must be one of: {', '.join(ENROLLMENT_REQUEST_STATUSES)}"}, 400
+            
+            # The student's requests with the course name from the same query
+            query = db.session.query(
+                EnrollmentRequest.id,
+                EnrollmentRequest.course_id,
+                EnrollmentRequest.message,
+                EnrollmentRequest.status,
+                EnrollmentRequest.created_at,
+                Course.name.label("course_name")
+            ).outerjoin(
+                Course, Course.id == EnrollmentRequest.course_id
+            ).filter(
+                EnrollmentRequest.student_id == current_user.id
+            )
+            if status:
+                query = query.filter(EnrollmentRequest.status == status)
+            requests, next_cursor = paginate(query, [EnrollmentRequest.id], page, key=lambda req: (req.id,))
             
             requests_data = []
             for req in requests:
-                course = Course.query.get(req.course_id)
                 requests_data.append({
                     "id": req.id,
                     "course_id": req.course_id,
-                    "course_name": course.name if course else "Unknown",
+                    "course_name": req.course_name or "Unknown",
                     "message": req.message,
                     "status": req.status,
                     "created_at": req.created_at.isoformat()
                 })
             
-            return {"enrollment_requests": requests_data}, 200
+            return page_response(page, next_cursor, query, enrollment_requests=requests_data), 200
+        except InvalidPageError as e:
+            return {"error": str(e)}, 400
         except Exception as e:
             return {"error": f"Failed to get enrollment requests: {str(e)}"}, 500
 
@@ -86,31 +111,52 @@ class InstructorEnrollmentRequestsResource(Resource):
             if not current_user.is_instructor:
                 return {"error": "Only instructors can access this resource"}, 403
             
-            # Get all courses created by the instructor
-            instructor_courses = Course.query.filter_by(creator_user_id=current_user.id).all()
-            course_ids = [course.id for course in instructor_courses]
+            page = get_page_args()
+            status = request.args.get("status")
+            if status and status not in ENROLLMENT_REQUEST_STATUSES:
+                return {"error": f"status must be one of: {', '.join(ENROLLMENT_REQUEST_STATUSES)}"}, 400
             
-            # Get all enrollment requests for these courses
-            requests = EnrollmentRequest.query.filter(EnrollmentRequest.course_id.in_(course_ids)).all()
+            # Requests for the instructor's courses, with the student and course in the same query
+            query = db.session.query(
+                EnrollmentRequest.id,
+                EnrollmentRequest.student_id,
+                EnrollmentRequest.course_id,
+                EnrollmentRequest.message,
+                EnrollmentRequest.status,
+                EnrollmentRequest.created_at,
+                User.fname,
+                User.lname,
+                User.email,
+                Course.name.label("course_name")
+            ).join(
+                Course, Course.id == EnrollmentRequest.course_id
+            ).join(
+                User, User.id == EnrollmentRequest.student_id
+            ).filter(
+                Course.creator_user_id == current_user.id
+            )
+            if status:
+                # Served by the (course_id, status) index
+                query = query.filter(EnrollmentRequest.status == status)
+            requests, next_cursor = paginate(query, [EnrollmentRequest.id], page, key=lambda req: (req.id,))
             
             requests_data = []
             for req in requests:
-                student = User.query.get(req.student_id)
-                course = Course.query.get(req.course_id)
-                
                 requests_data.append({
                     "id": req.id,
                     "student_id": req.student_id,
-                    "student_name": f"{student.fname} {student.lname}" if student else "Unknown",
-                    "student_email": student.email if student else "Unknown",
+                    "student_name": f"{req.fname} {req.lname}",
+                    "student_email": req.email,
                     "course_id": req.course_id,
-                    "course_name": course.name if course else "Unknown",
+                    "course_name": req.course_name,
                     "message": req.message,
                     "status": req.status,
                     "created_at": req.created_at.isoformat()
                 })
             
-            return {"enrollment_requests": requests_data}, 200
+            return page_response(page, next_cursor, query, enrollment_requests=requests_data), 200
+        except InvalidPageError as e:
+            return {"error": str(e)}, 400
         except Exception as e:
             return {"error": f"Failed to get enrollment requests: {str(e)}"}, 500
 
@@ -165,4 +211,83 @@ class EnrollmentRequestActionResource(Resource):
             return {"message": message}, 200
         except Exception as e:
             db.session.rollback()
-            return {"error": f"Failed to process enrollment request: {str(e)}"}, 500
\ No newline at end of file
+            return {"error": f"Failed to process enrollment request: {str(e)}"}, 500
+
+class EnrollmentRequestBulkActionResource(Resource):
+    @login_required
+    def post(self):
+        """
+        Approve or reject many enrollment requests at once, given either their
+        ids or a course whose pending requests should all be handled.
+        """
+        try:
+            if not current_user.is_instructor:
+                return {"error": "Only instructors can perform this action"}, 403
+            
+            data = request.get_json()
+            if not data:
+                return {"error": "No data provided"}, 400
+            
+            action = data.get("action")
+            if action not in ["approve", "reject"]:
+                return {"error": "Invalid action. Must be 'approve' or 'reject'"}, 400
+            
+            request_ids = data.get("request_ids")
+            course_id = data.get("course_id")
+            if request_ids is not None:
+                if (not isinstance(request_ids, list) or not request_ids
+                        or not all(isinstance(request_id, int) for request_id in request_ids)):
+                    return {"error": "request_ids must be a non-empty list of ids"}, 400
+                request_ids = set(request_ids)
+                
+                # Ownership of every request checked with one query
+                owners = dict(db.session.query(EnrollmentRequest.id, Course.creator_user_id).join(
+                    Course, Course.id == EnrollmentRequest.course_id
+                ).filter(EnrollmentRequest.id.in_(request_ids)).all())
+                missing = sorted(request_ids - owners.keys())
+                if missing:
+                    return {"error": "Enrollment requests not found", "request_ids": missing}, 404
+                if any(owner != current_user.id for owner in owners.values()):
+                    return {"error": "You don't have permission to manage these enrollment requests"}, 403
+                
+                selected = EnrollmentRequest.id.in_(request_ids)
+            elif course_id is not None:
+                course = Course.query.get(course_id)
+                if not course:
+                    return {"error": "Course not found"}, 404
+                if course.creator_user_id != current_user.id:
+                    return {"error": "You don't have permission to manage this enrollment request"}, 403
+                
+                selected = and_(EnrollmentRequest.course_id == course_id, EnrollmentRequest.status == "pending")
+            else:
+                return {"error": "Either request_ids or course_id is required"}, 400
+            
+            enrolled = 0
+            if action == "approve":
+                # Enroll every selected student with one INSERT .. SELECT, skipping existing enrollments
+                existing = db.session.query(Enrollment.id).filter(
+                    Enrollment.student_id == EnrollmentRequest.student_id,
+                    Enrollment.course_id == EnrollmentRequest.course_id
+                ).exists()
+                enrolled = db.session.execute(insert(Enrollment).from_select(
+                    ["student_id", "course_id"],
+                    select(EnrollmentRequest.student_id, EnrollmentRequest.course_id).where(
+                        selected, ~existing
+                    ).distinct()
+                )).rowcount
+            
+            status = "approved" if action == "approve" else "rejected"
+            updated = db.session.execute(
+                update(EnrollmentRequest).where(selected).values(status=status),
+                execution_options={"synchronize_session": False}
+            ).rowcount
+            db.session.commit()
+            
+            return {
+                "message": f"{updated} enrollment requests {status}",
+                "updated": updated,
+                "enrolled": enrolled
+            }, 200
+        except Exception as e:
+            db.session.rollback()
+            return {"error": f"Failed to process enrollment requests: {str(e)}"}, 500
@@ -0,0 +1,19 @@
+from flask_restful import Resource
+from flask_login import login_required, current_user
+from models import db, BackgroundJob
+from services.jobs import serialize_job
+
+class JobStatusResource(Resource):
+    @login_required
+    def get(self, job_id):
+        try:
+            job = db.session.get(BackgroundJob, job_id)
+            if not job:
+                return {'error': 'Job not found'}, 404
+
+            if job.created_by != current_user.id:
+                return {'error': 'You do not have access to this job'}, 403
+
+            return {'job': serialize_job(job)}, 200
+        except Exception as e:
+            return {'error': f'Failed to get job: {str(e)}'}, 500
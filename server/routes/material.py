@@ -3,15 +3,24 @@ from flask_restful import Resource
 from models import db, Material, Week
 from flask_login import login_required, current_user
 import os
-import torch
-import whisper
-from fpdf import FPDF
 from werkzeug.utils import secure_filename
+from services.course_cache import bump_course_version
+from services.material_text import refresh_material_text
+from services.summaries import invalidate_material_summaries
+from services.answer_cache import answer_cache
+from services.jobs import enqueue_job
+from services.transcription import transcription_models
 
 UPLOAD_FOLDER = "uploads/materials"
-TRANSCRIPT_FOLDER = "uploads/transcripts"
 ALLOWED_EXTENSIONS = {"pdf", "mp4", "jpg", "png", "txt"}
 
+def enqueue_transcription(material, video_path):
+    return enqueue_job("transcribe_material", {
+        "material_id": material.id,
+        "file_path": material.file_path,
+        "video_path": video_path
+    }, user_id=current_user.id)
+
 class MaterialResource(Resource):
     def get(self, material_id):
         try:
@@ -78,20 +87,16 @@ class MaterialCreateResource(Resource):
             new_material.file_path = f"/uploads/materials/{material_filename}"
             new_material.filename = material_filename
             
-            transcript_file_path = None
+            transcription_job = None
 
-            # If the uploaded file is a video, generate transcript
+            # If the uploaded file is a video, transcribe it in the background
             if file_ext == "mp4":
-                if not os.path.exists(TRANSCRIPT_FOLDER):
-                    os.makedirs(TRANSCRIPT_FOLDER)
+                transcription_job = enqueue_transcription(new_material, new_material_path)
 
-                transcript_text = self.generate_transcript(new_material_path)
-                if transcript_text:
-                    transcript_filename = f"{new_material.id}.pdf"
-                    transcript_file_path = os.path.join(TRANSCRIPT_FOLDER, transcript_filename)
-                    self.save_transcript_as_pdf(transcript_text, transcript_file_path)
-                    new_material.transcript_path = f"/uploads/transcripts/{transcript_filename}"
+            # Extract the text once here so the AI endpoints never have to parse the file
+            refresh_material_text(new_material)
 
+            bump_course_version(week.course_id)
             db.session.commit()
 
             return {
@@ -100,34 +105,14 @@ class MaterialCreateResource(Resource):
                     'id': new_material.id,
                     'name': new_material.name,
                     'duration': new_material.duration,
-                    'transcript_path': new_material.transcript_path if transcript_file_path else None
+                    'transcript_path': new_material.transcript_path,
+                    'transcription_job_id': transcription_job.id if transcription_job else None
                 }
             }, 201
         except Exception as e:
             db.session.rollback()
             return {'error': f'Failed to create material: {str(e)}'}, 500
 
-    def generate_transcript(self, video_path):
-        try:
-            device = "cuda" if torch.cuda.is_available() else "cpu"
-            model = whisper.load_model("base", device=device)  # Load Whisper model on GPU if available
-            result = model.transcribe(video_path)
-            return result["text"]
-        except Exception as e:
-            print(f"Error in transcription: {str(e)}")
-            return None
-
-    def save_transcript_as_pdf(self, text, pdf_path):
-        try:
-            pdf = FPDF()
-            pdf.set_auto_page_break(auto=True, margin=15)
-            pdf.add_page()
-            pdf.set_font("Arial", size=12)
-            pdf.multi_cell(0, 10, text)
-            pdf.output(pdf_path)
-        except Exception as e:
-            print(f"Error saving transcript PDF: {str(e)}")
-
 class MaterialDeleteResource(Resource):
     @login_required
     def delete(self, material_id):
@@ -147,6 +132,7 @@ class MaterialDeleteResource(Resource):
                 return {'error': 'User is not the creator of the course'}, 403
             
             db.session.delete(material)
+            bump_course_version(week.course_id)
             db.session.commit()
             
             return {'message': 'Material deleted'}, 200
@@ -173,6 +159,7 @@ class MaterialEditResource(Resource):
                 return {'error': 'User is not the creator of the course'}, 403
             
             data = request.form
+            transcription_job = None
             
             # Check if title is provided (frontend sends title instead of name)
             if 'title' in data:
@@ -222,18 +209,17 @@ class MaterialEditResource(Resource):
                 material.file_path = f"/uploads/materials/{material_filename}"
                 material.filename = material_filename
                 
-                # Generate transcript for video files
+                # Transcribe video files in the background, the old transcript no longer applies
                 if file_ext == "mp4":
-                    if not os.path.exists(TRANSCRIPT_FOLDER):
-                        os.makedirs(TRANSCRIPT_FOLDER)
+                    material.transcript_path = None
+                    transcription_job = enqueue_transcription(material, new_material_path)
 
-                    transcript_text = self.generate_transcript(new_material_path)
-                    if transcript_text:
-                        transcript_filename = f"{material.id}.pdf"
-                        transcript_file_path = os.path.join(TRANSCRIPT_FOLDER, transcript_filename)
-                        self.save_transcript_as_pdf(transcript_text, transcript_file_path)
-                        material.transcript_path = f"/uploads/transcripts/{transcript_filename}"
+                # The file was replaced, re-extract its text (skipped if the content is identical)
+                refresh_material_text(material)
+                invalidate_material_summaries(material.id)
+                answer_cache.invalidate(material.id)
             
+            bump_course_version(week.course_id)
             db.session.commit()
             
             return {
@@ -243,31 +229,21 @@ class MaterialEditResource(Resource):
                     'title': material.name,  # Return as title for frontend compatibility
                     'description': '',  # Default empty description
                     'file_url': material.file_path,
-                    'transcript_url': material.transcript_path
+                    'transcript_url': material.transcript_path,
+                    'transcription_job_id': transcription_job.id if transcription_job else None
                 }
             }, 200
         except Exception as e:
             db.session.rollback()
             return {'error': f'Failed to update material: {str(e)}'}, 500
-            
-    def generate_transcript(self, video_path):
-        try:
-            device = "cuda" if torch.cuda.is_available() else "cpu"
-            model = whisper.load_model("base", device=device)  # Load Whisper model on GPU if available
-            result = model.transcribe(video_path)
-            return result["text"]
-        except Exception as e:
-            print(f"Error in transcription: {str(e)}")
-            return None
 
-    def save_transcript_as_pdf(self, text, pdf_path):
+class TranscriptionStatsResource(Resource):
+    @login_required
+    def get(self):
         try:
-            pdf = FPDF()
-            pdf.set_auto_page_break(auto=True, margin=15)
-            pdf.add_page()
-            pdf.set_font("Arial", size=12)
-            pdf.multi_cell(0, 10, text)
-            pdf.output(pdf_path)
+            if not current_user.is_instructor:
+                return {'error': 'User is not an instructor'}, 403
+
+            return {'transcription': transcription_models.get_stats()}, 200
         except Exception as e:
-            print(f"Error saving transcript PDF: {str(e)}")
-            return None
+            return {'error': f'Failed to get transcription stats: {str(e)}'}, 500
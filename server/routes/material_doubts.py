@@ -1,7 +1,8 @@
 from flask import request
 from flask_restful import Resource
 from flask_login import login_required, current_user
-from models import db, MaterialDoubt, Material, Week, Course
+from models import db, MaterialDoubt, Material, Week, Course, User
+from services.pagination import get_page_args, paginate, page_response, InvalidPageError
 from sqlalchemy import func, desc
 
 class MaterialDoubtCreateResource(Resource):
@@ -42,19 +43,34 @@ class MaterialDoubtsResource(Resource):
             if not material:
                 return {'error': 'Material not found'}, 404
             
-            # Get all doubts for this material
-            doubts = MaterialDoubt.query.filter_by(material_id=material_id).all()
+            # Doubts of this material with the student's name from the same query
+            page = get_page_args()
+            query = db.session.query(
+                MaterialDoubt.id,
+                MaterialDoubt.student_id,
+                MaterialDoubt.doubt_text,
+                MaterialDoubt.created_at,
+                User.fname,
+                User.lname
+            ).join(
+                User, User.id == MaterialDoubt.student_id
+            ).filter(
+                MaterialDoubt.material_id == material_id
+            )
+            doubts, next_cursor = paginate(query, [MaterialDoubt.id], page, key=lambda doubt: (doubt.id,))
             
             # Format doubts data
             doubts_data = [{
                 'id': doubt.id,
                 'student_id': doubt.student_id,
-                'student_name': doubt.student.name if hasattr(doubt.student, 'name') else 'Unknown',
+                'student_name': f"{doubt.fname} {doubt.lname}",
                 'doubt_text': doubt.doubt_text,
                 'created_at': doubt.created_at.isoformat()
             } for doubt in doubts]
             
-            return {'material_id': material_id, 'doubts': doubts_data}, 200
+            return page_response(page, next_cursor, query, material_id=material_id, doubts=doubts_data), 200
+        except InvalidPageError as e:
+            return {'error': str(e)}, 400
         except Exception as e:
             return {'error': f'Failed to retrieve doubts: {str(e)}'}, 500
 
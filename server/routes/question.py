@@ -1,7 +1,14 @@
 from flask import request
 from flask_restful import Resource, reqparse
 from flask_login import login_required, current_user
-from models import db, Question, Assignment
+from models import db, Question, Assignment, Course
+from services.course_cache import bump_course_version
+from services.hints import enqueue_hint_generation, get_stored_hint
+from services.pregeneration import enqueue_hint_pregeneration
+from services.grading import answer_keys, regrade_assignment
+from services.question_import import (
+    QuestionImportError, read_csv_rows, read_json_rows, validate_question_rows, insert_questions
+)
 
 class QuestionCreateResource(Resource):
     parser = reqparse.RequestParser()
@@ -36,9 +43,14 @@ class QuestionCreateResource(Resource):
                 assignment_id=assignment_id
             )
             db.session.add(new_question)
+            db.session.flush()
+            bump_course_version(assignment.week.course_id)
+            answer_keys.invalidate(assignment_id)
+            # Generate the hint now, so students never wait for it
+            hint_job = enqueue_hint_generation([new_question.id], current_user.id)
             db.session.commit()
 
-            return {"message": "Question created", "question": {
+            return {"message": "Question created", "hint_job_id": hint_job.id if hint_job else None, "question": {
                 "id": new_question.id,
                 "question_description": new_question.description,
                 "option1": new_question.option1,
@@ -54,6 +66,54 @@ class QuestionCreateResource(Resource):
             return {"error": f"Failed to create question: {str(e)}"}, 500
 
 
+class QuestionImportResource(Resource):
+    @login_required
+    def post(self, assignment_id):
+        """Import many questions at once from a JSON list or an uploaded CSV file"""
+        try:
+            if not current_user.is_instructor:
+                return {"error": "Access denied. Only instructors can add questions."}, 403
+
+            assignment = Assignment.query.get(assignment_id)
+            if not assignment:
+                return {"error": "Invalid assignment_id"}, 404
+
+            course = Course.query.get(assignment.week.course_id)
+            if course.creator_user_id != current_user.id:
+                return {"error": "User is not the creator of the course"}, 403
+
+            try:
+                if "file" in request.files:
+                    rows = read_csv_rows(request.files["file"].read())
+                elif request.mimetype == "text/csv":
+                    rows = read_csv_rows(request.get_data())
+                else:
+                    rows = read_json_rows(request.get_json(silent=True))
+                values, errors = validate_question_rows(rows, assignment_id)
+            except QuestionImportError as e:
+                return {"error": str(e)}, 400
+
+            # All or nothing, so a fixed file can simply be uploaded again
+            if errors:
+                return {"error": "Invalid questions, nothing was imported", "errors": errors}, 400
+
+            question_ids = insert_questions(values)
+            bump_course_version(course.id)
+            answer_keys.invalidate(assignment_id)
+            hint_job = enqueue_hint_pregeneration(course.id, current_user.id)
+            db.session.commit()
+
+            return {
+                "message": f"{len(question_ids)} questions imported",
+                "question_ids": question_ids,
+                "hint_job_id": hint_job.id if hint_job else None
+            }, 201
+
+        except Exception as e:
+            db.session.rollback()
+            return {"error": f"Failed to import questions: {str(e)}"}, 500
+
+
 class QuestionListResource(Resource):
     @login_required
     def get(self, assignment_id):
@@ -79,6 +139,63 @@ class QuestionListResource(Resource):
             return {"error": f"Failed to get questions: {str(e)}"}, 500
 
 
+class QuestionEditResource(Resource):
+    @login_required
+    def put(self, question_id):
+        try:
+            if not current_user.is_instructor:
+                return {"error": "Access denied. Only instructors can edit questions."}, 403
+
+            question = Question.query.get(question_id)
+            if not question:
+                return {"error": "Invalid question_id"}, 404
+
+            course = Course.query.get(question.question.week.course_id)
+            if course.creator_user_id != current_user.id:
+                return {"error": "User is not the creator of the course"}, 403
+
+            data = request.form
+            key_changed = False
+            if "correct_option" in data:
+                if data["correct_option"] not in ["1", "2", "3", "4"]:
+                    return {"error": "Correct option must be between 1 and 4"}, 400
+                key_changed = question.correct_option != int(data["correct_option"])
+                question.correct_option = int(data["correct_option"])
+            if "question_description" in data:
+                question.description = data["question_description"]
+            for field in ["option1", "option2", "option3", "option4"]:
+                if field in data:
+                    setattr(question, field, data[field])
+
+            bump_course_version(course.id)
+            answer_keys.invalidate(question.assignment_id)
+            # A corrected answer key applies to the submissions already graded
+            regraded = None
+            if key_changed:
+                db.session.flush()
+                regraded = regrade_assignment(question.assignment_id)
+            # The hint only has to be regenerated if the text or the options changed
+            hint_job = None
+            if get_stored_hint(question) is None:
+                hint_job = enqueue_hint_generation([question.id], current_user.id)
+            db.session.commit()
+
+            return {"message": "Question updated", "hint_job_id": hint_job.id if hint_job else None, "regraded": regraded, "question": {
+                "id": question.id,
+                "question_description": question.description,
+                "option1": question.option1,
+                "option2": question.option2,
+                "option3": question.option3,
+                "option4": question.option4,
+                "correct_option": question.correct_option,
+                "assignment_id": question.assignment_id
+            }}, 200
+
+        except Exception as e:
+            db.session.rollback()
+            return {"error": f"Failed to update question: {str(e)}"}, 500
+
+
 class QuestionDeleteResource(Resource):
     @login_required
     def delete(self, question_id):
@@ -90,6 +207,8 @@ class QuestionDeleteResource(Resource):
             if not question:
                 return {"error": "Invalid question_id"}, 404
 
+            bump_course_version(question.question.week.course_id)
+            answer_keys.invalidate(question.assignment_id)
             db.session.delete(question)
             db.session.commit()
             return {"message": "Question deleted"}, 200
@@ -2,7 +2,8 @@ from flask import request, jsonify
 from flask_restful import Resource
 from models import db, Review, Material, Week, Course, User
 from flask_login import login_required, current_user
-from sqlalchemy import and_
+from sqlalchemy import and_, func
+from services.pagination import get_page_args, paginate, page_response, InvalidPageError
 
 class ReviewResource(Resource):
     @login_required
@@ -66,6 +67,58 @@ class ReviewDeleteResource(Resource):
             db.session.rollback()
             return {'error': f'Failed to delete review: {str(e)}'}, 500
 
+class InvalidFilterError(ValueError):
+    """Raised for a bad course_id or rating filter, reported to the client as a 400"""
+
+def get_int_arg(name):
+    """Integer query argument ``name`` or None, parsed strictly like limit rather than with type=int"""
+    value = request.args.get(name)
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise InvalidFilterError(f'{name} must be an integer')
+
+def instructor_review_filters():
+    """Filters of the instructor's reviews from the query string, raising InvalidFilterError if they are invalid"""
+    filters = [Course.creator_user_id == current_user.id]
+    course_id = get_int_arg('course_id')
+    if course_id is not None:
+        filters.append(Course.id == course_id)
+    rating = get_int_arg('rating')
+    if rating is not None:
+        if rating < 1 or rating > 5:
+            raise InvalidFilterError('Rating must be between 1 and 5')
+        filters.append(Review.rating == rating)
+    return filters
+
+def paginate_material_ratings(filters, page):
+    """One page of (review count, average rating) per reviewed material, with the next cursor"""
+    query = db.session.query(
+        Material.id,
+        Material.name,
+        Course.id.label('course_id'),
+        func.count(Review.id).label('review_count'),
+        func.avg(Review.rating).label('average_rating')
+    ).join(
+        Review, Review.material_id == Material.id
+    ).join(
+        Week, Week.id == Material.week_id
+    ).join(
+        Course, Course.id == Week.course_id
+    ).filter(*filters).group_by(
+        Material.id
+    )
+    material_ratings, next_cursor = paginate(query, [Material.id], page, key=lambda material: (material.id,))
+    return [{
+        'material_id': material.id,
+        'material_name': material.name,
+        'course_id': material.course_id,
+        'review_count': material.review_count,
+        'average_rating': round(material.average_rating, 2) if material.average_rating is not None else None
+    } for material in material_ratings], next_cursor
+
 class InstructorReviewsResource(Resource):
     @login_required
     def get(self):
@@ -73,60 +126,80 @@ class InstructorReviewsResource(Resource):
             if not current_user.is_instructor:
                 return {'error': 'Access denied. Only instructors can access this endpoint'}, 403
             
-            # Find all courses created by the current instructor
-            instructor_courses = Course.query.filter_by(creator_user_id=current_user.id).all()
-            
-            if not instructor_courses:
-                return {'message': 'No courses found for this instructor', 'reviews': []}, 200
-            
-            course_ids = [course.id for course in instructor_courses]
-            
-            # Find all weeks in these courses
-            weeks = Week.query.filter(Week.course_id.in_(course_ids)).all()
-            
-            if not weeks:
-                return {'message': 'No weeks found in instructor courses', 'reviews': []}, 200
-            
-            week_ids = [week.id for week in weeks]
-            
-            # Find all materials in these weeks
-            materials = Material.query.filter(Material.week_id.in_(week_ids)).all()
-            
-            if not materials:
-                return {'message': 'No materials found in instructor courses', 'reviews': []}, 200
-            
-            material_ids = [material.id for material in materials]
-            
-            # Find all reviews for these materials
-            reviews = Review.query.filter(Review.material_id.in_(material_ids)).all()
+            page = get_page_args()
+            
+            # Optional filters, applied to the reviews and to the per-material aggregates
+            filters = instructor_review_filters()
+            
+            # Reviews of materials in the instructor's courses, with the reviewer, material and course joined in
+            query = db.session.query(
+                Review.id,
+                Review.rating,
+                Review.comment,
+                Review.user_id,
+                User.fname,
+                User.lname,
+                User.image,
+                Review.material_id,
+                Material.name.label('material_name'),
+                Course.id.label('course_id'),
+                Course.name.label('course_name')
+            ).join(
+                Material, Material.id == Review.material_id
+            ).join(
+                Week, Week.id == Material.week_id
+            ).join(
+                Course, Course.id == Week.course_id
+            ).join(
+                User, User.id == Review.user_id
+            ).filter(*filters)
+            reviews, next_cursor = paginate(query, [Review.id], page, key=lambda review: (review.id,))
             
-            if not reviews:
-                return {'message': 'No reviews found for instructor materials', 'reviews': []}, 200
-            
-            # Get user information for each review
             review_data = []
             for review in reviews:
-                user = User.query.get(review.user_id)
-                material = Material.query.get(review.material_id)
-                week = Week.query.get(material.week_id)
-                course = Course.query.get(week.course_id)
-                
-                review_info = {
+                review_data.append({
                     'id': review.id,
                     'rating': review.rating,
                     'comment': review.comment,
                     'user_id': review.user_id,
-                    'username': f"{user.fname} {user.lname}" if user else "Unknown User",
-                    'user_image': user.image,
+                    'username': f"{review.fname} {review.lname}",
+                    'user_image': review.image,
                     'material_id': review.material_id,
-                    'material_name': material.name if material else "Unknown Material",
-                    'course_id': course.id if course else None,
-                    'course_name': course.name if course else "Unknown Course"
-                }
-                review_data.append(review_info)
+                    'material_name': review.material_name,
+                    'course_id': review.course_id,
+                    'course_name': review.course_name
+                })
+            
+            response = page_response(page, next_cursor, query, reviews=review_data)
+            
+            # Review count and average rating of the reviewed materials, sent with the first
+            # page only and capped like the reviews; the rest are paged at /review/instructor/materials
+            if page.cursor is None:
+                materials, materials_next_cursor = paginate_material_ratings(filters, page)
+                response['materials'] = materials
+                response['materials_next_cursor'] = materials_next_cursor
             
-            return {'reviews': review_data}, 200
+            return response, 200
         
+        except (InvalidPageError, InvalidFilterError) as e:
+            return {'error': str(e)}, 400
         except Exception as e:
             return {'error': f'Failed to retrieve instructor reviews: {str(e)}'}, 500
 
+class InstructorReviewMaterialsResource(Resource):
+    @login_required
+    def get(self):
+        try:
+            if not current_user.is_instructor:
+                return {'error': 'Access denied. Only instructors can access this endpoint'}, 403
+            
+            page = get_page_args()
+            filters = instructor_review_filters()
+            
+            materials, next_cursor = paginate_material_ratings(filters, page)
+            return page_response(page, next_cursor, materials=materials), 200
+        
+        except (InvalidPageError, InvalidFilterError) as e:
+            return {'error': str(e)}, 400
+        except Exception as e:
+            return {'error': f'Failed to retrieve review aggregates: {str(e)}'}, 500
@@ -1,15 +1,17 @@
+import json
 from flask import request
 from flask_restful import Resource
 from flask_login import login_required, current_user
-from models import db, Assignment, Question, Score
+from models import db, Assignment, Score
+from services.grading import answer_keys, get_answer_key, normalize_answers
 
 class AssignmentSubmissionResource(Resource):
     @login_required
     def post(self, assignment_id):
         try:
-            # Check if assignment exists
-            assignment = Assignment.query.get(assignment_id)
-            if not assignment:
+            # The cached answer key, which also tells whether the assignment exists
+            answer_key = get_answer_key(assignment_id)
+            if answer_key is None:
                 return {'error': 'Assignment not found'}, 404
             
             # Get the submitted answers from the request
@@ -17,15 +19,16 @@ class AssignmentSubmissionResource(Resource):
             if not data or 'answers' not in data:
                 return {'error': 'No answers provided'}, 400
             
-            submitted_answers = data['answers']
-            
-            # Get all questions for this assignment
-            questions = Question.query.filter_by(assignment_id=assignment_id).all()
-            if not questions:
+            total_questions = len(answer_key)
+            if not total_questions:
                 return {'error': 'No questions found for this assignment'}, 404
             
+            # Options are normalized first, so "3" and 3 are the same answer
+            answers = normalize_answers(data['answers'])
+            correct_count = answer_key.grade(answers)
+            
             # Check if the student has already submitted this assignment
-            existing_submission = Score.query.filter_by(
+            existing_submission = db.session.query(Score.id).filter_by(
                 student_id=current_user.id,
                 assignment_id=assignment_id
             ).first()
@@ -33,26 +36,16 @@ class AssignmentSubmissionResource(Resource):
             if existing_submission:
                 return {'error': 'You have already submitted this assignment'}, 400
             
-            # Evaluate the answers
-            correct_count = 0
-            total_questions = len(questions)
-            
-            for question in questions:
-                question_id = str(question.id)
-                if question_id in submitted_answers:
-                    # For MCQ, check if the selected option matches the correct option
-                    if submitted_answers[question_id] == question.correct_option:
-                        correct_count += 1
-            
             # Calculate score as a percentage
-            score_percentage = (correct_count / total_questions) * 100 if total_questions > 0 else 0
+            score_percentage = (correct_count / total_questions) * 100
             
-            # Create a new score record
+            # Create a new score record, keeping the answers for regrading
             new_score = Score(
                 student_id=current_user.id,
                 assignment_id=assignment_id,
                 score=correct_count,
-                max_score=total_questions
+                max_score=total_questions,
+                answers=json.dumps(answers)
             )
             
             db.session.add(new_score)
@@ -99,4 +92,15 @@ class AssignmentScoreResource(Resource):
             }, 200
             
         except Exception as e:
-            return {'error': f'Failed to retrieve score: {str(e)}'}, 500
\ No newline at end of file
+            return {'error': f'Failed to retrieve score: {str(e)}'}, 500
+
+class AnswerKeyCacheStatsResource(Resource):
+    @login_required
+    def get(self):
+        try:
+            if not current_user.is_instructor:
+                return {'error': 'User is not an instructor'}, 403
+            
+            return {'answer_key_cache': answer_keys.get_stats()}, 200
+        except Exception as e:
+            return {'error': f'Failed to get answer key cache stats: {str(e)}'}, 500
@@ -2,6 +2,7 @@ from flask import request
 from flask_restful import Resource
 from flask_login import login_required, current_user
 from models import db, User
+from services.pagination import get_page_args, paginate, page_response, InvalidPageError
 from werkzeug.utils import secure_filename
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime
@@ -100,12 +101,17 @@ class UserStudentListResource(Resource):
             if not current_user.is_instructor:
                 return {'error': 'Access denied. Only instructors can view students'}, 403
             
-            students = User.query.filter_by(is_instructor=False).all()
+            page = get_page_args()
+            query = db.session.query(
+                User.id, User.email, User.fname, User.lname, User.is_instructor, User.image,
+                User.dob, User.phone, User.gender, User.about
+            ).filter_by(is_instructor=False)
+            students, next_cursor = paginate(query, [User.id], page, key=lambda student: (student.id,))
             students_data = [get_user_data(student) for student in students]
             
-            return {
-                'students': students_data
-            }, 200
+            return page_response(page, next_cursor, query, students=students_data), 200
+        except InvalidPageError as e:
+            return {'error': str(e)}, 400
         except Exception as e:
             return {'error': f'Failed to get students: {str(e)}'}, 500
 
@@ -2,6 +2,7 @@ from flask import request
 from flask_restful import Resource
 from models import db, Week, Course
 from flask_login import login_required, current_user
+from services.course_cache import bump_course_version
 
 class WeekResource(Resource):
     def get(self, week_id):
@@ -50,6 +51,7 @@ class WeekCreateResource(Resource):
             )
 
             db.session.add(new_week)
+            bump_course_version(course_id)
             db.session.commit()
 
             return {'message': 'Week created', 'week': {
@@ -78,6 +80,7 @@ class WeekDeletionResource(Resource):
                 return {'error': 'User is not the creator of the course'}, 403
 
             db.session.delete(week)
+            bump_course_version(week.course_id)
             db.session.commit()
             return {'message': 'Week deleted'}, 200
         except Exception as e:
@@ -116,6 +119,7 @@ class WeekEditResource(Resource):
                 return {'error': 'Week with this name already exists in the course'}, 400
 
             week.name = data['name']
+            bump_course_version(week.course_id)
             db.session.commit()
 
             return {'message': 'Week updated', 'week': {
@@ -0,0 +1,169 @@
+"""
+In-process cache of answers to student questions about a material.
+
+Questions are normalised (case, punctuation, whitespace) and looked up
+exactly first. On a miss the question is compared with the other cached
+questions of the same material that ask the same way (the same question words
+and negations) by the overlap of their word counts (weighted Jaccard). Only
+filler words are ignored, so "What is backpropagation?" and "Backpropagation,
+what is it?" share an answer, while "How is ..." and "Why is ...", or "What is
+a derivative?" and "What is the derivative of a derivative?", do not.
+
+Each material's bucket remembers the content hash it was filled for and is
+dropped as soon as a lookup sees a different hash, so a replaced file never
+serves stale answers, even from another process's cache.
+"""
+import re
+import threading
+import time
+from collections import Counter, OrderedDict
+
+MAX_MATERIALS = 512
+MAX_ENTRIES_PER_MATERIAL = 256
+
+DEFAULT_TTL = 24 * 3600  # seconds
+DEFAULT_SIMILARITY = 0.85
+
+WORD_PATTERN = re.compile(r"[a-z0-9]+")
+QUESTION_WORD_PATTERN = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+
+# Unlike the retrieval stop words these keep what a question asks and whether it is negated
+QUESTION_WORDS = frozenset("how what when where which who whom whose why".split())
+NEGATIONS = frozenset("no not never none nor without cannot".split())
+FILLER_WORDS = frozenset("""
+a an the is are was were be been do does did it its this that these those
+can could would please you your i me my
+""".split())
+
+def normalize_question(question):
+    return " ".join(WORD_PATTERN.findall(question.lower()))
+
+def question_tokens(question):
+    """Word counts of a question without filler words, with "isn't" and the like counted as not"""
+    tokens = Counter()
+    for word in QUESTION_WORD_PATTERN.findall(question.lower().replace("\u2019", "'")):
+        if word.endswith("n't"):
+            word = "not"
+        word = word.split("'")[0]
+        if word not in FILLER_WORDS:
+            tokens[word] += 1
+    return tokens
+
+def question_cues(tokens):
+    """The question words and negations of a question, which a similar question must share"""
+    return frozenset(token for token in tokens if token in QUESTION_WORDS or token in NEGATIONS)
+
+def token_similarity(first, second):
+    """Weighted Jaccard similarity of two word counts, 0 when they share no word"""
+    if not first or not second:
+        return 0.0
+    return sum((first & second).values()) / sum((first | second).values())
+
+class CachedAnswer:
+    def __init__(self, question, value):
+        self.question = question
+        self.value = value
+        self.tokens = question_tokens(question)
+        self.cues = question_cues(self.tokens)
+        self.created_at = time.monotonic()
+
+class MaterialAnswers:
+    """The cached answers of one material"""
+    def __init__(self, content_hash):
+        self.content_hash = content_hash
+        self.entries = OrderedDict()  # normalised question -> CachedAnswer, least recently used first
+
+    def remove(self, key):
+        self.entries.pop(key, None)
+
+    def add(self, key, entry):
+        self.entries.pop(key, None)
+        self.entries[key] = entry
+
+    def most_similar(self, tokens):
+        cues = question_cues(tokens)
+        best_key, best_similarity = None, 0.0
+        for key, entry in self.entries.items():
+            if entry.cues != cues:
+                continue
+            similarity = token_similarity(tokens, entry.tokens)
+            if similarity > best_similarity:
+                best_key, best_similarity = key, similarity
+        return best_key, best_similarity
+
+class AnswerCache:
+    def __init__(self, max_materials=MAX_MATERIALS, max_entries=MAX_ENTRIES_PER_MATERIAL):
+        self._lock = threading.Lock()
+        self._materials = OrderedDict()
+        self.max_materials = max_materials
+        self.max_entries = max_entries
+        self.stats = {
+            "exact_hits": 0,
+            "similar_hits": 0,
+            "misses": 0,
+            "expired": 0,
+            "evicted": 0,
+        }
+
+    def _bucket(self, material_id, content_hash):
+        bucket = self._materials.get(material_id)
+        if bucket is not None and bucket.content_hash != content_hash:
+            del self._materials[material_id]
+            bucket = None
+        if bucket is not None:
+            self._materials.move_to_end(material_id)
+        return bucket
+
+    def get(self, material_id, content_hash, question, ttl=DEFAULT_TTL, threshold=DEFAULT_SIMILARITY):
+        """Return the cached value for ``question`` or a near-identical one, else None."""
+        key = normalize_question(question)
+        with self._lock:
+            bucket = self._bucket(material_id, content_hash)
+            entry = bucket.entries.get(key) if bucket else None
+            hit = "exact_hits"
+            if entry is None and bucket and threshold and threshold < 1:
+                similar_key, similarity = bucket.most_similar(question_tokens(question))
+                if similar_key is not None and similarity >= threshold:
+                    entry, key, hit = bucket.entries[similar_key], similar_key, "similar_hits"
+
+            if entry is not None and ttl and time.monotonic() - entry.created_at > ttl:
+                bucket.remove(key)
+                self.stats["expired"] += 1
+                entry = None
+
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            bucket.entries.move_to_end(key)
+            self.stats[hit] += 1
+            return entry.value
+
+    def put(self, material_id, content_hash, question, value):
+        key = normalize_question(question)
+        with self._lock:
+            bucket = self._bucket(material_id, content_hash)
+            if bucket is None:
+                bucket = self._materials[material_id] = MaterialAnswers(content_hash)
+                while len(self._materials) > self.max_materials:
+                    _, dropped = self._materials.popitem(last=False)
+                    self.stats["evicted"] += len(dropped.entries)
+
+            bucket.add(key, CachedAnswer(question, value))
+            while len(bucket.entries) > self.max_entries:
+                bucket.remove(next(iter(bucket.entries)))
+                self.stats["evicted"] += 1
+
+    def invalidate(self, material_id):
+        with self._lock:
+            self._materials.pop(material_id, None)
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self.stats)
+            stats["materials"] = len(self._materials)
+            stats["entries"] = sum(len(bucket.entries) for bucket in self._materials.values())
+        lookups = stats["exact_hits"] + stats["similar_hits"] + stats["misses"]
+        stats["hit_rate"] = (stats["exact_hits"] + stats["similar_hits"]) / lookups if lookups else 0.0
+        return stats
+
+answer_cache = AnswerCache()
@@ -0,0 +1,62 @@
+"""
+Serialized snapshots of the course tree served by SingleCourseResource.
+
+Every resource that changes a course's weeks, materials, assignments or
+questions calls ``bump_course_version`` inside its transaction. Snapshots are
+keyed on that version, so a stale snapshot is never served and nothing has to
+be pushed to other processes: they simply miss and rebuild.
+"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from models import Course
+
+MAX_SNAPSHOTS = 256
+
+class CourseSnapshot:
+    def __init__(self, version, created_at, body):
+        self.version = version
+        self.created_at = created_at
+        self.body = body
+        self.etag = hashlib.sha1(body).hexdigest()
+
+class CourseSnapshotCache:
+    def __init__(self, max_snapshots=MAX_SNAPSHOTS):
+        self._lock = threading.Lock()
+        self._snapshots = OrderedDict()
+        self.max_snapshots = max_snapshots
+
+    def get(self, course):
+        with self._lock:
+            snapshot = self._snapshots.get(course.id)
+            # created_at guards against a deleted course's id being reused
+            if (snapshot is None or snapshot.version != course.content_version
+                    or snapshot.created_at != course.created_at):
+                return None
+            self._snapshots.move_to_end(course.id)
+            return snapshot
+
+    def store(self, course, data):
+        body = json.dumps(data).encode("utf-8") + b"\n"
+        snapshot = CourseSnapshot(course.content_version, course.created_at, body)
+        with self._lock:
+            self._snapshots[course.id] = snapshot
+            self._snapshots.move_to_end(course.id)
+            while len(self._snapshots) > self.max_snapshots:
+                self._snapshots.popitem(last=False)
+        return snapshot
+
+    def invalidate(self, course_id):
+        with self._lock:
+            self._snapshots.pop(course_id, None)
+
+course_snapshots = CourseSnapshotCache()
+
+def bump_course_version(course_id):
+    """Mark the course tree as changed. Runs in the caller's transaction, which must commit it."""
+    Course.query.filter_by(id=course_id).update(
+        {Course.content_version: Course.content_version + 1},
+        synchronize_session=False
+    )
+    course_snapshots.invalidate(course_id)
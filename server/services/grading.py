@@ -0,0 +1,233 @@
+"""
+Grading of multiple-choice submissions against compact answer keys.
+
+An assignment's answer key is two aligned numpy arrays, the question ids in
+ascending order and their correct options, so a submission is graded with a
+single vectorized comparison and a whole assignment can be regraded as one
+matrix. Submitted options are normalized first: 3, "3", " 3 " and 3.0 all
+mean option 3, and anything else counts as unanswered.
+
+Keys are kept in a bounded in-process LRU cache together with the course's
+``content_version``. Every change to questions bumps that version, so a
+cached key is never used after its assignment changed, in this process or in
+any other, and the resources changing questions also invalidate the key
+directly.
+"""
+import json
+import threading
+from collections import OrderedDict
+import numpy as np
+from sqlalchemy import bindparam, select, update
+from models import db, Assignment, Course, Question, Score, Week
+
+UNANSWERED = 0
+OPTION_COUNT = 4
+
+MAX_ANSWER_KEYS = 1024
+
+class AnswerKey:
+    def __init__(self, question_ids, correct_options):
+        self.question_ids = question_ids  # int64, ascending
+        self.correct_options = correct_options  # int8, aligned with question_ids
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Build a key from (question id, correct option) pairs"""
+        rows = sorted((int(question_id), normalize_option(option)) for question_id, option in rows)
+        return cls(
+            np.array([question_id for question_id, _ in rows], dtype=np.int64),
+            np.array([option for _, option in rows], dtype=np.int8)
+        )
+
+    def __len__(self):
+        return len(self.question_ids)
+
+    @property
+    def nbytes(self):
+        return self.question_ids.nbytes + self.correct_options.nbytes
+
+    def align(self, answers):
+        """Array of the submitted options in key order, UNANSWERED where a question was skipped"""
+        submitted = np.full(len(self), UNANSWERED, dtype=np.int8)
+        if not answers or not len(self):
+            return submitted
+        question_ids = np.fromiter(answers.keys(), dtype=np.int64, count=len(answers))
+        options = np.fromiter(answers.values(), dtype=np.int8, count=len(answers))
+        positions = np.searchsorted(self.question_ids, question_ids)
+        known = positions < len(self)
+        known[known] = self.question_ids[positions[known]] == question_ids[known]
+        submitted[positions[known]] = options[known]
+        return submitted
+
+    def grade(self, answers):
+        """Number of correct answers in ``answers`` ({question id: option}, normalized)"""
+        return int(np.count_nonzero(self.align(answers) == self.correct_options))
+
+    def grade_many(self, submissions):
+        """Correct answer counts of a (submissions x questions) matrix of aligned options"""
+        return np.count_nonzero(submissions == self.correct_options, axis=1)
+
+def normalize_option(value):
+    """The option number 1-4 that ``value`` stands for, or UNANSWERED"""
+    if isinstance(value, bool):
+        return UNANSWERED
+    if isinstance(value, str):
+        value = value.strip()
+        if not value.isdigit():
+            return UNANSWERED
+        value = int(value)
+    elif isinstance(value, float):
+        if not value.is_integer():
+            return UNANSWERED
+        value = int(value)
+    elif not isinstance(value, int):
+        return UNANSWERED
+    return value if 1 <= value <= OPTION_COUNT else UNANSWERED
+
+def normalize_answers(answers):
+    """{question id: option} with integer ids and options, dropping unparseable entries"""
+    normalized = {}
+    if not isinstance(answers, dict):
+        return normalized
+    for question_id, option in answers.items():
+        try:
+            question_id = int(question_id)
+        except (TypeError, ValueError):
+            continue
+        option = normalize_option(option)
+        if option != UNANSWERED:
+            normalized[question_id] = option
+    return normalized
+
+def load_answer_key(assignment_id):
+    """Read the answer key from the database, selecting only the two columns it needs"""
+    return AnswerKey.from_rows(db.session.query(Question.id, Question.correct_option).filter(
+        Question.assignment_id == assignment_id
+    ).all())
+
+# Built once: this runs on every submission, and constructing the statement
+# costs several times more than executing it
+KEY_VERSION_QUERY = select(Course.content_version, Assignment.created_at).join(
+    Week, Week.course_id == Course.id
+).join(
+    Assignment, Assignment.week_id == Week.id
+).where(Assignment.id == bindparam("assignment_id"))
+
+def get_key_version(assignment_id):
+    """
+    Version of an assignment's answer key: its course's content version, and
+    the assignment's creation time to tell apart a deleted assignment's reused
+    id. None if the assignment does not exist.
+    """
+    return db.session.execute(KEY_VERSION_QUERY, {"assignment_id": assignment_id}).first()
+
+class AnswerKeyCache:
+    """
+    Least recently used answer keys by assignment id, each stored with the
+    version it was loaded at. A lookup with any other version is a miss, so a
+    key changed by another process is reloaded; changes made in this process
+    also drop the key right away through ``invalidate``.
+    """
+    def __init__(self, max_keys=MAX_ANSWER_KEYS):
+        self._lock = threading.Lock()
+        self._keys = OrderedDict()  # assignment id -> (version, AnswerKey), least recently used first
+        self.max_keys = max_keys
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "stale": 0,
+            "invalidated": 0,
+            "evicted": 0,
+        }
+
+    def get(self, assignment_id, version):
+        with self._lock:
+            cached = self._keys.get(assignment_id)
+            if cached is not None and cached[0] != version:
+                del self._keys[assignment_id]
+                self.stats["stale"] += 1
+                cached = None
+            if cached is None:
+                self.stats["misses"] += 1
+                return None
+            self._keys.move_to_end(assignment_id)
+            self.stats["hits"] += 1
+            return cached[1]
+
+    def put(self, assignment_id, version, key):
+        with self._lock:
+            self._keys[assignment_id] = (version, key)
+            self._keys.move_to_end(assignment_id)
+            while len(self._keys) > self.max_keys:
+                self._keys.popitem(last=False)
+                self.stats["evicted"] += 1
+
+    def invalidate(self, assignment_id):
+        with self._lock:
+            if self._keys.pop(assignment_id, None) is not None:
+                self.stats["invalidated"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._keys.clear()
+            self.stats = dict.fromkeys(self.stats, 0)
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self.stats)
+            stats["keys"] = len(self._keys)
+            stats["questions"] = sum(len(key) for _, key in self._keys.values())
+            stats["bytes"] = sum(key.nbytes for _, key in self._keys.values())
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+answer_keys = AnswerKeyCache()
+
+def get_answer_key(assignment_id):
+    """
+    The answer key of an assignment, from the cache unless its course changed
+    since it was loaded, or None if the assignment does not exist. A cache hit
+    costs one single-row query instead of reading every question.
+    """
+    version = get_key_version(assignment_id)
+    if version is None:
+        return None
+    version = tuple(version)
+    key = answer_keys.get(assignment_id, version)
+    if key is None:
+        key = load_answer_key(assignment_id)
+        answer_keys.put(assignment_id, version, key)
+    return key
+
+def regrade_assignment(assignment_id):
+    """
+    Recompute every stored score of an assignment against its current answer
+    key, e.g. after a correct option was fixed. Scores submitted before answers
+    were stored cannot be regraded and are counted as skipped. Runs in the
+    caller's transaction.
+    """
+    key = load_answer_key(assignment_id)
+    scores = db.session.query(Score.id, Score.answers, Score.score, Score.max_score).filter(
+        Score.assignment_id == assignment_id
+    ).all()
+    stored = [score for score in scores if score.answers is not None]
+    counts = {"regraded": len(stored), "changed": 0, "skipped": len(scores) - len(stored)}
+    if not stored or not len(key):
+        counts["regraded"] = 0
+        counts["skipped"] = len(scores)
+        return counts
+
+    submissions = np.stack([key.align({int(question_id): option for question_id, option in json.loads(score.answers).items()})
+                            for score in stored])
+    correct = key.grade_many(submissions)
+    changes = [
+        {"id": score.id, "score": int(new_score), "max_score": len(key)}
+        for score, new_score in zip(stored, correct)
+        if score.score != new_score or score.max_score != len(key)
+    ]
+    if changes:
+        # Bulk UPDATE by primary key, one executemany
+        db.session.execute(update(Score), changes)
+    counts["changed"] = len(changes)
+    return counts
@@ -0,0 +1,84 @@
+"""
+Hints for assignment questions, generated once and stored on the question.
+
+A stored hint is valid while ``Question.hint_source_hash`` matches the hash of
+the question's current text, options and ``HINT_PROMPT_VERSION``; editing a
+question (or bumping the version after a prompt change) makes it stale.
+"""
+import hashlib
+import json
+from datetime import datetime
+from flask import current_app
+from google.genai import types
+from models import db, Question
+from services.jobs import job_handler, enqueue_job
+from services.llm import MODEL, generate_content
+
+HINT_PROMPT_VERSION = 1
+HINT_SYSTEM_INSTRUCTION = "You are an experienced teacher who gives hints about the correct answer without revealing it."
+
+def build_hint_prompt(question):
+    options = [question.option1, question.option2, question.option3, question.option4]
+    return f"Question: {question.description}\nOptions: {', '.join(options)}\nProvide hints without revealing the answer.\n\nDo not state the correct answer explicitly. Instead, provide logical reasoning and indirect clues to help the student figure it out."
+
+def hint_source_hash(question):
+    source = [HINT_PROMPT_VERSION, question.description,
+              question.option1, question.option2, question.option3, question.option4]
+    return hashlib.sha256(json.dumps(source).encode("utf-8")).hexdigest()
+
+def get_stored_hint(question):
+    """The stored hint of ``question`` if it was generated for its current text, else None"""
+    if question.hint and question.hint_source_hash == hint_source_hash(question):
+        return question.hint
+    return None
+
+def store_hint(question, hint, source_hash=None):
+    """
+    Attach ``hint`` to the question. Pass the ``source_hash`` taken when the
+    prompt was built if the question may have changed since. The caller is
+    responsible for committing the session.
+    """
+    question.hint = hint
+    question.hint_source_hash = source_hash or hint_source_hash(question)
+    question.hint_generated_at = datetime.now()
+
+def complete_hint(prompt):
+    response = generate_content(
+        model=MODEL,
+        config=types.GenerateContentConfig(system_instruction=HINT_SYSTEM_INSTRUCTION),
+        contents=prompt,
+    )
+    return response.text.strip()
+
+def generate_hint(question):
+    return complete_hint(build_hint_prompt(question))
+
+def enqueue_hint_generation(question_ids, user_id=None):
+    """Queue background generation of the given questions' hints, unless HINT_PREGENERATE is off."""
+    if not question_ids or not current_app.config.get("HINT_PREGENERATE", True):
+        return None
+    return enqueue_job("generate_question_hints", {"question_ids": list(question_ids)}, user_id)
+
+@job_handler("generate_question_hints")
+def generate_question_hints_job(payload):
+    """Generate the hints of questions that have none, or a stale one."""
+    counts = {"generated": 0, "fresh": 0, "missing": 0, "failed": 0}
+    for question_id in payload["question_ids"]:
+        question = db.session.get(Question, question_id)
+        if question is None:
+            counts["missing"] += 1
+            continue
+        if get_stored_hint(question):
+            counts["fresh"] += 1
+            continue
+        try:
+            store_hint(question, generate_hint(question))
+            db.session.commit()
+            counts["generated"] += 1
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error generating hint for question {question_id}: {str(e)}")
+            counts["failed"] += 1
+    if counts["failed"] and not (counts["generated"] or counts["fresh"]):
+        raise RuntimeError(f"No hint could be generated for questions {payload['question_ids']}")
+    return counts
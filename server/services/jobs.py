@@ -0,0 +1,173 @@
+"""
+Minimal background job queue backed by the ``background_job`` table.
+
+Jobs are claimed with a conditional UPDATE, so any number of worker threads
+(started by ``create_app``) and worker processes (``python worker.py``) can poll
+the same database without an external broker. A running job holds a lease
+that its worker renews every ``JOB_HEARTBEAT_INTERVAL`` seconds; only jobs
+whose lease ran out (their worker died) are put back in the queue.
+"""
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import func
+from models import db, BackgroundJob
+
+JOB_HANDLERS = {}
+
+DEFAULT_POLL_INTERVAL = 2.0  # seconds
+DEFAULT_HEARTBEAT_INTERVAL = 30  # seconds between lease renewals of a running job
+DEFAULT_LEASE_TIMEOUT = 120  # seconds without a heartbeat before a running job is requeued
+
+_wakeup = threading.Event()
+
+def job_handler(kind):
+    """Register ``func(payload)`` as the handler for jobs of ``kind``."""
+    def decorator(func):
+        JOB_HANDLERS[kind] = func
+        return func
+    return decorator
+
+def enqueue_job(kind, payload=None, user_id=None):
+    """Add a job to the session; it becomes visible to workers when the caller commits."""
+    job = BackgroundJob(
+        kind=kind,
+        payload=json.dumps(payload or {}),
+        status="queued",
+        created_by=user_id
+    )
+    db.session.add(job)
+    db.session.flush()
+    _wakeup.set()
+    return job
+
+def serialize_job(job):
+    return {
+        'id': job.id,
+        'kind': job.kind,
+        'status': job.status,
+        'attempts': job.attempts,
+        'result': json.loads(job.result) if job.result else None,
+        'error': job.error,
+        'created_at': job.created_at.isoformat() if job.created_at else None,
+        'started_at': job.started_at.isoformat() if job.started_at else None,
+        'heartbeat_at': job.heartbeat_at.isoformat() if job.heartbeat_at else None,
+        'finished_at': job.finished_at.isoformat() if job.finished_at else None
+    }
+
+def claim_next_job(kinds=None):
+    """Atomically move the oldest queued job to "running" and return it, or None."""
+    while True:
+        query = db.session.query(BackgroundJob.id).filter(BackgroundJob.status == "queued")
+        if kinds:
+            query = query.filter(BackgroundJob.kind.in_(kinds))
+        row = query.order_by(BackgroundJob.id).first()
+        if not row:
+            db.session.rollback()
+            return None
+
+        claimed = BackgroundJob.query.filter_by(id=row.id, status="queued").update({
+            BackgroundJob.status: "running",
+            BackgroundJob.started_at: datetime.now(),
+            BackgroundJob.heartbeat_at: datetime.now(),
+            BackgroundJob.attempts: BackgroundJob.attempts + 1
+        }, synchronize_session=False)
+        db.session.commit()
+        if claimed:
+            return db.session.get(BackgroundJob, row.id)
+        # Another worker got there first, try the next one
+
+def renew_lease(app, job_id, interval, stop_event):
+    """Refresh the heartbeat of a running job every ``interval`` seconds until ``stop_event`` is set."""
+    while not stop_event.wait(interval):
+        with app.app_context():
+            try:
+                BackgroundJob.query.filter_by(id=job_id, status="running").update({
+                    BackgroundJob.heartbeat_at: datetime.now()
+                }, synchronize_session=False)
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                print(f"Job {job_id} heartbeat failed: {str(e)}")
+
+def run_job(job):
+    handler = JOB_HANDLERS.get(job.kind)
+    app = current_app._get_current_object()
+    stop_heartbeat = threading.Event()
+    heartbeat = threading.Thread(
+        target=renew_lease,
+        args=(app, job.id, app.config.get("JOB_HEARTBEAT_INTERVAL", DEFAULT_HEARTBEAT_INTERVAL), stop_heartbeat),
+        name=f"job-{job.id}-heartbeat",
+        daemon=True
+    )
+    heartbeat.start()
+    try:
+        if handler is None:
+            raise ValueError(f"No handler registered for job kind '{job.kind}'")
+        result = handler(json.loads(job.payload or "{}"))
+        job.status = "done"
+        job.result = json.dumps(result) if result is not None else None
+        job.error = None
+    except Exception as e:
+        db.session.rollback()
+        print(f"Job {job.id} ({job.kind}) failed: {str(e)}")
+        job = db.session.get(BackgroundJob, job.id)
+        job.status = "failed"
+        job.error = str(e)
+    finally:
+        stop_heartbeat.set()
+        heartbeat.join()
+    job.finished_at = datetime.now()
+    db.session.commit()
+    return job
+
+def requeue_stale_jobs(lease_timeout=DEFAULT_LEASE_TIMEOUT):
+    """Requeue jobs left "running" by a worker that died mid-job, i.e. whose lease expired."""
+    cutoff = datetime.now() - timedelta(seconds=lease_timeout)
+    requeued = BackgroundJob.query.filter(
+        BackgroundJob.status == "running",
+        func.coalesce(BackgroundJob.heartbeat_at, BackgroundJob.started_at) < cutoff
+    ).update({BackgroundJob.status: "queued"}, synchronize_session=False)
+    db.session.commit()
+    return requeued
+
+def run_worker(app, kinds=None, poll_interval=None, stop_event=None, once=False):
+    """Process jobs until ``stop_event`` is set (or the queue is empty when ``once``)."""
+    poll_interval = poll_interval or app.config.get("JOB_POLL_INTERVAL", DEFAULT_POLL_INTERVAL)
+    stop_event = stop_event or threading.Event()
+
+    lease_timeout = app.config.get("JOB_LEASE_TIMEOUT", DEFAULT_LEASE_TIMEOUT)
+    next_requeue = 0
+
+    while not stop_event.is_set():
+        with app.app_context():
+            try:
+                # Look for jobs of dead workers on start and then once per lease timeout
+                if time.monotonic() >= next_requeue:
+                    requeue_stale_jobs(lease_timeout)
+                    next_requeue = time.monotonic() + lease_timeout
+                job = claim_next_job(kinds)
+                if job:
+                    run_job(job)
+            except Exception as e:
+                db.session.rollback()
+                print(f"Job worker error: {str(e)}")
+                job = None
+
+        if job:
+            continue
+        if once:
+            return
+        _wakeup.wait(poll_interval)
+        _wakeup.clear()
+
+def start_worker_threads(app):
+    """Start ``JOB_WORKER_THREADS`` daemon workers inside this process."""
+    threads = []
+    for index in range(app.config.get("JOB_WORKER_THREADS", 1)):
+        thread = threading.Thread(target=run_worker, args=(app,), name=f"job-worker-{index}", daemon=True)
+        thread.start()
+        threads.append(thread)
+    return threads
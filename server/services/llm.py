@@ -0,0 +1,343 @@
+"""
+Gateway to the Gemini API shared by the AI routes and background jobs.
+
+Every model call goes through ``gateway``, which owns one long-lived client
+(and so one HTTP connection pool) and protects the app from a slow or failing
+upstream:
+
+* each call has a deadline (``LLM_TIMEOUT`` seconds) covering all its attempts,
+* at most ``LLM_MAX_CONCURRENCY`` calls run at once; callers wait for a slot
+  only until their deadline,
+* transient errors (timeouts, 429 and 5xx) are retried up to
+  ``LLM_MAX_RETRIES`` times with full-jitter exponential backoff,
+* after ``LLM_BREAKER_THRESHOLD`` consecutive failed calls the circuit opens
+  and calls fail fast for ``LLM_BREAKER_COOLDOWN`` seconds, then one trial
+  call decides whether it closes again.
+
+Set ``LLM_CLIENT = "fake"`` to answer every call with ``FakeModelClient``, a
+deterministic offline model for tests, demos and benchmarks.
+"""
+import os
+import json
+import random
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+import httpx
+from flask import current_app
+from google import genai
+from google.genai import errors, types
+from dotenv import load_dotenv
+from services.retrieval import tokenize
+
+load_dotenv()
+
+MODEL = "gemini-2.0-flash"
+
+DEFAULT_TIMEOUT = 30.0  # seconds per call, retries included
+DEFAULT_MAX_CONCURRENCY = 8
+DEFAULT_MAX_RETRIES = 2
+DEFAULT_BREAKER_THRESHOLD = 5
+DEFAULT_BREAKER_COOLDOWN = 30.0  # seconds
+RETRY_BASE_DELAY = 0.5  # seconds, doubled on every retry
+
+TRANSIENT_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)  # seconds, upper bounds
+
+class LLMUnavailableError(Exception):
+    """The call was not attempted: the circuit is open or no slot freed up before the deadline"""
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+class FakeModelClient:
+    """
+    Offline stand-in for ``genai.Client``. Answers are derived from the prompt,
+    so the same prompt always gets the same answer, and honour the JSON schema
+    of structured requests. Streams are split on word boundaries. ``latency``
+    seconds are slept per call to imitate the network in benchmarks.
+    """
+    def __init__(self, latency=0.0):
+        self.models = self
+        self.calls = 0
+        self.latency = latency
+
+    def _answer(self, contents):
+        first_line = str(contents).strip().splitlines()[0] if str(contents).strip() else ""
+        return f"Offline answer for: {first_line[:80]}"
+
+    def generate_content(self, model, contents, config=None):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        text = self._answer(contents)
+        schema = getattr(config, "response_schema", None) if config else None
+        if isinstance(schema, dict):
+            body = {field: text for field in schema.get("required", [])}
+            body["topic"] = local_topic_heading(str(contents))
+            text = json.dumps(body)
+        return FakeResponse(text)
+
+    def generate_content_stream(self, model, contents, config=None):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        for word in self._answer(contents).split(" "):
+            yield FakeResponse(word + " ")
+
+fake_client = FakeModelClient()
+
+def is_transient(error):
+    if isinstance(error, errors.APIError):
+        return error.code in TRANSIENT_STATUS_CODES
+    return isinstance(error, (httpx.TimeoutException, httpx.TransportError, TimeoutError, ConnectionError))
+
+class LLMGateway:
+    def __init__(self):
+        self._client = None
+        self._client_lock = threading.Lock()
+        self._semaphore = None
+        self._semaphore_size = None
+        self._lock = threading.Lock()
+        self._consecutive_failures = 0
+        self._opened_at = None
+        self._trial_running = False
+        self.stats = {
+            "calls": 0,
+            "successes": 0,
+            "failures": 0,
+            "retries": 0,
+            "rejected": 0,
+            "abandoned": 0,
+            "breaker_opens": 0,
+            "latency_seconds_total": 0.0,
+            "latency_buckets": [0] * (len(LATENCY_BUCKETS) + 1),
+        }
+
+    def settings(self):
+        config = current_app.config
+        return {
+            "timeout": config.get("LLM_TIMEOUT", DEFAULT_TIMEOUT),
+            "max_concurrency": config.get("LLM_MAX_CONCURRENCY", DEFAULT_MAX_CONCURRENCY),
+            "max_retries": config.get("LLM_MAX_RETRIES", DEFAULT_MAX_RETRIES),
+            "breaker_threshold": config.get("LLM_BREAKER_THRESHOLD", DEFAULT_BREAKER_THRESHOLD),
+            "breaker_cooldown": config.get("LLM_BREAKER_COOLDOWN", DEFAULT_BREAKER_COOLDOWN),
+        }
+
+    def client(self):
+        if current_app.config.get("LLM_CLIENT", "gemini") == "fake":
+            fake_client.latency = current_app.config.get("LLM_FAKE_LATENCY", 0.0)
+            return fake_client
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    # Initialize Google Gemini API client
+                    self._client = genai.Client(api_key=os.getenv("GOOGLE_API_KEY"))
+        return self._client
+
+    def _slots(self, size):
+        with self._lock:
+            if self._semaphore is None or self._semaphore_size != size:
+                self._semaphore = threading.BoundedSemaphore(size)
+                self._semaphore_size = size
+            return self._semaphore
+
+    def _admit(self, settings):
+        """
+        Fail fast while the circuit is open; let a single trial call through
+        after the cooldown. Returns whether this call is that trial.
+        """
+        with self._lock:
+            if self._opened_at is None:
+                return False
+            if time.monotonic() - self._opened_at < settings["breaker_cooldown"] or self._trial_running:
+                self.stats["rejected"] += 1
+                raise LLMUnavailableError("The AI service is temporarily unavailable, please try again shortly.")
+            self._trial_running = True
+            return True
+
+    def _record(self, settings, started, error=None, trial=False):
+        elapsed = time.monotonic() - started
+        with self._lock:
+            if trial:
+                self._trial_running = False
+            self.stats["calls"] += 1
+            self.stats["latency_seconds_total"] += elapsed
+            self.stats["latency_buckets"][bisect_left(LATENCY_BUCKETS, elapsed)] += 1
+            if error is None:
+                self.stats["successes"] += 1
+                self._consecutive_failures = 0
+                self._opened_at = None
+                return
+            self.stats["failures"] += 1
+            if not is_transient(error):
+                # Bad requests say nothing about the health of the upstream
+                return
+            self._consecutive_failures += 1
+            if self._opened_at is not None or self._consecutive_failures >= settings["breaker_threshold"]:
+                if self._opened_at is None:
+                    self.stats["breaker_opens"] += 1
+                self._opened_at = time.monotonic()
+
+    def _with_deadline(self, config, remaining):
+        http_options = types.HttpOptions(timeout=max(int(remaining * 1000), 1))
+        if config is None:
+            return types.GenerateContentConfig(http_options=http_options)
+        return config.model_copy(update={"http_options": http_options})
+
+    def _attempts(self, settings, deadline, attempt_call):
+        """Run ``attempt_call(remaining_seconds)`` until it succeeds, retrying transient errors"""
+        for attempt in range(settings["max_retries"] + 1):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError("The AI service did not answer in time.")
+            try:
+                return attempt_call(remaining)
+            except Exception as e:
+                if not is_transient(e) or attempt == settings["max_retries"]:
+                    raise
+                delay = random.uniform(0, RETRY_BASE_DELAY * 2 ** attempt)
+                if time.monotonic() + delay >= deadline:
+                    raise
+                with self._lock:
+                    self.stats["retries"] += 1
+                print(f"Transient AI service error, retrying in {delay:.2f}s: {str(e)}")
+                time.sleep(delay)
+
+    def _abandon(self, trial):
+        """A stream the caller stopped reading says nothing about the upstream: count it, but not as a result"""
+        with self._lock:
+            if trial:
+                self._trial_running = False
+            self.stats["abandoned"] += 1
+
+    def _acquire(self, settings, deadline, trial):
+        slots = self._slots(settings["max_concurrency"])
+        if not slots.acquire(timeout=max(deadline - time.monotonic(), 0)):
+            with self._lock:
+                if trial:
+                    self._trial_running = False
+                self.stats["rejected"] += 1
+            raise LLMUnavailableError("The AI service is busy, please try again shortly.")
+        return slots
+
+    def generate_content(self, model, contents, config=None):
+        settings = self.settings()
+        trial = self._admit(settings)
+        deadline = time.monotonic() + settings["timeout"]
+        slots = self._acquire(settings, deadline, trial)
+        client = self.client()
+        started = time.monotonic()
+        try:
+            response = self._attempts(settings, deadline, lambda remaining: client.models.generate_content(
+                model=model, contents=contents, config=self._with_deadline(config, remaining)
+            ))
+        except Exception as e:
+            self._record(settings, started, e, trial)
+            raise
+        finally:
+            slots.release()
+        self._record(settings, started, trial=trial)
+        return response
+
+    def generate_content_stream(self, model, contents, config=None):
+        """
+        Yield the text of each streamed chunk. Only opening the stream is
+        retried; once text has been yielded an error is passed to the caller.
+        A stream closed early by the caller (e.g. a client that disconnected)
+        counts as abandoned, neither a success nor a failure.
+        """
+        settings = self.settings()
+        trial = self._admit(settings)
+        deadline = time.monotonic() + settings["timeout"]
+        slots = self._acquire(settings, deadline, trial)
+        client = self.client()
+        started = time.monotonic()
+        error = None
+        abandoned = False
+        try:
+            def open_stream(remaining):
+                stream = iter(client.models.generate_content_stream(
+                    model=model, contents=contents, config=self._with_deadline(config, remaining)
+                ))
+                return stream, next(stream, None)
+
+            stream, first = self._attempts(settings, deadline, open_stream)
+            chunk = first
+            while chunk is not None:
+                if chunk.text:
+                    yield chunk.text
+                chunk = next(stream, None)
+        except GeneratorExit:
+            abandoned = True
+            raise
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            slots.release()
+            if abandoned:
+                self._abandon(trial)
+            else:
+                self._record(settings, started, error, trial)
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self.stats)
+            stats["latency_buckets"] = {
+                **{f"le_{bound}": count for bound, count in zip(LATENCY_BUCKETS, self.stats["latency_buckets"])},
+                "inf": self.stats["latency_buckets"][-1]
+            }
+            stats["circuit"] = "closed" if self._opened_at is None else "open"
+            stats["max_concurrency"] = self._semaphore_size
+        stats["average_latency_seconds"] = stats["latency_seconds_total"] / stats["calls"] if stats["calls"] else None
+        return stats
+
+gateway = LLMGateway()
+
+def generate_content(**kwargs):
+    return gateway.generate_content(**kwargs)
+
+def generate_content_stream(**kwargs):
+    """Yield the text of each streamed response chunk"""
+    return gateway.generate_content_stream(**kwargs)
+
+TOPIC_WORDS = 4
+
+def topic_response_config(system_instruction, body_field):
+    """Ask for a JSON object holding a short topic heading next to the main text"""
+    return types.GenerateContentConfig(
+        system_instruction=system_instruction,
+        response_mime_type="application/json",
+        response_schema={
+            "type": "OBJECT",
+            "properties": {
+                "topic": {"type": "STRING", "description": "A short topic heading of at most five words."},
+                body_field: {"type": "STRING"}
+            },
+            "required": ["topic", body_field]
+        },
+    )
+
+def local_topic_heading(text):
+    """Keyword based heading, used when the model did not return one"""
+    counts = Counter(tokenize(text))
+    keywords = [word for word, _ in counts.most_common(TOPIC_WORDS) if not word.isdigit()]
+    return " ".join(word.capitalize() for word in keywords) or "Unknown Topic"
+
+def parse_topic_response(response_text, body_field, topic_source):
+    """
+    Split a structured response into (topic, body). If the model ignored the
+    schema the raw text is used as the body and the topic is derived locally
+    from ``topic_source``.
+    """
+    try:
+        data = json.loads(response_text)
+        body = str(data[body_field]).strip()
+        topic = str(data.get("topic") or "").strip() or local_topic_heading(topic_source)
+        return topic, body
+    except (ValueError, KeyError, TypeError) as e:
+        print(f"Unstructured model response, deriving topic locally: {e}")
+        return local_topic_heading(topic_source), response_text.strip()
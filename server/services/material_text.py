@@ -0,0 +1,155 @@
+import os
+import hashlib
+import docx
+import PyPDF2
+from PIL import Image
+import pytesseract
+from models import db, MaterialText, MaterialChunkIndex
+from services.retrieval import refresh_material_index
+
+HASH_CHUNK_SIZE = 1024 * 1024
+TEXT_EXTENSIONS = {".pdf", ".docx", ".doc", ".png", ".jpg", ".jpeg"}
+
+def extract_text_from_pdf(file_path):
+
+    text = ""
+    try:
+        with open(file_path, "rb") as f:
+            pdf = PyPDF2.PdfReader(f)
+            for page in pdf.pages:
+                page_text = page.extract_text()
+                if page_text:
+                    # Clean the text of problematic Unicode characters
+                    page_text = ''.join(char if ord(char) < 0xF000 else ' ' for char in page_text)
+                    text += page_text + "\n"
+    except Exception as e:
+        print(f"Error processing PDF {file_path}: {e}")
+    return text
+
+def extract_text_from_docx(file_path):
+    try:
+        doc = docx.Document(file_path)
+        fullText = [para.text for para in doc.paragraphs]
+        return "\n".join(fullText)
+    except Exception as e:
+        print(f"Error processing DOCX {file_path}: {e}")
+        return ""
+
+def extract_text_from_image(file_path):
+    try:
+        image = Image.open(file_path)
+        text = pytesseract.image_to_string(image)
+        return text
+    except Exception as e:
+        print(f"Error processing image {file_path}: {e}")
+        return ""
+
+def has_extractable_text(file_path):
+    _, ext = os.path.splitext(file_path)
+    return ext.lower() in TEXT_EXTENSIONS
+
+def extract_text_from_file(file_path):
+    _, ext = os.path.splitext(file_path)
+    ext = ext.lower()
+    if ext == ".pdf":
+        return extract_text_from_pdf(file_path)
+    elif ext in [".docx", ".doc"]:
+        return extract_text_from_docx(file_path)
+    elif ext in [".png", ".jpg", ".jpeg"]:
+        return extract_text_from_image(file_path)
+    else:
+        return ""
+
+def get_material_source_path(material):
+    """Absolute path of the file the material's text is read from (the transcript for videos)."""
+    _, ext = os.path.splitext(material.filename)
+    if ext.lower() == ".mp4" and material.transcript_path:
+        relative_path = material.transcript_path
+    else:
+        relative_path = material.file_path
+    if not relative_path:
+        return None
+    return os.path.join(os.getcwd(), relative_path.lstrip('/'))
+
+def hash_file(file_path):
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def refresh_material_text(material, file_path=None):
+    """
+    Make sure the cached text of ``material`` matches its file on disk.
+
+    The file is only re-parsed when its sha256 differs from the cached one, so a
+    touched-but-unchanged file costs a hash instead of a full extraction. The
+    chunk index used for retrieval is rebuilt along with the text. The caller is
+    responsible for committing the session.
+    """
+    file_path = file_path or get_material_source_path(material)
+    if not file_path or not os.path.exists(file_path):
+        return None
+
+    cached = MaterialText.query.filter_by(material_id=material.id).first()
+    if not has_extractable_text(file_path):
+        # e.g. a video without a transcript, there is nothing to cache
+        if cached:
+            db.session.delete(cached)
+        MaterialChunkIndex.query.filter_by(material_id=material.id).delete()
+        return None
+
+    stat = os.stat(file_path)
+    content_hash = hash_file(file_path)
+
+    if cached and cached.content_hash == content_hash:
+        cached.source_path = file_path
+        cached.source_mtime = stat.st_mtime
+        cached.source_size = stat.st_size
+        refresh_material_index(cached)
+        return cached
+
+    text = extract_text_from_file(file_path)
+    if cached is None:
+        cached = MaterialText(material_id=material.id)
+        db.session.add(cached)
+    cached.content_hash = content_hash
+    cached.source_path = file_path
+    cached.source_mtime = stat.st_mtime
+    cached.source_size = stat.st_size
+    cached.text = text
+    refresh_material_index(cached)
+    return cached
+
+def get_material_content_hash(material):
+    """sha256 of the file the cached text was extracted from, or None if nothing is cached"""
+    return db.session.query(MaterialText.content_hash).filter_by(material_id=material.id).scalar()
+
+def get_material_text(material, file_path=None):
+    """
+    Return the extracted text of ``material``, extracting it only on a cache miss.
+
+    A hit is decided on path, mtime and size so the common case never reads the
+    file; anything else falls through to ``refresh_material_text``.
+    """
+    file_path = file_path or get_material_source_path(material)
+    if not file_path or not os.path.exists(file_path):
+        return None
+    if not has_extractable_text(file_path):
+        return ""
+
+    stat = os.stat(file_path)
+    cached = MaterialText.query.filter_by(material_id=material.id).first()
+    if (cached and cached.source_path == file_path
+            and cached.source_mtime == stat.st_mtime
+            and cached.source_size == stat.st_size):
+        return cached.text
+
+    try:
+        cached = refresh_material_text(material, file_path)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        print(f"Error caching text for material {material.id}: {e}")
+        return extract_text_from_file(file_path)
+    return cached.text if cached else None
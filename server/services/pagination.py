@@ -0,0 +1,101 @@
+"""
+Keyset (cursor) pagination for the collection endpoints.
+
+A page is requested with ``limit`` and the opaque ``cursor`` returned as
+``next_cursor`` by the previous page. The cursor holds the sort key of the last
+row sent, so the next page starts with an index range scan from that key
+instead of an OFFSET that reads and throws away every earlier row, and rows
+added in the meantime never shift a page. ``next_cursor`` is null on the last
+page. Totals cost a COUNT and are only computed when ``include_total=true``.
+"""
+import base64
+import binascii
+import json
+from flask import request, current_app
+from sqlalchemy import tuple_
+
+DEFAULT_PAGE_SIZE = 50
+DEFAULT_MAX_PAGE_SIZE = 200
+
+class InvalidPageError(ValueError):
+    """Raised for a bad limit or cursor, reported to the client as a 400"""
+
+class PageArgs:
+    def __init__(self, limit, cursor, include_total):
+        self.limit = limit
+        self.cursor = cursor
+        self.include_total = include_total
+
+def encode_cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values).encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, binascii.Error):
+        raise InvalidPageError("Invalid cursor")
+    if not isinstance(values, list) or not all(isinstance(value, (int, float, str)) for value in values):
+        raise InvalidPageError("Invalid cursor")
+    return values
+
+def get_page_args():
+    """Read limit, cursor and include_total from the query string, raising InvalidPageError if they are invalid"""
+    max_size = current_app.config.get("MAX_PAGE_SIZE", DEFAULT_MAX_PAGE_SIZE)
+    limit = request.args.get("limit")
+    if limit is None:
+        limit = current_app.config.get("PAGE_SIZE", DEFAULT_PAGE_SIZE)
+    else:
+        # Parsed here rather than with type=int, which would silently fall back to the default
+        try:
+            limit = int(limit)
+        except ValueError:
+            raise InvalidPageError("limit must be a positive integer")
+    if limit < 1:
+        raise InvalidPageError("limit must be a positive integer")
+    cursor = request.args.get("cursor")
+    include_total = request.args.get("include_total", "false").lower() == "true"
+    return PageArgs(min(limit, max_size), decode_cursor(cursor) if cursor else None, include_total)
+
+def matches_column(value, column):
+    """Whether a cursor value has the Python type of the column it is compared with"""
+    try:
+        expected = column.type.python_type
+    except NotImplementedError:
+        return True
+    if isinstance(value, bool):
+        return expected is bool
+    if expected is float:
+        return isinstance(value, (int, float))
+    if expected in (int, str):
+        return isinstance(value, expected)
+    return True
+
+def paginate(query, order_by, page, key, descending=False):
+    """
+    Return (rows, next_cursor) for one page of ``query``.
+
+    ``order_by`` lists the columns the rows are sorted on, which together must
+    be unique (end with the primary key), and ``key(row)`` returns their values
+    for a row, which is what the cursor stores.
+    """
+    if page.cursor is not None:
+        if len(page.cursor) != len(order_by) or not all(
+                matches_column(value, column) for value, column in zip(page.cursor, order_by)):
+            raise InvalidPageError("Invalid cursor")
+        columns = tuple_(*order_by) if len(order_by) > 1 else order_by[0]
+        values = tuple_(*page.cursor) if len(order_by) > 1 else page.cursor[0]
+        query = query.filter(columns < values if descending else columns > values)
+
+    rows = query.order_by(*[column.desc() if descending else column for column in order_by]).limit(page.limit + 1).all()
+    if len(rows) <= page.limit:
+        return rows, None
+    rows = rows[:page.limit]
+    return rows, encode_cursor(list(key(rows[-1])))
+
+def page_response(page, next_cursor, query=None, **data):
+    """Response body with the page's data, ``next_cursor`` and, if asked for, the total of ``query``"""
+    data["next_cursor"] = next_cursor
+    if page.include_total and query is not None:
+        data["total"] = query.order_by(None).count()
+    return data
@@ -0,0 +1,189 @@
+"""
+Pre-generation of a course's material summaries and question hints.
+
+The course tree is loaded with one query per level and walked in the calling
+thread, which also does every database read and write. Only the model calls run on a bounded pool of worker
+threads, throttled by a shared token bucket so a whole course never bursts
+past the upstream rate limit. Every result is committed as soon as it
+arrives, and items that already have a fresh summary or hint are skipped, so
+an interrupted run simply resumes where it stopped when started again.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from sqlalchemy.orm import selectinload
+from models import db, Course, Week, Assignment, Material, Question
+from services.jobs import job_handler, enqueue_job
+from services.hints import build_hint_prompt, complete_hint, get_stored_hint, hint_source_hash, store_hint
+from services.material_text import get_material_source_path, get_material_text, get_material_content_hash
+from services.summaries import generate_summary, get_cached_summary, store_summary
+
+KINDS = ("summaries", "hints")
+
+DEFAULT_WORKERS = 4
+DEFAULT_RATE = 2.0  # model calls per second
+
+class RateLimiter:
+    """Token bucket allowing ``rate`` acquisitions per second with bursts of up to ``burst``"""
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if not self.rate:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait_seconds = (1 - self._tokens) / self.rate
+            time.sleep(wait_seconds)
+
+@contextmanager
+def keep_loaded_objects():
+    """
+    Stop commits from expiring what the session loaded, so the eagerly loaded
+    course tree is not reloaded week by week and assignment by assignment
+    after each saved result
+    """
+    session = db.session()
+    expire_on_commit = session.expire_on_commit
+    session.expire_on_commit = False
+    try:
+        yield
+    finally:
+        session.expire_on_commit = expire_on_commit
+
+def collect_tasks(course_id, kinds, report):
+    """
+    Yield (kind, object id, payload) for every summary or hint that is missing
+    or stale. Up-to-date items are only counted.
+    """
+    course = Course.query.options(
+        selectinload(Course.weeks).selectinload(Week.materials),
+        selectinload(Course.weeks).selectinload(Week.assignments).selectinload(Assignment.questions)
+    ).filter_by(id=course_id).first()
+    if course is None:
+        raise ValueError(f"Course {course_id} not found")
+
+    for week in sorted(course.weeks, key=lambda week: week.id):
+        if "summaries" in kinds:
+            for material in sorted(week.materials, key=lambda material: material.id):
+                file_path = get_material_source_path(material)
+                text = get_material_text(material, file_path) if file_path else None
+                content_hash = get_material_content_hash(material)
+                if not text or not text.strip() or not content_hash:
+                    report["skipped"] += 1
+                elif get_cached_summary(material.id, content_hash):
+                    report["up_to_date"] += 1
+                else:
+                    yield "summary", material.id, {"name": material.name, "text": text, "content_hash": content_hash}
+
+        if "hints" in kinds:
+            for assignment in sorted(week.assignments, key=lambda assignment: assignment.id):
+                for question in sorted(assignment.questions, key=lambda question: question.id):
+                    if get_stored_hint(question):
+                        report["up_to_date"] += 1
+                    else:
+                        yield "hint", question.id, {"prompt": build_hint_prompt(question),
+                                                    "source_hash": hint_source_hash(question)}
+
+def run_task(app, limiter, kind, payload):
+    """Worker thread side: only the model call, no database access"""
+    limiter.acquire()
+    with app.app_context():
+        if kind == "summary":
+            return generate_summary(payload["name"], payload["text"])
+        return complete_hint(payload["prompt"])
+
+def save_result(kind, object_id, payload, result):
+    if kind == "summary":
+        topic, summary = result
+        store_summary(object_id, payload["content_hash"], topic, summary)
+        return
+    # Read afresh, the loaded tree is not expired by commits
+    question = db.session.get(Question, object_id, populate_existing=True)
+    if question is None or hint_source_hash(question) != payload["source_hash"]:
+        # Deleted or edited while the hint was being generated
+        return
+    store_hint(question, result, payload["source_hash"])
+    db.session.commit()
+
+def pregenerate_course(app, course_id, kinds=KINDS, workers=DEFAULT_WORKERS, rate=DEFAULT_RATE, progress=None):
+    """
+    Generate the missing summaries and hints of a course and return a report
+    with counts and throughput. ``progress(report)`` is called after every item.
+    """
+    report = {"course_id": course_id, "generated": 0, "up_to_date": 0, "skipped": 0, "failed": 0, "interrupted": False}
+    limiter = RateLimiter(rate, burst=workers)
+    started = time.monotonic()
+    pending = {}
+
+    def collect(done):
+        for future in done:
+            kind, object_id, payload = pending.pop(future)
+            try:
+                save_result(kind, object_id, payload, future.result())
+                report["generated"] += 1
+            except Exception as e:
+                db.session.rollback()
+                print(f"Error generating {kind} for {object_id}: {str(e)}")
+                report["failed"] += 1
+            if progress:
+                progress(report)
+
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pregenerate")
+    try:
+        with keep_loaded_objects():
+            for kind, object_id, payload in collect_tasks(course_id, kinds, report):
+                # Keep at most two tasks per worker in flight so large texts are not all held at once
+                while len(pending) >= workers * 2:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    collect(done)
+                pending[executor.submit(run_task, app, limiter, kind, payload)] = (kind, object_id, payload)
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            collect(done)
+    except KeyboardInterrupt:
+        report["interrupted"] = True
+        for future in pending:
+            future.cancel()
+    finally:
+        executor.shutdown(wait=True)
+
+    elapsed = time.monotonic() - started
+    report["elapsed_seconds"] = round(elapsed, 3)
+    report["generated_per_second"] = round(report["generated"] / elapsed, 3) if elapsed else None
+    return report
+
+@job_handler("pregenerate_course")
+def pregenerate_course_job(payload):
+    """Background variant of ``pregenerate_course``, configured by PREGENERATE_WORKERS and PREGENERATE_RATE."""
+    from flask import current_app
+    app = current_app._get_current_object()
+    return pregenerate_course(
+        app,
+        payload["course_id"],
+        kinds=payload.get("kinds") or KINDS,
+        workers=app.config.get("PREGENERATE_WORKERS", DEFAULT_WORKERS),
+        rate=app.config.get("PREGENERATE_RATE", DEFAULT_RATE)
+    )
+
+def enqueue_hint_pregeneration(course_id, user_id=None):
+    """
+    Queue generation of the course's missing hints on the rate-limited pool,
+    unless HINT_PREGENERATE is off. Used for bulk imports, which would
+    otherwise make one model call after another in a single hint job.
+    """
+    from flask import current_app
+    if not current_app.config.get("HINT_PREGENERATE", True):
+        return None
+    return enqueue_job("pregenerate_course", {"course_id": course_id, "kinds": ["hints"]}, user_id)
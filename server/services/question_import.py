@@ -0,0 +1,93 @@
+"""
+Bulk import of assignment questions from JSON or CSV.
+
+Rows use the field names of the question create form (question_description,
+option1..option4, correct_option). All rows are checked in one pass and every
+problem is reported with its row number (1 for the first question, whatever
+the format). Nothing is written unless every row is valid, and the valid
+import is written with a single executemany INSERT.
+"""
+import csv
+import io
+from sqlalchemy import insert
+from models import db, Question
+from services.grading import normalize_option, UNANSWERED
+
+MAX_IMPORT_ROWS = 20000
+
+TEXT_FIELDS = ("question_description", "option1", "option2", "option3", "option4")
+OPTION_MAX_LENGTH = 255  # Question.option* are String(255)
+
+class QuestionImportError(ValueError):
+    """The payload could not be read as a list of questions at all"""
+
+def read_csv_rows(data):
+    try:
+        text = data.decode("utf-8-sig") if isinstance(data, bytes) else data
+    except UnicodeDecodeError:
+        raise QuestionImportError("CSV file must be UTF-8 encoded")
+    reader = csv.DictReader(io.StringIO(text))
+    missing = [field for field in TEXT_FIELDS + ("correct_option",) if field not in (reader.fieldnames or [])]
+    if missing:
+        raise QuestionImportError(f"CSV header is missing: {', '.join(missing)}")
+    return list(reader)
+
+def read_json_rows(data):
+    rows = data.get("questions") if isinstance(data, dict) else data
+    if not isinstance(rows, list):
+        raise QuestionImportError("Expected a list of questions")
+    return rows
+
+def validate_question_rows(rows, assignment_id, max_rows=MAX_IMPORT_ROWS):
+    """
+    Return (values, errors): the insert parameters of every row, and a list of
+    {"row": n, "errors": [...]} for the rows that are invalid.
+    """
+    if not rows:
+        raise QuestionImportError("No questions to import")
+    if len(rows) > max_rows:
+        raise QuestionImportError(f"At most {max_rows} questions can be imported at once")
+
+    values = []
+    errors = []
+    for number, row in enumerate(rows, start=1):
+        if not isinstance(row, dict):
+            errors.append({"row": number, "errors": ["Question must be an object"]})
+            continue
+
+        row_errors = []
+        fields = {}
+        for field in TEXT_FIELDS:
+            value = row.get(field)
+            value = value.strip() if isinstance(value, str) else value
+            if not value:
+                row_errors.append(f"{field} is required")
+            elif not isinstance(value, str):
+                row_errors.append(f"{field} must be text")
+            elif field != "question_description" and len(value) > OPTION_MAX_LENGTH:
+                row_errors.append(f"{field} must be at most {OPTION_MAX_LENGTH} characters")
+            fields[field] = value
+
+        # Read like submitted answers are, so "2", 2 and 2.0 all mean option 2
+        correct_option = normalize_option(row.get("correct_option"))
+        if correct_option == UNANSWERED:
+            row_errors.append("Correct option must be between 1 and 4")
+
+        if row_errors:
+            errors.append({"row": number, "errors": row_errors})
+        elif not errors:
+            values.append({
+                "description": fields["question_description"],
+                "option1": fields["option1"],
+                "option2": fields["option2"],
+                "option3": fields["option3"],
+                "option4": fields["option4"],
+                "correct_option": correct_option,
+                "assignment_id": assignment_id
+            })
+    return values, errors
+
+def insert_questions(values):
+    """Insert the validated rows with one executemany, returning the new ids. The caller commits."""
+    result = db.session.execute(insert(Question).returning(Question.id, sort_by_parameter_order=True), values)
+    return [row.id for row in result]
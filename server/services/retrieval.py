@@ -0,0 +1,194 @@
+"""
+Chunking and BM25 retrieval over extracted material text.
+
+When a material's text is (re)extracted it is split into overlapping chunks of
+``RAG_CHUNK_SIZE`` words and a BM25 index over those chunks is stored in the
+``material_chunk_index`` table as a NumPy ``.npz`` archive. Questions are then
+answered from the ``RAG_TOP_K`` best matching chunks instead of the whole file.
+
+The term matrix is kept in CSR form (``indptr``/``term_ids``/``term_counts``),
+so scoring a question is a handful of vectorised passes over the non-zero
+entries and memory stays proportional to the text, not chunks x vocabulary.
+"""
+import io
+import re
+import numpy as np
+from flask import current_app
+from models import db, MaterialChunkIndex, MaterialText
+
+DEFAULT_CHUNK_SIZE = 200  # words
+DEFAULT_CHUNK_OVERLAP = 50  # words shared by consecutive chunks
+DEFAULT_TOP_K = 4
+
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+WORD_PATTERN = re.compile(r"\S+")
+STOP_WORDS = frozenset("""
+a an and are as at be but by can do does for from has have how i if in is it its
+of on or so that the their then there these this to was were what when where which
+who why will with you your
+""".split())
+
+def tokenize(text):
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOP_WORDS]
+
+def chunk_spans(text, chunk_size=DEFAULT_CHUNK_SIZE, overlap=DEFAULT_CHUNK_OVERLAP):
+    """Return (start, end) character offsets of overlapping chunks of ``chunk_size`` words."""
+    words = [match.span() for match in WORD_PATTERN.finditer(text)]
+    if not words:
+        return []
+    step = max(chunk_size - overlap, 1)
+    spans = []
+    for first in range(0, len(words), step):
+        last = min(first + chunk_size, len(words)) - 1
+        spans.append((words[first][0], words[last][1]))
+        if last == len(words) - 1:
+            break
+    return spans
+
+class ChunkIndex:
+    def __init__(self, spans, vocabulary, doc_freq, lengths, indptr, term_ids, term_counts):
+        self.spans = spans
+        self.vocabulary = vocabulary
+        self.term_lookup = {term: i for i, term in enumerate(vocabulary.tolist())}
+        self.doc_freq = doc_freq
+        self.lengths = lengths
+        self.indptr = indptr
+        self.term_ids = term_ids
+        self.term_counts = term_counts
+
+    @classmethod
+    def build(cls, text, chunk_size=DEFAULT_CHUNK_SIZE, overlap=DEFAULT_CHUNK_OVERLAP):
+        spans = np.array(chunk_spans(text, chunk_size, overlap), dtype=np.int64).reshape(-1, 2)
+
+        term_lookup = {}
+        indptr = [0]
+        term_ids = []
+        term_counts = []
+        lengths = []
+        for start, end in spans:
+            tokens = tokenize(text[start:end])
+            ids = np.array([term_lookup.setdefault(token, len(term_lookup)) for token in tokens], dtype=np.int64)
+            unique_ids, counts = np.unique(ids, return_counts=True)
+            term_ids.append(unique_ids)
+            term_counts.append(counts)
+            indptr.append(indptr[-1] + len(unique_ids))
+            lengths.append(len(tokens))
+
+        term_ids = np.concatenate(term_ids).astype(np.int32) if term_ids else np.zeros(0, dtype=np.int32)
+        term_counts = np.concatenate(term_counts).astype(np.int32) if term_counts else np.zeros(0, dtype=np.int32)
+        vocabulary = np.array(sorted(term_lookup, key=term_lookup.get), dtype=str)
+        doc_freq = np.bincount(term_ids, minlength=len(vocabulary)).astype(np.int32)
+
+        return cls(
+            spans, vocabulary, doc_freq,
+            np.array(lengths, dtype=np.int32),
+            np.array(indptr, dtype=np.int64),
+            term_ids, term_counts
+        )
+
+    def __len__(self):
+        return len(self.spans)
+
+    def scores(self, question):
+        """BM25 score of every chunk for ``question``."""
+        query_ids = [self.term_lookup[token] for token in set(tokenize(question)) if token in self.term_lookup]
+        scores = np.zeros(len(self), dtype=np.float64)
+        if not query_ids or not len(self):
+            return scores
+
+        n_chunks = len(self)
+        idf = np.log1p((n_chunks - self.doc_freq + 0.5) / (self.doc_freq + 0.5))
+        avg_length = max(self.lengths.mean(), 1.0)
+
+        mask = np.isin(self.term_ids, query_ids)
+        rows = np.repeat(np.arange(n_chunks), np.diff(self.indptr))[mask]
+        tf = self.term_counts[mask].astype(np.float64)
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * self.lengths[rows] / avg_length)
+        np.add.at(scores, rows, idf[self.term_ids[mask]] * tf * (BM25_K1 + 1) / (tf + norm))
+        return scores
+
+    def top_chunks(self, question, k=DEFAULT_TOP_K):
+        """Indices of the ``k`` best chunks for ``question``, in document order."""
+        scores = self.scores(question)
+        if len(self) <= k:
+            return list(range(len(self)))
+        if not scores.any():
+            # Nothing matched, fall back to the start of the document
+            return list(range(k))
+        best = np.argpartition(-scores, k - 1)[:k]
+        return sorted(best[scores[best] > 0].tolist())
+
+    def to_bytes(self):
+        buffer = io.BytesIO()
+        np.savez_compressed(
+            buffer,
+            spans=self.spans,
+            vocabulary=self.vocabulary,
+            doc_freq=self.doc_freq,
+            lengths=self.lengths,
+            indptr=self.indptr,
+            term_ids=self.term_ids,
+            term_counts=self.term_counts
+        )
+        return buffer.getvalue()
+
+    @classmethod
+    def from_bytes(cls, data):
+        with np.load(io.BytesIO(data), allow_pickle=False) as arrays:
+            return cls(
+                arrays["spans"], arrays["vocabulary"], arrays["doc_freq"], arrays["lengths"],
+                arrays["indptr"], arrays["term_ids"], arrays["term_counts"]
+            )
+
+def get_chunk_settings():
+    return (
+        current_app.config.get("RAG_CHUNK_SIZE", DEFAULT_CHUNK_SIZE),
+        current_app.config.get("RAG_CHUNK_OVERLAP", DEFAULT_CHUNK_OVERLAP)
+    )
+
+def refresh_material_index(material_text):
+    """
+    Rebuild the chunk index of a ``MaterialText`` row if its text or the chunk
+    settings changed. The caller is responsible for committing the session.
+    """
+    chunk_size, overlap = get_chunk_settings()
+    stored = MaterialChunkIndex.query.filter_by(material_id=material_text.material_id).first()
+    if (stored and stored.content_hash == material_text.content_hash
+            and stored.chunk_size == chunk_size and stored.chunk_overlap == overlap):
+        return stored
+
+    index = ChunkIndex.build(material_text.text or "", chunk_size, overlap)
+    if stored is None:
+        stored = MaterialChunkIndex(material_id=material_text.material_id)
+        db.session.add(stored)
+    stored.content_hash = material_text.content_hash
+    stored.chunk_size = chunk_size
+    stored.chunk_overlap = overlap
+    stored.chunk_count = len(index)
+    stored.data = index.to_bytes()
+    return stored
+
+def get_material_index(material, text):
+    """Return the ``ChunkIndex`` of ``material``, building and storing it on a miss."""
+    material_text = MaterialText.query.filter_by(material_id=material.id).first()
+    if material_text is None or material_text.text != text:
+        # Text was not cached (extraction fell back), index it for this request only
+        return ChunkIndex.build(text, *get_chunk_settings())
+
+    try:
+        stored = refresh_material_index(material_text)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        print(f"Error storing chunk index for material {material.id}: {e}")
+        return ChunkIndex.build(text, *get_chunk_settings())
+    return ChunkIndex.from_bytes(stored.data)
+
+def retrieve_relevant_chunks(material, text, question, top_k=None):
+    """Return the text of the chunks of ``material`` most relevant to ``question``."""
+    top_k = top_k or current_app.config.get("RAG_TOP_K", DEFAULT_TOP_K)
+    index = get_material_index(material, text)
+    return [text[start:end] for start, end in index.spans[index.top_chunks(question, top_k)].tolist()]
@@ -0,0 +1,193 @@
+"""
+Ranked catalog and material content search on top of the ``search_index``
+FTS5 table.
+
+User input is never passed to FTS5 as query syntax: it is split into words and
+every word becomes a quoted prefix term, so "mach learn" matches "Machine
+Learning" and stray quotes or operators cannot break the query.
+"""
+import bisect
+import os
+import re
+from sqlalchemy import text, bindparam
+from models import db
+from services.retrieval import WORD_PATTERN as TEXT_WORD_PATTERN
+from services.transcription import load_transcript_timeline
+
+SEARCH_KINDS = ("course", "material", "assignment")
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+
+# bm25 weights of the title, body and content columns
+TITLE_WEIGHT = 10.0
+BODY_WEIGHT = 3.0
+CONTENT_WEIGHT = 1.0
+
+WORD_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+# Words of material text shown around a content match
+SNIPPET_WORDS = 24
+
+# Private-use characters delimiting the matched terms in FTS5 snippets, turned into offsets
+HIGHLIGHT_START = "\ue000"
+HIGHLIGHT_END = "\ue001"
+ELLIPSIS = "\u2026"
+
+def build_match_query(query):
+    """FTS5 MATCH expression requiring every word of ``query`` as a prefix, or None"""
+    words = WORD_PATTERN.findall(query.lower())
+    if not words:
+        return None
+    return " ".join(f'"{word}"*' for word in words)
+
+def visible_courses_sql(user):
+    """Subquery of the course ids ``user`` may search: created ones for instructors, enrolled ones for students"""
+    if user.is_instructor:
+        return "SELECT id FROM course WHERE creator_user_id = :user_id"
+    return "SELECT course_id FROM enrollment WHERE student_id = :user_id"
+
+def search_catalog(user, query, limit=DEFAULT_LIMIT, offset=0, kinds=SEARCH_KINDS):
+    """
+    Return (rows, has_more) for the best matches of ``query`` among the courses,
+    materials and assignments (or only the given ``kinds``) visible to ``user``,
+    best first. This is a single statement whatever the number of hits: every
+    column of the response is stored in the index, and the access check is an
+    IN subquery, which cannot duplicate rows the way a join on enrollments does.
+    """
+    match = build_match_query(query)
+    if match is None:
+        return [], False
+
+    statement = text(f"""
+        SELECT kind, object_id, course_id, week_id, title, body
+        FROM search_index
+        WHERE search_index MATCH :match
+          AND kind IN :kinds
+          AND course_id IN ({visible_courses_sql(user)})
+        ORDER BY bm25(search_index, :title_weight, :body_weight, :content_weight)
+        LIMIT :limit OFFSET :offset
+    """).bindparams(bindparam("kinds", expanding=True))
+    rows = db.session.execute(statement, {
+        "match": match,
+        "kinds": list(kinds),
+        "user_id": user.id,
+        "title_weight": TITLE_WEIGHT,
+        "body_weight": BODY_WEIGHT,
+        "content_weight": CONTENT_WEIGHT,
+        # One extra row tells whether there is another page
+        "limit": limit + 1,
+        "offset": offset
+    }).all()
+    return rows[:limit], len(rows) > limit
+
+def serialize_hit(row):
+    """Result in the shape the search page expects for each kind"""
+    if row.kind == "course":
+        return {
+            'id': row.object_id,
+            'name': row.title,
+            'description': row.body,
+            'type': 'course'
+        }
+    return {
+        'id': row.object_id,
+        'title': row.title,
+        'description': row.body,
+        'course_id': row.course_id,
+        'week_id': row.week_id,
+        'type': row.kind
+    }
+
+def search_material_contents(user, query, limit=DEFAULT_LIMIT, offset=0):
+    """
+    Return (hits, has_more) for the materials whose extracted text or transcript
+    best matches ``query``. Each hit carries a snippet around the match, and
+    videos an approximate position in seconds.
+    """
+    match = build_match_query(query)
+    if match is None:
+        return [], False
+
+    # Rank first and build snippets only for the page that is returned
+    rows = db.session.execute(text(f"""
+        SELECT search_index.object_id, search_index.course_id, search_index.week_id, search_index.title,
+               snippet(search_index, 2, :start, :end, :ellipsis, :words) AS snippet,
+               search_index.content,
+               material.filename, material.duration, material.transcript_path
+        FROM search_index
+        JOIN material ON material.id = search_index.object_id
+        WHERE search_index MATCH :match AND search_index.rowid IN (
+            SELECT rowid FROM search_index
+            WHERE search_index MATCH :content_match
+              AND kind = 'material'
+              AND course_id IN ({visible_courses_sql(user)})
+            ORDER BY rank
+            LIMIT :limit OFFSET :offset
+        )
+        ORDER BY rank
+    """), {
+        "match": match,
+        "content_match": f"content : ({match})",
+        "user_id": user.id,
+        "start": HIGHLIGHT_START,
+        "end": HIGHLIGHT_END,
+        "ellipsis": ELLIPSIS,
+        "words": SNIPPET_WORDS,
+        "limit": limit + 1,
+        "offset": offset
+    }).all()
+
+    hits = []
+    for row in rows[:limit]:
+        snippet, highlights = split_highlights(row.snippet)
+        hit = {
+            'id': row.object_id,
+            'title': row.title,
+            'course_id': row.course_id,
+            'week_id': row.week_id,
+            'type': 'material',
+            'snippet': snippet,
+            'highlights': highlights,
+            'timestamp': None
+        }
+        if os.path.splitext(row.filename)[1].lower() == ".mp4" and highlights:
+            hit['timestamp'] = estimate_timestamp(row, snippet, highlights[0][0])
+        hits.append(hit)
+    return hits, len(rows) > limit
+
+def split_highlights(snippet):
+    """Remove the highlight markers, returning the plain snippet and the [start, end) offsets they enclosed"""
+    plain = []
+    highlights = []
+    length = 0
+    for i, part in enumerate(snippet.split(HIGHLIGHT_START)):
+        term, _, rest = part.partition(HIGHLIGHT_END) if i else ("", "", part)
+        if term:
+            highlights.append([length, length + len(term)])
+        plain.append(term + rest)
+        length += len(term) + len(rest)
+    return "".join(plain), highlights
+
+def estimate_timestamp(row, snippet, match_offset):
+    """
+    Seconds into the video where the match at ``match_offset`` of ``snippet`` is
+    spoken: looked up in the transcript's segment timeline, or interpolated
+    over the duration.
+    """
+    fragment = snippet.lstrip(ELLIPSIS).lstrip()
+    lead = len(snippet) - len(fragment)
+    position = row.content.find(fragment.rstrip(ELLIPSIS).rstrip())
+    if position < 0:
+        return None
+    word_index = len(TEXT_WORD_PATTERN.findall(row.content, 0, position + max(match_offset - lead, 0)))
+
+    timeline = load_transcript_timeline(row)
+    if timeline:
+        starts = [first_word for _, first_word in timeline]
+        return timeline[max(bisect.bisect_right(starts, word_index) - 1, 0)][0]
+
+    total_words = len(TEXT_WORD_PATTERN.findall(row.content))
+    if not total_words or not row.duration:
+        return None
+    return round(word_index / total_words * row.duration * 60, 1)  # duration is in minutes
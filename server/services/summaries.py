@@ -0,0 +1,68 @@
+"""
+Persisted material summaries.
+
+A summary is stored per material, keyed on the hash of the material's file and
+``SUMMARY_PROMPT_VERSION``, so it is generated once and served to every student
+until the file is replaced. Bump the version whenever the prompt changes.
+"""
+from sqlalchemy.exc import IntegrityError
+from models import db, MaterialSummary
+from services.llm import MODEL, generate_content, topic_response_config, parse_topic_response
+from services.material_text import get_material_content_hash
+
+SUMMARY_PROMPT_VERSION = 1
+
+SUMMARY_SYSTEM_INSTRUCTION = "You are a helpful AI assistant that creates concise, informative summaries."
+
+def build_summary_prompt(material_name, text):
+    return f"Create a summary of the following material titled '{material_name}' in bullet points.\n\n{text}"
+
+def generate_summary(material_name, text):
+    """Ask Gemini for a bullet-point summary, returns (topic, summary)"""
+    response = generate_content(
+        model=MODEL,
+        config=topic_response_config(SUMMARY_SYSTEM_INSTRUCTION, "summary"),
+        contents=build_summary_prompt(material_name, text),
+    )
+    return parse_topic_response(response.text, "summary", response.text)
+
+def get_cached_summary(material_id, content_hash):
+    return MaterialSummary.query.filter_by(
+        material_id=material_id,
+        content_hash=content_hash,
+        prompt_version=SUMMARY_PROMPT_VERSION
+    ).first()
+
+def invalidate_material_summaries(material_id):
+    """Drop every stored summary of a material. Runs in the caller's transaction."""
+    MaterialSummary.query.filter_by(material_id=material_id).delete(synchronize_session=False)
+
+def summarize_material(material, text):
+    """
+    Return (topic, summary, cached) for ``material``, calling the model only when
+    no summary is stored for its current content.
+    """
+    content_hash = get_material_content_hash(material)
+    if content_hash:
+        cached = get_cached_summary(material.id, content_hash)
+        if cached:
+            return cached.topic, cached.summary, True
+
+    topic, summary = generate_summary(material.name, text)
+    if content_hash:
+        store_summary(material.id, content_hash, topic, summary)
+    return topic, summary, False
+
+def store_summary(material_id, content_hash, topic, summary):
+    try:
+        db.session.add(MaterialSummary(
+            material_id=material_id,
+            content_hash=content_hash,
+            prompt_version=SUMMARY_PROMPT_VERSION,
+            topic=topic[:255],
+            summary=summary
+        ))
+        db.session.commit()
+    except IntegrityError:
+        # Another request stored the same summary first
+        db.session.rollback()
@@ -0,0 +1,219 @@
+import gc
+import json
+import os
+import threading
+import time
+from fpdf import FPDF
+from flask import current_app
+from models import db, Material
+from services.jobs import job_handler
+from services.material_text import refresh_material_text
+from services.retrieval import WORD_PATTERN
+
+TRANSCRIPT_FOLDER = "uploads/transcripts"
+
+DEFAULT_MODEL_SIZE = "base"
+DEFAULT_IDLE_TIMEOUT = 600  # seconds
+
+class TranscriptionModelRegistry:
+    """
+    Process-wide holder for the Whisper model.
+
+    The model is loaded on first use, shared by every request and unloaded again
+    after ``idle_timeout`` seconds without a transcription. Three locks keep the
+    parts apart: ``_inference_lock`` runs one transcription at a time, since
+    Whisper installs hooks on the model while decoding and is not safe to run
+    concurrently on one instance; ``_lock`` guards loading and unloading, which
+    never drops a model in use; ``_stats_lock`` only the counters, so the stats
+    can be read while a long transcription is running.
+    """
+
+    def __init__(self):
+        self._inference_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._model = None
+        self._model_size = None
+        self._device = None
+        self._idle_timer = None
+        self._in_use = False
+        self._last_used = 0.0
+        self.stats = {
+            "model_size": None,
+            "loaded": False,
+            "loads": 0,
+            "unloads": 0,
+            "load_seconds_total": 0.0,
+            "last_load_seconds": None,
+            "transcriptions": 0,
+            "transcribe_seconds_total": 0.0,
+            "last_transcribe_seconds": None,
+        }
+
+    def _load(self, model_size):
+        import torch
+        import whisper
+
+        device = "cuda" if torch.cuda.is_available() else "cpu"
+        started = time.perf_counter()
+        self._model = whisper.load_model(model_size, device=device)  # Load Whisper model on GPU if available
+        elapsed = time.perf_counter() - started
+
+        self._model_size = model_size
+        self._device = device
+        with self._stats_lock:
+            self.stats["model_size"] = model_size
+            self.stats["loaded"] = True
+            self.stats["loads"] += 1
+            self.stats["load_seconds_total"] += elapsed
+            self.stats["last_load_seconds"] = elapsed
+
+    def _release(self):
+        self._model = None
+        self._model_size = None
+        with self._stats_lock:
+            self.stats["loaded"] = False
+            self.stats["unloads"] += 1
+        gc.collect()
+        if self._device == "cuda":
+            import torch
+            torch.cuda.empty_cache()
+
+    def _schedule_unload(self, idle_timeout):
+        if self._idle_timer:
+            self._idle_timer.cancel()
+        if not idle_timeout:
+            return
+        self._idle_timer = threading.Timer(idle_timeout, self._unload_if_idle, args=(idle_timeout,))
+        self._idle_timer.daemon = True
+        self._idle_timer.start()
+
+    def _unload_if_idle(self, idle_timeout):
+        with self._lock:
+            if (self._model is not None and not self._in_use
+                    and time.monotonic() - self._last_used >= idle_timeout):
+                self._release()
+
+    def transcribe(self, video_path, model_size=DEFAULT_MODEL_SIZE, idle_timeout=DEFAULT_IDLE_TIMEOUT, **options):
+        with self._inference_lock:
+            with self._lock:
+                if self._model is None or self._model_size != model_size:
+                    if self._model is not None:
+                        self._release()
+                    self._load(model_size)
+                model = self._model
+                self._in_use = True
+
+            started = time.perf_counter()
+            try:
+                return model.transcribe(video_path, **options)
+            finally:
+                elapsed = time.perf_counter() - started
+                with self._stats_lock:
+                    self.stats["transcriptions"] += 1
+                    self.stats["transcribe_seconds_total"] += elapsed
+                    self.stats["last_transcribe_seconds"] = elapsed
+                with self._lock:
+                    self._in_use = False
+                    self._last_used = time.monotonic()
+                    self._schedule_unload(idle_timeout)
+
+    def unload(self):
+        """Drop the model now, waiting for a running transcription to finish"""
+        with self._inference_lock, self._lock:
+            if self._idle_timer:
+                self._idle_timer.cancel()
+            if self._model is not None:
+                self._release()
+
+    def get_stats(self):
+        with self._stats_lock:
+            return dict(self.stats)
+
+transcription_models = TranscriptionModelRegistry()
+
+def transcribe_video(video_path):
+    """Return the full Whisper result for ``video_path``, or None if transcription failed."""
+    try:
+        return transcription_models.transcribe(
+            video_path,
+            model_size=current_app.config.get("WHISPER_MODEL_SIZE", DEFAULT_MODEL_SIZE),
+            idle_timeout=current_app.config.get("WHISPER_IDLE_TIMEOUT", DEFAULT_IDLE_TIMEOUT),
+        )
+    except Exception as e:
+        print(f"Error in transcription: {str(e)}")
+        return None
+
+def generate_transcript(video_path):
+    result = transcribe_video(video_path)
+    return result["text"] if result else None
+
+def save_transcript_as_pdf(text, pdf_path):
+    try:
+        pdf = FPDF()
+        pdf.set_auto_page_break(auto=True, margin=15)
+        pdf.add_page()
+        pdf.set_font("Arial", size=12)
+        pdf.multi_cell(0, 10, text)
+        pdf.output(pdf_path)
+    except Exception as e:
+        print(f"Error saving transcript PDF: {str(e)}")
+
+def transcript_timeline_path(transcript_path):
+    """The timeline is stored next to the transcript PDF, as <material id>.json"""
+    return os.path.splitext(transcript_path)[0] + ".json"
+
+def save_transcript_timeline(segments, json_path):
+    """
+    Store [start seconds, index of the segment's first word] for every Whisper
+    segment, which is enough to map a position in the transcript back to a time.
+    """
+    timeline = []
+    words = 0
+    for segment in segments:
+        timeline.append([round(segment["start"], 1), words])
+        words += len(WORD_PATTERN.findall(segment["text"]))
+    with open(json_path, "w") as f:
+        json.dump(timeline, f)
+
+def load_transcript_timeline(material):
+    """The saved timeline of a video material, or None if it has none"""
+    if not material.transcript_path:
+        return None
+    json_path = transcript_timeline_path(os.path.join(os.getcwd(), material.transcript_path.lstrip('/')))
+    try:
+        with open(json_path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+@job_handler("transcribe_material")
+def transcribe_material_job(payload):
+    """Transcribe an uploaded video and attach the transcript PDF to its material."""
+    material = db.session.get(Material, payload["material_id"])
+    if not material:
+        return {"skipped": "Material was deleted"}
+    if material.file_path != payload["file_path"]:
+        return {"skipped": "Material file was replaced"}
+
+    result = transcribe_video(payload["video_path"])
+    transcript_text = result["text"] if result else None
+    if not transcript_text:
+        raise RuntimeError("Transcription produced no text")
+
+    if not os.path.exists(TRANSCRIPT_FOLDER):
+        os.makedirs(TRANSCRIPT_FOLDER)
+
+    transcript_filename = f"{material.id}.pdf"
+    transcript_file_path = os.path.join(TRANSCRIPT_FOLDER, transcript_filename)
+    save_transcript_as_pdf(transcript_text, transcript_file_path)
+    if not os.path.exists(transcript_file_path):
+        raise RuntimeError("Transcript PDF could not be written")
+    # Lets content search point at the moment of the video a match comes from
+    save_transcript_timeline(result.get("segments") or [], transcript_timeline_path(transcript_file_path))
+
+    material.transcript_path = f"/uploads/transcripts/{transcript_filename}"
+    refresh_material_text(material)
+    db.session.commit()
+
+    return {"material_id": material.id, "transcript_path": material.transcript_path}
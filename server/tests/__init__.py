@@ -18,13 +18,18 @@ ENDPOINTS = {
     "delete_course": f"{BASE_URL}/course/delete/{{course_id}}",
     "enrolled_courses": f"{BASE_URL}/course/enrolled",
     "enroll_student": f"{BASE_URL}/course/enroll/{{course_id}}/{{student_id}}",
+    "single_course": f"{BASE_URL}/course/{{course_id}}",
 
     "material_create": f"{BASE_URL}/material/create/{{week_id}}",
     "material_delete": f"{BASE_URL}/material/delete/{{material_id}}",
+    "material_edit": f"{BASE_URL}/material/edit/{{material_id}}",
+
+    "job_status": f"{BASE_URL}/job/{{job_id}}",
 
     "question_create": f"{BASE_URL}/question/create/{{assignment_id}}",
     "question_list": f"{BASE_URL}/question/{{assignment_id}}",
     "question_delete": f"{BASE_URL}/question/delete/{{question_id}}",
+    "question_edit": f"{BASE_URL}/question/edit/{{question_id}}",
 
     "review": f"{BASE_URL}/review/{{material_id}}",
     "review_delete": f"{BASE_URL}/review/delete/{{review_id}}",
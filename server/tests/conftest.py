@@ -1,5 +1,7 @@
 import pytest
 import requests
+from contextlib import contextmanager
+from sqlalchemy import event
 from tests import ENDPOINTS
 
 @pytest.fixture
@@ -14,6 +16,90 @@ def valid_user():
         "phone": "+911234567890"
     }
 
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    """
+    In-process app backed by a throwaway in-memory database, run from a
+    temporary directory so uploaded and generated files never land in the tree
+    """
+    from factory import create_app
+    monkeypatch.chdir(tmp_path)
+    return create_app({
+        "TESTING": True,
+        "SQLALCHEMY_DATABASE_URI": "sqlite://",
+        "JOB_WORKER_THREADS": 0
+    })
+
+@pytest.fixture
+def app_instructor_client(app):
+    """Test client logged in as a freshly signed up instructor"""
+    client = app.test_client()
+    response = client.post("/api/v1/auth/signup", data={
+        "email": "instructor@mail.com",
+        "password": "password123",
+        "password_confirm": "password123",
+        "fname": "Instructor",
+        "lname": "User",
+        "is_instructor": "true"
+    })
+    assert response.status_code == 201
+    client.user_id = response.json["user"]["id"]
+    return client
+
+@contextmanager
+def count_queries(app):
+    """Collect the SQL statements executed against the app's database"""
+    from models import db
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+def signup(app, email, is_instructor):
+    """In-process client logged in as a new user"""
+    client = app.test_client()
+    response = client.post("/api/v1/auth/signup", data={
+        "email": email,
+        "password": "password123",
+        "password_confirm": "password123",
+        "fname": "Test",
+        "lname": email.split("@")[0],
+        "is_instructor": "true" if is_instructor else "false"
+    })
+    assert response.status_code == 201
+    client.user_id = response.json["user"]["id"]
+    return client
+
+def walk_pages(client, url, field, limit=2, id_field="id", **params):
+    """Follow next_cursor through a paginated listing, returning every item; checks the page size and order"""
+    items = []
+    cursor = None
+    while True:
+        response = client.get(url, query_string={**params, "limit": limit, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200
+        page = response.json[field]
+        assert len(page) <= limit
+        items += page
+        cursor = response.json["next_cursor"]
+        if not cursor:
+            break
+    ids = [item[id_field] for item in items]
+    assert ids == sorted(set(ids))
+    return items
+
+def assert_rejects_bad_pages(client, url):
+    """A listing answers 400 to a limit or cursor it cannot use instead of falling back to a default page"""
+    for params in ({"limit": "abc"}, {"limit": 0}, {"cursor": "not-a-cursor"}, {"cursor": "WyJ4Il0"}, {"cursor": "WzEsMl0"}):
+        assert client.get(url, query_string=params).status_code == 400, params
+
 @pytest.fixture(scope="session")
 def create_test_users():
     """Ensure test users exist before running tests."""
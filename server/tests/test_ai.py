@@ -0,0 +1,400 @@
+import io
+import json
+import os
+import pytest
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+class FakeGenAIClient:
+    """Records the prompts sent to Gemini and answers with a canned text"""
+    def __init__(self, text="Think about it."):
+        self.prompts = []
+        self.text = text
+        self.models = self
+
+    def generate_content(self, model, contents, config=None):
+        self.prompts.append(contents)
+        return FakeResponse(self.text)
+
+@pytest.fixture
+def fake_genai(monkeypatch):
+    import services.llm
+    client = FakeGenAIClient()
+    monkeypatch.setattr(services.llm.gateway, "_client", client)
+    return client
+
+def add_material(app, filename, text, monkeypatch, user_id=None):
+    """Insert a material whose file extracts to ``text`` and index it like an upload would"""
+    import services.material_text
+    from models import db, User, Course, Week, Material
+    from services.material_text import refresh_material_text
+
+    monkeypatch.setattr(services.material_text, "extract_text_from_file", lambda file_path: open(file_path).read())
+    os.makedirs("uploads/materials", exist_ok=True)
+    with open(os.path.join("uploads/materials", filename), "wb") as f:
+        f.write(text.encode("utf-8"))
+
+    with app.app_context():
+        if user_id is None:
+            user = User(email="rag@mail.com", password="unused", fname="Rag", lname="User", is_instructor=True)
+            db.session.add(user)
+            db.session.flush()
+            user_id = user.id
+        course = Course(name="RAG Course", description="Retrieval", creator_user_id=user_id)
+        db.session.add(course)
+        db.session.flush()
+        week = Week(name="Week 1", course_id=course.id, user_id=user_id)
+        db.session.add(week)
+        db.session.flush()
+        material = Material(name="Notes", week_id=week.id, duration=10,
+                            filename=filename, file_path=f"/uploads/materials/{filename}")
+        db.session.add(material)
+        db.session.flush()
+        refresh_material_text(material)
+        db.session.commit()
+        return material.id
+
+def filler(count, word="lorem"):
+    return " ".join(f"{word}{i}" for i in range(count))
+
+def test_chunk_spans_overlap():
+    from services.retrieval import chunk_spans
+    text = filler(500)
+    spans = chunk_spans(text, chunk_size=200, overlap=50)
+    chunks = [text[start:end].split() for start, end in spans]
+
+    assert [len(chunk) for chunk in chunks] == [200, 200, 200]
+    assert chunks[0][-50:] == chunks[1][:50]
+    assert chunks[-1][-1] == "lorem499"
+
+def test_bm25_ranks_matching_chunk_first():
+    from services.retrieval import ChunkIndex
+    text = " ".join([filler(100), "photosynthesis converts light into chemical energy", filler(300, "ipsum")])
+    index = ChunkIndex.build(text, chunk_size=50, overlap=10)
+
+    best = index.top_chunks("How does photosynthesis work?", k=1)
+    start, end = index.spans[best[0]]
+    assert "photosynthesis" in text[start:end]
+
+    restored = ChunkIndex.from_bytes(index.to_bytes())
+    assert (restored.scores("photosynthesis") == index.scores("photosynthesis")).all()
+
+def test_ask_sends_only_relevant_chunks(app, fake_genai, monkeypatch):
+    """Test that a material question is answered from the top-k chunks instead of the whole file"""
+    from models import MaterialChunkIndex
+    app.config.update(RAG_CHUNK_SIZE=50, RAG_CHUNK_OVERLAP=10, RAG_TOP_K=2)
+    text = " ".join([filler(1000), "The mitochondria is the powerhouse of the cell.", filler(1000, "ipsum")])
+    material_id = add_material(app, "rag_notes.pdf", text, monkeypatch)
+
+    with app.app_context():
+        stored = MaterialChunkIndex.query.filter_by(material_id=material_id).first()
+        assert stored is not None and stored.chunk_count > 2
+
+    response = app.test_client().post("/api/v1/ask", json={
+        "question": "What is the powerhouse of the cell?",
+        "material_id": material_id
+    })
+    assert response.status_code == 200
+
+    prompt = fake_genai.prompts[-1]
+    assert "mitochondria" in prompt
+    assert len(prompt) < len(text) / 10
+
+def test_ask_topic_comes_from_the_same_response(app, fake_genai):
+    """Test that the topic heading is read from the structured answer without a second model call"""
+    fake_genai.text = '{"topic": "Cell Biology", "answer": "Think about energy."}'
+    client = app.test_client()
+    response = client.post("/api/v1/auth/signup", data={
+        "email": "topic@mail.com",
+        "password": "password123",
+        "password_confirm": "password123",
+        "fname": "Topic",
+        "lname": "User",
+        "is_instructor": "false"
+    })
+    student_id = response.json["user"]["id"]
+    with app.app_context():
+        from models import db, Course, Enrollment
+        course = Course(name="Biology", description="Cells", creator_user_id=student_id)
+        db.session.add(course)
+        db.session.flush()
+        db.session.add(Enrollment(student_id=student_id, course_id=course.id))
+        db.session.commit()
+
+    response = client.post("/api/v1/ask", json={"question": "What do mitochondria do?"})
+    assert response.status_code == 200
+    assert response.json["topic"] == "Cell Biology"
+    assert response.json["answer"] == "Think about energy."
+    assert len(fake_genai.prompts) == 1
+
+def test_topic_falls_back_to_keywords():
+    from services.llm import parse_topic_response
+    topic, answer = parse_topic_response("Plain text answer", "answer", "How does photosynthesis use photosynthesis light?")
+    assert answer == "Plain text answer"
+    assert topic.startswith("Photosynthesis")
+
+def test_summary_is_generated_once_per_file(app, app_instructor_client, fake_genai, monkeypatch):
+    """Test that summaries are served from the cache until the material file is replaced"""
+    fake_genai.text = '{"topic": "Neural Networks", "summary": "- Layers"}'
+    client = app_instructor_client
+    material_id = add_material(app, "summary_notes.pdf", "Neural networks are made of layers.", monkeypatch, client.user_id)
+
+    first = client.post("/api/v1/summarize", json={"material_id": material_id})
+    second = client.post("/api/v1/summarize", json={"material_id": material_id})
+    assert first.status_code == 200 and second.status_code == 200
+    assert first.json["cached"] is False
+    assert second.json["cached"] is True
+    assert second.json["topic"] == "Neural Networks"
+    assert second.json["summary"] == "- Layers"
+    assert len(fake_genai.prompts) == 1
+
+    response = client.put(f"/api/v1/material/edit/{material_id}", data={
+        "title": "Notes",
+        "file": (io.BytesIO(b"Convolutions slide filters over images."), "summary_notes.pdf")
+    }, content_type="multipart/form-data")
+    assert response.status_code == 200
+
+    third = client.post("/api/v1/summarize", json={"material_id": material_id})
+    assert third.json["cached"] is False
+    assert len(fake_genai.prompts) == 2
+    assert "Convolutions" in fake_genai.prompts[-1]
+
+def test_prewarm_course_summaries(app, app_instructor_client, fake_genai, monkeypatch):
+    """Test that an instructor can pre-generate the summaries of a whole course"""
+    from models import Material, Week
+    from services.jobs import run_worker
+    fake_genai.text = '{"topic": "Optics", "summary": "- Lenses"}'
+    client = app_instructor_client
+    material_id = add_material(app, "prewarm_notes.pdf", "Lenses bend light.", monkeypatch, client.user_id)
+    with app.app_context():
+        course_id = Week.query.get(Material.query.get(material_id).week_id).course_id
+
+    response = client.post(f"/api/v1/summarize/prewarm/{course_id}")
+    assert response.status_code == 202
+    run_worker(app, once=True)
+
+    job = client.get(f"/api/v1/job/{response.json['job_id']}").json["job"]
+    assert job["status"] == "done"
+    assert job["result"]["generated"] == 1
+
+    response = client.post("/api/v1/summarize", json={"material_id": material_id})
+    assert response.json["cached"] is True
+    assert len(fake_genai.prompts) == 1
+
+def test_pregenerate_course_resumes(app, fake_genai, monkeypatch):
+    """Test that pre-generation fills in summaries and hints and skips them when run again"""
+    from models import db, Material, Week, Assignment, Question
+    from services.pregeneration import pregenerate_course
+    fake_genai.text = '{"topic": "Optics", "summary": "- Lenses"}'
+    material_id = add_material(app, "pregenerate_notes.pdf", "Lenses bend light.", monkeypatch)
+    with app.app_context():
+        week = Week.query.get(Material.query.get(material_id).week_id)
+        assignment = Assignment(name="Quiz", description="Quiz", week_id=week.id)
+        db.session.add(assignment)
+        db.session.flush()
+        for number in range(3):
+            db.session.add(Question(description=f"What is {number} + 1?", option1="1", option2="2",
+                                    option3="3", option4="4", correct_option=2, assignment_id=assignment.id))
+        db.session.commit()
+
+        report = pregenerate_course(app, week.course_id, workers=2, rate=0)
+        assert report["generated"] == 4
+        assert report["failed"] == 0
+        assert report["generated_per_second"] > 0
+        assert all(question.hint for question in Question.query.filter_by(assignment_id=assignment.id))
+
+        report = pregenerate_course(app, week.course_id, workers=2, rate=0)
+        assert report["generated"] == 0
+        assert report["up_to_date"] == 4
+    assert len(fake_genai.prompts) == 4
+
+def test_pregenerate_course_loads_the_tree_once(app, fake_genai, monkeypatch):
+    """Test that saving results does not make the walk reload weeks and assignments one by one"""
+    from models import db, Material, Week, Assignment, Question
+    from services.pregeneration import pregenerate_course
+    from tests.conftest import count_queries
+    material_id = add_material(app, "tree_notes.pdf", "Lenses bend light.", monkeypatch)
+    with app.app_context():
+        course_id = Week.query.get(Material.query.get(material_id).week_id).course_id
+        for number in range(4):
+            week = Week(name=f"Week {number + 2}", course_id=course_id, user_id=1)
+            db.session.add(week)
+            db.session.flush()
+            assignment = Assignment(name="Quiz", description="Quiz", week_id=week.id)
+            db.session.add(assignment)
+            db.session.flush()
+            for question in range(2):
+                db.session.add(Question(description=f"What is {question} + {number}?", option1="1", option2="2",
+                                        option3="3", option4="4", correct_option=2, assignment_id=assignment.id))
+        db.session.commit()
+
+        with count_queries(app) as statements:
+            report = pregenerate_course(app, course_id, kinds=["hints"], workers=1, rate=0)
+    assert report["generated"] == 8
+    assert len([statement for statement in statements if "FROM week" in statement]) == 1
+    assert len([statement for statement in statements if "FROM assignment" in statement]) == 1
+
+def test_rate_limiter_spaces_calls():
+    import time
+    from services.pregeneration import RateLimiter
+    limiter = RateLimiter(rate=50, burst=1)
+    started = time.monotonic()
+    for _ in range(6):
+        limiter.acquire()
+    assert time.monotonic() - started >= 0.09
+
+def test_repeated_question_is_answered_from_cache(app, app_instructor_client, fake_genai, monkeypatch):
+    """Test that near-identical questions about a material reuse the first answer"""
+    fake_genai.text = '{"topic": "Backpropagation", "answer": "Think about the chain rule."}'
+    material_id = add_material(app, "cache_notes.pdf", "Backpropagation applies the chain rule.", monkeypatch)
+    client = app.test_client()
+
+    first = client.post("/api/v1/ask", json={"question": "What is backpropagation?", "material_id": material_id})
+    second = client.post("/api/v1/ask", json={"question": "what is  Backpropagation", "material_id": material_id})
+    similar = client.post("/api/v1/ask", json={"question": "Backpropagation, what is it?", "material_id": material_id})
+    other = client.post("/api/v1/ask", json={"question": "What is gradient descent?", "material_id": material_id})
+
+    assert first.json["cached"] is False
+    assert second.json["cached"] is True
+    assert similar.json["cached"] is True
+    assert similar.json["answer"] == "Think about the chain rule."
+    assert other.json["cached"] is False
+    assert len(fake_genai.prompts) == 2
+
+    stats = app_instructor_client.get("/api/v1/ask/cache/stats").json["answer_cache"]
+    assert stats["exact_hits"] >= 1 and stats["similar_hits"] >= 1
+
+def test_answer_cache_expires_and_evicts():
+    from services.answer_cache import AnswerCache
+    cache = AnswerCache(max_materials=1, max_entries=2)
+    cache.put(1, "hash", "What is a tensor?", {"answer": "a"})
+    assert cache.get(1, "hash", "what is a TENSOR") == {"answer": "a"}
+    assert cache.get(1, "other-hash", "What is a tensor?") is None
+    cache.put(1, "hash", "What is a tensor?", {"answer": "a"})
+    assert cache.get(1, "hash", "What is a tensor?", ttl=-1) is None
+
+    cache.put(1, "hash", "What is a matrix?", {"answer": "m"})
+    cache.put(1, "hash", "What is a vector?", {"answer": "v"})
+    cache.put(1, "hash", "What is a scalar?", {"answer": "s"})
+    assert cache.get(1, "hash", "What is a matrix?") is None
+    cache.put(2, "hash", "What is a tensor?", {"answer": "a"})
+    assert cache.get(1, "hash", "What is a scalar?") is None
+
+def test_answer_cache_keeps_different_concepts_apart():
+    """Test that single-concept questions about different terms never share an answer"""
+    from services.answer_cache import AnswerCache
+    cache = AnswerCache()
+    cache.put(1, "hash", "What is photosynthesis?", {"answer": "light"})
+    for question in ("What is momentum?", "What is entropy?", "What is a gradient?"):
+        assert cache.get(1, "hash", question) is None
+    assert cache.get(1, "hash", "Photosynthesis, what is it?") == {"answer": "light"}
+    assert cache.get_stats()["similar_hits"] == 1
+
+def test_answer_cache_keeps_question_words_apart():
+    """Test that questions asking how rather than why, or whether not, never share an answer"""
+    from services.answer_cache import AnswerCache
+    cache = AnswerCache()
+    cache.put(1, "hash", "Why is backpropagation used?", {"answer": "why"})
+    assert cache.get(1, "hash", "How is backpropagation used?") is None
+    assert cache.get(1, "hash", "Why is backpropagation used, in training deep neural networks with many layers?") is None
+    cache.put(1, "hash", "Why is the loss decreasing?", {"answer": "decreasing"})
+    assert cache.get(1, "hash", "Why isn't the loss decreasing?") is None
+    assert cache.get(1, "hash", "why is backpropagation USED") == {"answer": "why"}
+
+def test_answer_cache_counts_repeated_words():
+    """Test that a question repeating a term is not matched with the question asking about the term once"""
+    from services.answer_cache import AnswerCache
+    cache = AnswerCache()
+    cache.put(1, "hash", "What is a derivative?", {"answer": "slope"})
+    assert cache.get(1, "hash", "What is the derivative of a derivative?") is None
+    assert cache.get(1, "hash", "Derivative, what is it?") == {"answer": "slope"}
+
+def parse_events(body):
+    """Split a text/event-stream body into (event, data) pairs"""
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+def test_ask_stream_emits_tokens(app, monkeypatch):
+    """Test that the streaming ask endpoint sends tokens before the final answer, using the offline model"""
+    app.config["LLM_CLIENT"] = "fake"
+    material_id = add_material(app, "stream_notes.pdf", "Gradient descent follows the negative gradient.", monkeypatch)
+    client = app.test_client()
+
+    response = client.post("/api/v1/ask/stream", json={"question": "What is gradient descent?", "material_id": material_id})
+    assert response.status_code == 200
+    assert response.mimetype == "text/event-stream"
+
+    events = parse_events(response.get_data(as_text=True))
+    kinds = [event for event, _ in events]
+    assert kinds[0] == "meta" and kinds[-1] == "done"
+    assert kinds.count("token") > 1
+    tokens = "".join(data["text"] for event, data in events if event == "token")
+    assert events[-1][1]["answer"] == tokens.strip()
+
+    # The streamed answer is cached like a regular one
+    response = client.post("/api/v1/ask", json={"question": "what is gradient descent", "material_id": material_id})
+    assert response.json["cached"] is True
+    assert response.json["answer"] == tokens.strip()
+
+def test_summarize_stream_stores_summary(app, monkeypatch):
+    """Test that a streamed summary is stored and then served without the model"""
+    from services.llm import fake_client
+    app.config["LLM_CLIENT"] = "fake"
+    material_id = add_material(app, "stream_summary.pdf", "Entropy measures uncertainty.", monkeypatch)
+    client = app.test_client()
+
+    events = parse_events(client.post("/api/v1/summarize/stream", json={"material_id": material_id}).get_data(as_text=True))
+    assert events[-1][0] == "done" and events[-1][1]["cached"] is False
+    calls = fake_client.calls
+
+    events = parse_events(client.post("/api/v1/summarize/stream", json={"material_id": material_id}).get_data(as_text=True))
+    assert events == [("done", {**events[-1][1], "cached": True})]
+    assert events[-1][1]["summary"]
+    assert fake_client.calls == calls
+
+def test_question_hint_stream_not_found(app):
+    response = app.test_client().post("/api/v1/question_hint/stream", json={"question_id": 999})
+    assert response.status_code == 404
+
+def test_question_hint_is_generated_once(app, app_instructor_client):
+    """Test that hints are generated in the background on creation and only regenerated after an edit"""
+    from services.jobs import run_worker
+    from services.llm import fake_client
+    app.config["LLM_CLIENT"] = "fake"
+    client = app_instructor_client
+    course_id = client.post("/api/v1/course/create", data={"name": "Hints", "description": "Hints"}).json["course"]["id"]
+    week_id = client.post(f"/api/v1/week/create/{course_id}", data={"name": "Week 1"}).json["week"]["id"]
+    assignment_id = client.post(f"/api/v1/assignment/create/{week_id}", data={
+        "name": "Quiz", "description": "Quiz"
+    }).json["assignment"]["id"]
+    response = client.post(f"/api/v1/question/create/{assignment_id}", data={
+        "question_description": "What is 2 + 2?",
+        "option1": "1", "option2": "2", "option3": "4", "option4": "5",
+        "correct_option": "3"
+    })
+    question_id = response.json["question"]["id"]
+    assert response.json["hint_job_id"]
+    run_worker(app, once=True)
+
+    calls = fake_client.calls
+    response = client.post("/api/v1/question_hint", json={"question_id": question_id})
+    assert response.json["cached"] is True
+    assert fake_client.calls == calls
+
+    # Changing only the answer key keeps the hint
+    response = client.put(f"/api/v1/question/edit/{question_id}", data={"correct_option": "4"})
+    assert response.json["hint_job_id"] is None
+    assert client.post("/api/v1/question_hint", json={"question_id": question_id}).json["cached"] is True
+
+    # Changing the text makes it stale, it is regenerated on the next request if the job has not run yet
+    response = client.put(f"/api/v1/question/edit/{question_id}", data={"question_description": "What is 3 + 3?"})
+    assert response.json["hint_job_id"]
+    response = client.post("/api/v1/question_hint", json={"question_id": question_id})
+    assert response.json["cached"] is False
+    assert "3 + 3" in response.json["hint"]
+    assert client.post("/api/v1/question_hint", json={"question_id": question_id}).json["cached"] is True
@@ -74,3 +74,25 @@ def test_delete_assignment_unauthorized(student_session, instructor_session):
     assert response.status_code == 403
     assert response.json()["error"] == "Access denied. Only instructors can delete assignments"
     delete_test_assignment(instructor_session, course_id, week_id, assignment_id)
+
+def test_all_scores_match_the_legacy_implementation(app):
+    """Test that the grouped dashboard query returns the legacy per-assignment JSON, in assignment id order"""
+    import json
+    from models import db, Assignment, Week
+    from benchmarks.assignment_scores import legacy_assignment_score_summaries, same_results, seed
+    with app.app_context():
+        # Assignments alternate between weeks, so id order differs from week order
+        instructor_id, _ = seed(courses=2, weeks_per_course=3, assignments=12, students=20, submission_rate=0.7)
+        db.session.add(Assignment(name="Unsubmitted", description="No scores", week_id=Week.query.first().id))
+        db.session.commit()
+        legacy = json.loads(json.dumps(legacy_assignment_score_summaries(instructor_id)))
+
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session["_user_id"] = str(instructor_id)
+    response = client.get("/api/v1/assignment/all-scores")
+    assert response.status_code == 200
+    assignments = response.json["assignments"]
+    assert [assignment["id"] for assignment in assignments] == list(range(1, 14))
+    assert assignments[-1]["submission_count"] == 0
+    assert same_results(legacy, assignments)
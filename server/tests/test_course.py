@@ -1,7 +1,7 @@
 import pytest
 import requests
 from tests import ENDPOINTS
-from tests.conftest import create_test_course, delete_test_course
+from tests.conftest import create_test_course, delete_test_course, count_queries, assert_rejects_bad_pages
 
 def test_get_all_courses():
     """Test retrieving all available courses"""
@@ -95,4 +95,93 @@ def test_enroll_student_unauthorized(student_session):
         ENDPOINTS["enroll_student"].format(course_id=1, student_id=2)
     )
     assert response.status_code == 403
-    assert response.json()["error"] == "Only instructors can enroll students"
\ No newline at end of file
+    assert response.json()["error"] == "Only instructors can enroll students"
+
+def test_single_course_etag(instructor_session):
+    """Test that the course tree is served with an ETag that changes when its content does"""
+    course_id = create_test_course(instructor_session, "ETag Course Test", "Course for testing ETags")
+
+    response = instructor_session.get(ENDPOINTS["single_course"].format(course_id=course_id))
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+    assert response.json()["course"]["weeks"] == []
+
+    response = instructor_session.get(ENDPOINTS["single_course"].format(course_id=course_id), headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+    response = instructor_session.post(ENDPOINTS["week_create"].format(course_id=course_id), data={"name": "ETag Week"})
+    assert response.status_code == 201
+
+    response = instructor_session.get(ENDPOINTS["single_course"].format(course_id=course_id), headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert [week["name"] for week in response.json()["course"]["weeks"]] == ["ETag Week"]
+
+    delete_test_course(instructor_session, course_id)
+
+def add_course_content(app, course_id, user_id, weeks, assignments_per_week, questions_per_assignment):
+    """Insert weeks, materials, assignments and questions directly into the in-process database"""
+    from models import db, Week, Material, Assignment, Question
+    from services.course_cache import bump_course_version
+    with app.app_context():
+        for week_index in range(weeks):
+            week = Week(name=f"Week {week_index}", course_id=course_id, user_id=user_id)
+            db.session.add(week)
+            db.session.flush()
+            db.session.add(Material(name=f"Material {week_index}", week_id=week.id, duration=10,
+                                    filename=f"{week_index}.pdf", file_path=f"/uploads/materials/{week_index}.pdf"))
+            for assignment_index in range(assignments_per_week):
+                assignment = Assignment(name=f"Assignment {week_index}.{assignment_index}",
+                                        description="Quiz", week_id=week.id)
+                db.session.add(assignment)
+                db.session.flush()
+                for question_index in range(questions_per_assignment):
+                    db.session.add(Question(description=f"Question {question_index}", option1="A", option2="B",
+                                            option3="C", option4="D", correct_option=1, assignment_id=assignment.id))
+        bump_course_version(course_id)
+        db.session.commit()
+
+def test_single_course_query_count_is_constant(app, app_instructor_client):
+    """Test that the course tree is loaded with the same number of queries however large it grows"""
+    client = app_instructor_client
+    response = client.post("/api/v1/course/create", data={"name": "Query Count Course", "description": "Course tree"})
+    course_id = response.json["course"]["id"]
+
+    add_course_content(app, course_id, client.user_id, weeks=1, assignments_per_week=1, questions_per_assignment=1)
+    with count_queries(app) as small_course_queries:
+        response = client.get(f"/api/v1/course/{course_id}")
+    assert response.status_code == 200
+    assert len(response.json["course"]["weeks"]) == 1
+
+    add_course_content(app, course_id, client.user_id, weeks=14, assignments_per_week=4, questions_per_assignment=5)
+    with count_queries(app) as large_course_queries:
+        response = client.get(f"/api/v1/course/{course_id}")
+    assert response.status_code == 200
+    weeks = response.json["course"]["weeks"]
+    assert len(weeks) == 15
+    assert sum(len(item["questions"]) for week in weeks for item in week["materials"] if item.get("isAssignment")) == 281
+
+    assert len(large_course_queries) == len(small_course_queries)
+
+def test_courses_are_paginated_with_a_cursor(app, app_instructor_client):
+    """Test that walking the course list page by page returns every course exactly once"""
+    client = app_instructor_client
+    for number in range(7):
+        client.post("/api/v1/course/create", data={"name": f"Paged Course {number}", "description": "Paging"})
+
+    response = client.get("/api/v1/course", query_string={"limit": 3, "include_total": "true"})
+    assert response.status_code == 200
+    assert response.json["total"] == 7
+    seen = [course["id"] for course in response.json["courses"]]
+    cursor = response.json["next_cursor"]
+    while cursor:
+        response = client.get("/api/v1/course", query_string={"limit": 3, "cursor": cursor})
+        assert "total" not in response.json
+        seen += [course["id"] for course in response.json["courses"]]
+        cursor = response.json["next_cursor"]
+    assert len(seen) == 7
+    assert seen == sorted(set(seen))
+
+    assert client.get("/api/v1/course", query_string={"cursor": "not-a-cursor"}).status_code == 400
+    assert client.get("/api/v1/course", query_string={"limit": 0}).status_code == 400
+    assert_rejects_bad_pages(client, "/api/v1/course")
@@ -0,0 +1,100 @@
+from tests.conftest import count_queries, signup, walk_pages, assert_rejects_bad_pages
+
+def create_course(client, name):
+    return client.post("/api/v1/course/create", data={"name": name, "description": "Requests"}).json["course"]["id"]
+
+def test_enrollment_request_listings(app, app_instructor_client):
+    """Test that both listings are filtered by status, paginated and use a constant number of queries"""
+    instructor = app_instructor_client
+    course_ids = [create_course(instructor, f"Requested Course {i}") for i in range(3)]
+    students = [signup(app, f"student{i}@mail.com", False) for i in range(4)]
+    for student in students:
+        for course_id in course_ids:
+            assert student.post("/api/v1/enrollment-request", json={"course_id": course_id}).status_code == 201
+
+    first_request = instructor.get("/api/v1/enrollment-request/instructor").json["enrollment_requests"][0]
+    assert first_request["student_name"] == "Test student0"
+    assert first_request["course_name"] == "Requested Course 0"
+    response = instructor.post(f"/api/v1/enrollment-request/{first_request['id']}/action", json={"action": "reject"})
+    assert response.status_code == 200
+
+    with count_queries(app) as queries:
+        response = instructor.get("/api/v1/enrollment-request/instructor", query_string={
+            "status": "pending", "limit": 5, "include_total": "true"
+        })
+    assert response.json["total"] == 11
+    assert len(response.json["enrollment_requests"]) == 5
+    assert {request["status"] for request in response.json["enrollment_requests"]} == {"pending"}
+    with count_queries(app) as next_page_queries:
+        response = instructor.get("/api/v1/enrollment-request/instructor", query_string={
+            "status": "pending", "limit": 5, "cursor": response.json["next_cursor"]
+        })
+    assert len(response.json["enrollment_requests"]) == 5
+    assert len(next_page_queries) == len(queries) - 1  # no total requested
+
+    response = students[0].get("/api/v1/enrollment-request/student", query_string={"status": "rejected"})
+    assert [request["course_name"] for request in response.json["enrollment_requests"]] == ["Requested Course 0"]
+    assert len(students[0].get("/api/v1/enrollment-request/student").json["enrollment_requests"]) == 3
+
+    assert instructor.get("/api/v1/enrollment-request/instructor", query_string={"status": "done"}).status_code == 400
+
+def test_bulk_enrollment_request_actions(app, app_instructor_client):
+    """Test approving and rejecting many requests in one call, skipping existing enrollments"""
+    from models import db, Enrollment
+    instructor = app_instructor_client
+    course_id = create_course(instructor, "Bulk Course")
+    other_course_id = create_course(signup(app, "other@mail.com", True), "Other Course")
+    students = [signup(app, f"bulk{i}@mail.com", False) for i in range(6)]
+    for student in students:
+        student.post("/api/v1/enrollment-request", json={"course_id": course_id})
+    students[0].post("/api/v1/enrollment-request", json={"course_id": other_course_id})
+    with app.app_context():
+        # Already enrolled, e.g. by hand
+        db.session.add(Enrollment(student_id=students[1].user_id, course_id=course_id))
+        db.session.commit()
+
+    request_ids = [request["id"] for request in instructor.get("/api/v1/enrollment-request/instructor").json["enrollment_requests"]]
+    with count_queries(app) as queries:
+        response = instructor.post("/api/v1/enrollment-request/bulk-action", json={
+            "action": "approve", "request_ids": request_ids[:3]
+        })
+    assert response.status_code == 200
+    assert response.json["updated"] == 3
+    assert response.json["enrolled"] == 2
+    assert sum(statement.startswith("INSERT INTO enrollment ") for statement in queries) == 1
+    assert sum(statement.startswith("UPDATE enrollment_request") for statement in queries) == 1
+
+    response = instructor.post("/api/v1/enrollment-request/bulk-action", json={"action": "reject", "course_id": course_id})
+    assert response.json["updated"] == 3
+    with app.app_context():
+        assert Enrollment.query.filter_by(course_id=course_id).count() == 3
+    statuses = [request["status"] for request in instructor.get("/api/v1/enrollment-request/instructor").json["enrollment_requests"]]
+    assert statuses == ["approved"] * 3 + ["rejected"] * 3
+
+    other_request_id = students[0].get("/api/v1/enrollment-request/student", query_string={
+        "status": "pending"
+    }).json["enrollment_requests"][0]["id"]
+    response = instructor.post("/api/v1/enrollment-request/bulk-action", json={
+        "action": "approve", "request_ids": [request_ids[0], other_request_id]
+    })
+    assert response.status_code == 403
+    response = instructor.post("/api/v1/enrollment-request/bulk-action", json={"action": "approve", "request_ids": [99999]})
+    assert response.status_code == 404
+    assert instructor.post("/api/v1/enrollment-request/bulk-action", json={"action": "approve"}).status_code == 400
+
+def test_enrollment_request_listings_walk_every_page(app, app_instructor_client):
+    """Test that following next_cursor returns every request of both listings exactly once"""
+    instructor = app_instructor_client
+    course_ids = [create_course(instructor, f"Walked Course {i}") for i in range(3)]
+    students = [signup(app, f"walker{i}@mail.com", False) for i in range(3)]
+    for student in students:
+        for course_id in course_ids:
+            assert student.post("/api/v1/enrollment-request", json={"course_id": course_id}).status_code == 201
+
+    assert len(walk_pages(instructor, "/api/v1/enrollment-request/instructor", "enrollment_requests")) == 9
+    assert len(walk_pages(instructor, "/api/v1/enrollment-request/instructor", "enrollment_requests",
+                          status="pending")) == 9
+    requests = walk_pages(students[1], "/api/v1/enrollment-request/student", "enrollment_requests")
+    assert [request["course_name"] for request in requests] == [f"Walked Course {i}" for i in range(3)]
+    assert_rejects_bad_pages(instructor, "/api/v1/enrollment-request/instructor")
+    assert_rejects_bad_pages(students[1], "/api/v1/enrollment-request/student")
@@ -0,0 +1,50 @@
+import pytest
+from datetime import datetime, timedelta
+from sqlalchemy import text
+from models import (
+    db, Score, Enrollment, Material, Assignment, Question, MaterialDoubt,
+    EnrollmentRequest, Review, Week
+)
+
+def query_plan(query):
+    """Return the EXPLAIN QUERY PLAN details of a SQLAlchemy query as one string"""
+    statement = query.statement.compile(db.engine, compile_kwargs={"literal_binds": True})
+    rows = db.session.execute(text(f"EXPLAIN QUERY PLAN {statement}")).all()
+    return "\n".join(row[-1] for row in rows)
+
+HOT_QUERIES = [
+    ("uq_score_student_assignment", lambda: Score.query.filter_by(student_id=1, assignment_id=1)),
+    ("ix_score_assignment_id", lambda: Score.query.filter_by(assignment_id=1)),
+    ("uq_enrollment_student_course", lambda: Enrollment.query.filter_by(student_id=1, course_id=1)),
+    ("ix_enrollment_course_id", lambda: Enrollment.query.filter_by(course_id=1)),
+    ("ix_material_week_id", lambda: Material.query.filter_by(week_id=1)),
+    ("ix_assignment_week_id", lambda: Assignment.query.filter_by(week_id=1)),
+    ("ix_question_assignment_id", lambda: Question.query.filter_by(assignment_id=1)),
+    ("ix_material_doubt_material_created", lambda: MaterialDoubt.query.filter_by(material_id=1).order_by(MaterialDoubt.created_at)),
+    ("ix_material_doubt_student_created", lambda: MaterialDoubt.query.filter(
+        MaterialDoubt.student_id == 1,
+        MaterialDoubt.created_at >= datetime(2025, 1, 1) - timedelta(days=10)
+    )),
+    ("ix_enrollment_request_course_status", lambda: EnrollmentRequest.query.filter(
+        EnrollmentRequest.course_id.in_([1, 2, 3]),
+        EnrollmentRequest.status == "pending"
+    )),
+    ("ix_enrollment_request_student_id", lambda: EnrollmentRequest.query.filter_by(student_id=1)),
+    ("uq_review_material_user", lambda: Review.query.filter_by(user_id=1, material_id=1)),
+    ("ix_week_course_id", lambda: Week.query.filter(Week.course_id.in_([1, 2, 3]))),
+]
+
+@pytest.mark.parametrize("index_name,build_query", HOT_QUERIES, ids=[name for name, _ in HOT_QUERIES])
+def test_hot_query_uses_index(app, index_name, build_query):
+    with app.app_context():
+        plan = query_plan(build_query())
+        assert index_name in plan, plan
+
+def test_one_score_per_student_per_assignment(app):
+    from sqlalchemy.exc import IntegrityError
+    with app.app_context():
+        db.session.add(Score(student_id=1, assignment_id=1, score=1, max_score=1))
+        db.session.add(Score(student_id=1, assignment_id=1, score=0, max_score=1))
+        with pytest.raises(IntegrityError):
+            db.session.commit()
+        db.session.rollback()
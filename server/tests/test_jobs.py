@@ -0,0 +1,40 @@
+import time
+from datetime import datetime, timedelta
+
+def test_only_jobs_with_expired_leases_are_requeued(app):
+    """Test that a long running job that still heartbeats is left alone while a dead worker's job is requeued"""
+    from models import db, BackgroundJob
+    from services.jobs import requeue_stale_jobs
+    started = datetime.now() - timedelta(hours=2)
+    with app.app_context():
+        alive = BackgroundJob(kind="transcribe_material", status="running", attempts=1,
+                              started_at=started, heartbeat_at=datetime.now())
+        dead = BackgroundJob(kind="transcribe_material", status="running", attempts=1,
+                             started_at=started, heartbeat_at=datetime.now() - timedelta(minutes=10))
+        db.session.add_all([alive, dead])
+        db.session.commit()
+
+        assert requeue_stale_jobs(lease_timeout=120) == 1
+        assert db.session.get(BackgroundJob, alive.id).status == "running"
+        assert db.session.get(BackgroundJob, dead.id).status == "queued"
+
+def test_running_job_renews_its_lease(app, monkeypatch):
+    """Test that a job running longer than the lease timeout is not claimed a second time"""
+    from models import db, BackgroundJob
+    from services.jobs import JOB_HANDLERS, enqueue_job, requeue_stale_jobs, run_worker
+    app.config.update(JOB_HEARTBEAT_INTERVAL=0.02, JOB_LEASE_TIMEOUT=0.1)
+
+    def slow_job(payload):
+        time.sleep(0.3)
+        return {"requeued": requeue_stale_jobs(lease_timeout=0.1)}
+    monkeypatch.setitem(JOB_HANDLERS, "slow", slow_job)
+
+    with app.app_context():
+        job_id = enqueue_job("slow").id
+        db.session.commit()
+    run_worker(app, once=True)
+
+    with app.app_context():
+        job = db.session.get(BackgroundJob, job_id)
+        assert (job.status, job.attempts, job.result) == ("done", 1, '{"requeued": 0}')
+        assert job.heartbeat_at > job.started_at + timedelta(seconds=0.2)
@@ -0,0 +1,119 @@
+import pytest
+from google.genai import errors
+from tests.test_ai import FakeResponse
+
+class FlakyClient:
+    """Fails with the given errors before answering"""
+    def __init__(self, failures):
+        self.failures = list(failures)
+        self.models = self
+        self.calls = 0
+
+    def generate_content(self, model, contents, config=None):
+        self.calls += 1
+        if self.failures:
+            raise self.failures.pop(0)
+        return FakeResponse("ok")
+
+    def generate_content_stream(self, model, contents, config=None):
+        self.calls += 1
+        if self.failures:
+            raise self.failures.pop(0)
+        yield FakeResponse("o")
+        yield FakeResponse("k")
+
+def unavailable():
+    return errors.ServerError(503, {"error": {"message": "unavailable", "status": "UNAVAILABLE"}})
+
+@pytest.fixture
+def gateway(app, monkeypatch):
+    import services.llm
+    from services.llm import LLMGateway
+    monkeypatch.setattr(services.llm, "RETRY_BASE_DELAY", 0)
+    app.config.update(LLM_MAX_RETRIES=2, LLM_BREAKER_THRESHOLD=2, LLM_BREAKER_COOLDOWN=60, LLM_TIMEOUT=5)
+    with app.app_context():
+        yield LLMGateway()
+
+def test_transient_errors_are_retried(gateway):
+    gateway._client = FlakyClient([unavailable(), unavailable()])
+    assert gateway.generate_content(model="m", contents="q").text == "ok"
+    assert gateway._client.calls == 3
+    stats = gateway.get_stats()
+    assert stats["retries"] == 2 and stats["successes"] == 1
+    assert sum(stats["latency_buckets"].values()) == 1
+
+def test_client_errors_are_not_retried(gateway):
+    gateway._client = FlakyClient([errors.ClientError(400, {"error": {"message": "bad", "status": "INVALID_ARGUMENT"}})])
+    with pytest.raises(errors.ClientError):
+        gateway.generate_content(model="m", contents="q")
+    assert gateway._client.calls == 1
+    assert gateway.get_stats()["circuit"] == "closed"
+
+def test_circuit_opens_and_recovers(gateway, monkeypatch):
+    from services.llm import LLMUnavailableError
+    gateway._client = FlakyClient([unavailable()] * 6)
+    for _ in range(2):
+        with pytest.raises(errors.ServerError):
+            gateway.generate_content(model="m", contents="q")
+    assert gateway.get_stats()["circuit"] == "open"
+
+    calls = gateway._client.calls
+    with pytest.raises(LLMUnavailableError):
+        gateway.generate_content(model="m", contents="q")
+    assert gateway._client.calls == calls
+
+    # After the cooldown one trial call goes through and closes the circuit
+    gateway._opened_at -= 60
+    gateway._client = FlakyClient([])
+    assert gateway.generate_content(model="m", contents="q").text == "ok"
+    assert gateway.get_stats()["circuit"] == "closed"
+
+def test_concurrency_limit_respects_deadline(app, gateway):
+    from services.llm import LLMUnavailableError
+    app.config.update(LLM_MAX_CONCURRENCY=1, LLM_TIMEOUT=0.05)
+    gateway._client = FlakyClient([])
+    slots = gateway._slots(1)
+    slots.acquire()
+    try:
+        with pytest.raises(LLMUnavailableError):
+            gateway.generate_content(model="m", contents="q")
+    finally:
+        slots.release()
+    assert gateway._client.calls == 0
+
+def test_stream_retries_before_first_chunk(gateway):
+    gateway._client = FlakyClient([unavailable()])
+    assert "".join(gateway.generate_content_stream(model="m", contents="q")) == "ok"
+    assert gateway._client.calls == 2
+
+def test_abandoned_stream_does_not_close_the_circuit(gateway):
+    """Test that a half-open trial stream the client walked away from neither closes nor reopens the circuit"""
+    gateway._client = FlakyClient([unavailable()] * 6)
+    for _ in range(2):
+        with pytest.raises(errors.ServerError):
+            gateway.generate_content(model="m", contents="q")
+    gateway._opened_at -= 60
+    gateway._client = FlakyClient([])
+
+    stream = gateway.generate_content_stream(model="m", contents="q")
+    assert next(stream) == "o"
+    stream.close()
+    stats = gateway.get_stats()
+    assert (stats["circuit"], stats["abandoned"], stats["successes"]) == ("open", 1, 0)
+    assert gateway._trial_running is False
+
+def test_only_the_trial_call_clears_the_trial(gateway):
+    """Test that a call admitted before the circuit opened does not let a second trial through"""
+    import time
+    from services.llm import LLMUnavailableError
+    settings = gateway.settings()
+    gateway._opened_at = time.monotonic() - 120
+    assert gateway._admit(settings) is True
+
+    # An older call finishing while the trial runs, with an error that leaves the breaker alone
+    gateway._record(settings, time.monotonic(), errors.ClientError(400, {"error": {"message": "bad", "status": "INVALID_ARGUMENT"}}))
+    with pytest.raises(LLMUnavailableError):
+        gateway._admit(settings)
+
+    gateway._record(settings, time.monotonic(), trial=True)
+    assert gateway.get_stats()["circuit"] == "closed"
@@ -1,6 +1,7 @@
+import io
 import requests
 from tests import ENDPOINTS
-from tests.conftest import create_test_material, delete_test_material, create_test_week, delete_test_week
+from tests.conftest import create_test_material, delete_test_material, create_test_week, delete_test_week, signup, walk_pages, assert_rejects_bad_pages
 
 def test_create_material_as_instructor(instructor_session):
     """Test creating a material successfully as an instructor"""
@@ -98,6 +99,46 @@ def test_create_material_unauthenticated(student_session, instructor_session):
     
     assert response.status_code == 403  # Unauthorized
 
+def test_create_video_material_queues_transcription(instructor_session):
+    """Test that uploading a video returns immediately with a transcription job to poll"""
+    files = {
+        "file": ("lecture.mp4", b"dummy video content", "video/mp4")
+    }
+    data = {
+        "name": "Video Material",
+        "duration": "10"
+    }
+    course_id, week_id = create_test_week(instructor_session)
+    response = instructor_session.post(ENDPOINTS["material_create"].format(week_id=week_id), files=files, data=data)
+
+    assert response.status_code == 201
+    material = response.json()["material"]
+    assert material["transcript_path"] is None
+    assert material["transcription_job_id"] is not None
+
+    job_response = instructor_session.get(ENDPOINTS["job_status"].format(job_id=material["transcription_job_id"]))
+    assert job_response.status_code == 200
+    assert job_response.json()["job"]["kind"] == "transcribe_material"
+    delete_test_material(instructor_session, course_id, week_id, material["id"])
+
+def test_job_status_other_user(instructor_session, student_session):
+    """Test that a user cannot poll a job they did not create"""
+    files = {
+        "file": ("lecture.mp4", b"dummy video content", "video/mp4")
+    }
+    data = {
+        "name": "Private Video Material",
+        "duration": "10"
+    }
+    course_id, week_id = create_test_week(instructor_session)
+    response = instructor_session.post(ENDPOINTS["material_create"].format(week_id=week_id), files=files, data=data)
+    assert response.status_code == 201
+    material = response.json()["material"]
+
+    job_response = student_session.get(ENDPOINTS["job_status"].format(job_id=material["transcription_job_id"]))
+    assert job_response.status_code == 403
+    delete_test_material(instructor_session, course_id, week_id, material["id"])
+
 def test_delete_material_as_instructor(instructor_session):
     """Test deleting a material successfully as an instructor"""
     course_id, week_id, material_id = create_test_material(instructor_session)
@@ -132,3 +173,107 @@ def test_delete_material_unauthenticated():
     response = requests.delete(ENDPOINTS["material_delete"].format(material_id=1))
     
     assert response.status_code == 401  # Unauthorized
+
+def upload_material(client, week_id, filename, content, name="Notes"):
+    response = client.post(f"/api/v1/material/create/{week_id}", data={
+        "name": name, "duration": "10", "file": (io.BytesIO(content), filename)
+    }, content_type="multipart/form-data")
+    assert response.status_code == 201
+    return response.json["material"]
+
+def test_material_text_is_cached(app, app_instructor_client, monkeypatch):
+    """Test that material text is extracted once per file content and dropped with the material"""
+    import services.material_text
+    from models import db, Material, MaterialText
+    from services.material_text import get_material_text
+    extracted = []
+
+    def extract(file_path):
+        extracted.append(file_path)
+        return open(file_path).read()
+
+    monkeypatch.setattr(services.material_text, "extract_text_from_file", extract)
+    client = app_instructor_client
+    course_id = client.post("/api/v1/course/create", data={"name": "Texts", "description": "Texts"}).json["course"]["id"]
+    week_id = client.post(f"/api/v1/week/create/{course_id}", data={"name": "Week 1"}).json["week"]["id"]
+    material_id = upload_material(client, week_id, "notes.pdf", b"Lenses bend light.")["id"]
+    assert len(extracted) == 1
+
+    with app.app_context():
+        material = db.session.get(Material, material_id)
+        assert get_material_text(material) == "Lenses bend light."
+        assert get_material_text(material) == "Lenses bend light."
+        assert len(extracted) == 1
+
+        # Rewritten on disk with other content
+        with open(services.material_text.get_material_source_path(material), "w") as f:
+            f.write("Mirrors reflect light, whatever the angle.")
+        assert get_material_text(material) == "Mirrors reflect light, whatever the angle."
+        assert len(extracted) == 2
+
+    # Replaced through the edit form, first with new content, then with the same bytes again
+    for content, extractions in ((b"Prisms split light.", 3), (b"Prisms split light.", 3)):
+        response = client.put(f"/api/v1/material/edit/{material_id}", data={
+            "title": "Notes", "file": (io.BytesIO(content), "notes.pdf")
+        }, content_type="multipart/form-data")
+        assert response.status_code == 200
+        assert len(extracted) == extractions
+    with app.app_context():
+        assert MaterialText.query.filter_by(material_id=material_id).one().text == "Prisms split light."
+        assert get_material_text(db.session.get(Material, material_id)) == "Prisms split light."
+    assert len(extracted) == 3
+
+    assert client.delete(f"/api/v1/material/delete/{material_id}").status_code == 200
+    with app.app_context():
+        assert MaterialText.query.filter_by(material_id=material_id).count() == 0
+
+def test_video_material_is_transcribed_in_background(app, app_instructor_client, monkeypatch):
+    """Test that the queued transcription job attaches the transcript and its timeline to the video"""
+    import os
+    import services.transcription
+    from models import db, Material
+    from services.jobs import run_worker
+    transcribed = []
+
+    def transcribe_video(video_path):
+        transcribed.append(video_path)
+        return {"text": "Lenses bend light towards the focus.", "segments": [
+            {"start": 0.0, "text": "Lenses bend light"}, {"start": 4.2, "text": "towards the focus."}
+        ]}
+
+    monkeypatch.setattr(services.transcription, "transcribe_video", transcribe_video)
+    client = app_instructor_client
+    course_id = client.post("/api/v1/course/create", data={"name": "Videos", "description": "Videos"}).json["course"]["id"]
+    week_id = client.post(f"/api/v1/week/create/{course_id}", data={"name": "Week 1"}).json["week"]["id"]
+    material = upload_material(client, week_id, "lecture.mp4", b"dummy video content", name="Video Material")
+    assert material["transcript_path"] is None
+    job = client.get(f"/api/v1/job/{material['transcription_job_id']}").json["job"]
+    assert (job["kind"], job["status"]) == ("transcribe_material", "queued")
+
+    run_worker(app, once=True)
+
+    job = client.get(f"/api/v1/job/{material['transcription_job_id']}").json["job"]
+    assert job["status"] == "done"
+    assert transcribed == [os.path.join("uploads/materials", f"{material['id']}.mp4")]
+    with app.app_context():
+        video = db.session.get(Material, material["id"])
+        assert video.transcript_path == f"/uploads/transcripts/{material['id']}.pdf"
+        assert os.path.exists(video.transcript_path.lstrip("/"))
+        assert services.transcription.load_transcript_timeline(video) == [[0.0, 0], [4.2, 3]]
+
+def test_material_doubts_are_paginated(app, app_instructor_client):
+    """Test that a material's doubts can be walked page by page with the students' names"""
+    client = app_instructor_client
+    course_id = client.post("/api/v1/course/create", data={"name": "Doubts", "description": "Doubts"}).json["course"]["id"]
+    week_id = client.post(f"/api/v1/week/create/{course_id}", data={"name": "Week 1"}).json["week"]["id"]
+    material_id = upload_material(client, week_id, "notes.txt", b"Lenses bend light.")["id"]
+    students = [signup(app, f"doubter{i}@mail.com", False) for i in range(3)]
+    for number in range(2):
+        for student in students:
+            response = student.post(f"/api/v1/material/{material_id}/doubt", json={"doubt_text": f"Doubt {number}"})
+            assert response.status_code == 201
+
+    doubts = walk_pages(client, f"/api/v1/material/{material_id}/doubts", "doubts")
+    assert len(doubts) == 6
+    assert doubts[0]["student_name"] == "Test doubter0"
+    assert_rejects_bad_pages(client, f"/api/v1/material/{material_id}/doubts")
@@ -1,3 +1,4 @@
+import io
 from tests import ENDPOINTS
 from tests.conftest import create_test_question, delete_test_question, create_test_assignment, delete_test_assignment
 
@@ -84,3 +85,100 @@ def test_delete_nonexistent_question(instructor_session):
     response = instructor_session.delete(ENDPOINTS["question_delete"].format(question_id=9999))
     assert response.status_code == 404
     assert response.json()["error"] == "Invalid question_id"
+
+def test_edit_question(instructor_session):
+    """Test instructor editing a question's text and answer key"""
+    course_id, week_id, assignment_id, question_id = create_test_question(instructor_session)
+    response = instructor_session.put(ENDPOINTS["question_edit"].format(question_id=question_id), data={
+        "question_description": "What is 3 + 3?",
+        "correct_option": "2"
+    })
+    assert response.status_code == 200
+    assert response.json()["question"]["question_description"] == "What is 3 + 3?"
+    assert response.json()["question"]["correct_option"] == 2
+    assert response.json()["question"]["option1"] == "1"
+    delete_test_question(instructor_session, course_id, week_id, assignment_id, question_id)
+
+def test_edit_question_invalid_correct_option(instructor_session):
+    """Test editing a question with an invalid correct_option"""
+    course_id, week_id, assignment_id, question_id = create_test_question(instructor_session)
+    response = instructor_session.put(ENDPOINTS["question_edit"].format(question_id=question_id), data={
+        "correct_option": "7"
+    })
+    assert response.status_code == 400
+    assert response.json()["error"] == "Correct option must be between 1 and 4"
+    delete_test_question(instructor_session, course_id, week_id, assignment_id, question_id)
+
+def create_app_assignment(client):
+    """Create a course, week and assignment through the in-process client"""
+    course_id = client.post("/api/v1/course/create", data={"name": "Import", "description": "Import"}).json["course"]["id"]
+    week_id = client.post(f"/api/v1/week/create/{course_id}", data={"name": "Week 1"}).json["week"]["id"]
+    return client.post(f"/api/v1/assignment/create/{week_id}", data={
+        "name": "Quiz", "description": "Quiz"
+    }).json["assignment"]["id"]
+
+def test_import_questions_json(app, app_instructor_client):
+    """Test importing a JSON list of questions in one request"""
+    assignment_id = create_app_assignment(app_instructor_client)
+    questions = [{
+        "question_description": f"What is {i} + 1?",
+        "option1": str(i), "option2": str(i + 1), "option3": str(i + 2), "option4": str(i + 3),
+        "correct_option": [2, "2", " 2 ", 2.0][i % 4]
+    } for i in range(50)]
+    response = app_instructor_client.post(f"/api/v1/question/import/{assignment_id}", json={"questions": questions})
+    assert response.status_code == 201
+    assert len(response.json["question_ids"]) == 50
+
+    response = app_instructor_client.get(f"/api/v1/question/{assignment_id}")
+    assert [question["question_description"] for question in response.json["questions"]][:2] == ["What is 0 + 1?", "What is 1 + 1?"]
+    assert {question["correct_option"] for question in response.json["questions"]} == {2}
+
+    response = app_instructor_client.post(f"/api/v1/question/import/{assignment_id}", json={"questions": [
+        dict(questions[0], correct_option=value) for value in (2.5, True, 0)
+    ]})
+    assert response.status_code == 400
+    assert [error["row"] for error in response.json["errors"]] == [1, 2, 3]
+
+def test_import_questions_csv_reports_row_errors(app, app_instructor_client):
+    """Test that an invalid CSV import reports every bad row and imports nothing"""
+    assignment_id = create_app_assignment(app_instructor_client)
+    csv_data = (
+        "question_description,option1,option2,option3,option4,correct_option\n"
+        "What is 2 + 2?,1,2,4,5,3\n"
+        "What is 3 + 3?,6,7,8,9,5\n"
+        ",1,2,3,4,1\n"
+    )
+    response = app_instructor_client.post(f"/api/v1/question/import/{assignment_id}",
+                                          data={"file": (io.BytesIO(csv_data.encode()), "questions.csv")})
+    assert response.status_code == 400
+    assert response.json["errors"] == [
+        {"row": 2, "errors": ["Correct option must be between 1 and 4"]},
+        {"row": 3, "errors": ["question_description is required"]}
+    ]
+    response = app_instructor_client.get(f"/api/v1/question/{assignment_id}")
+    assert response.json["questions"] == []
+
+    response = app_instructor_client.post(f"/api/v1/question/import/{assignment_id}",
+                                          data={"file": (io.BytesIO((csv_data.rsplit("\n", 3)[0] + "\n").encode()), "questions.csv")})
+    assert response.status_code == 201
+    assert len(response.json["question_ids"]) == 1
+
+def test_import_questions_generates_hints_on_the_rate_limited_pool(app, app_instructor_client):
+    """Test that an import's hints are generated by course pre-generation rather than one sequential hint job"""
+    from models import Question
+    from services.jobs import run_worker
+    app.config.update(LLM_CLIENT="fake", PREGENERATE_RATE=0)
+    assignment_id = create_app_assignment(app_instructor_client)
+    questions = [{
+        "question_description": f"What is {i} + 2?",
+        "option1": str(i), "option2": str(i + 1), "option3": str(i + 2), "option4": str(i + 3),
+        "correct_option": 3
+    } for i in range(3)]
+    response = app_instructor_client.post(f"/api/v1/question/import/{assignment_id}", json={"questions": questions})
+    assert response.status_code == 201
+    run_worker(app, once=True)
+
+    job = app_instructor_client.get(f"/api/v1/job/{response.json['hint_job_id']}").json["job"]
+    assert (job["kind"], job["status"], job["result"]["generated"]) == ("pregenerate_course", "done", 3)
+    with app.app_context():
+        assert all(question.hint for question in Question.query.filter_by(assignment_id=assignment_id))
@@ -1,6 +1,7 @@
+import pytest
 import requests
 from tests import ENDPOINTS
-from tests.conftest import create_test_review, delete_test_review, create_test_material, delete_test_material
+from tests.conftest import create_test_review, delete_test_review, create_test_material, delete_test_material, count_queries, walk_pages, assert_rejects_bad_pages
 
 def test_create_review(instructor_session, student_session):
     """Test successfully creating a review for a material"""
@@ -99,4 +100,91 @@ def test_create_review_unauthenticated():
         data=review_data,
         headers={"Content-Type": "application/x-www-form-urlencoded"}
     )
-    assert response.status_code == 401  # Unauthorized
\ No newline at end of file
+    assert response.status_code == 401  # Unauthorized
+
+def add_reviews(app, instructor_id, courses, materials_per_course, reviewers):
+    """Insert courses with reviewed materials directly into the in-process database, returns the course ids"""
+    from models import db, User, Course, Week, Material, Review
+    with app.app_context():
+        users = [User(email=f"reviewer-{courses}x{materials_per_course}-{i}@mail.com", password="unused",
+                      fname="Reviewer", lname=str(i)) for i in range(reviewers)]
+        db.session.add_all(users)
+        course_ids = []
+        for course_index in range(courses):
+            course = Course(name=f"Reviewed Course {course_index}", description="Reviews", creator_user_id=instructor_id)
+            db.session.add(course)
+            db.session.flush()
+            course_ids.append(course.id)
+            week = Week(name="Week 1", course_id=course.id, user_id=instructor_id)
+            db.session.add(week)
+            db.session.flush()
+            for material_index in range(materials_per_course):
+                material = Material(name=f"Material {material_index}", week_id=week.id, duration=10, filename="m.pdf")
+                db.session.add(material)
+                db.session.flush()
+                for i, user in enumerate(users):
+                    db.session.add(Review(material_id=material.id, user_id=user.id, rating=i % 5 + 1, comment="Fine"))
+        db.session.commit()
+        return course_ids
+
+def test_instructor_reviews_single_query(app, app_instructor_client):
+    """Test that instructor reviews are filtered and aggregated in SQL with a constant number of queries"""
+    client = app_instructor_client
+    add_reviews(app, client.user_id, courses=1, materials_per_course=1, reviewers=1)
+    with count_queries(app) as few_reviews:
+        assert len(client.get("/api/v1/review/instructor").json["reviews"]) == 1
+
+    course_ids = add_reviews(app, client.user_id, courses=2, materials_per_course=3, reviewers=5)
+    with count_queries(app) as many_reviews:
+        response = client.get("/api/v1/review/instructor", query_string={"limit": 100})
+    assert len(response.json["reviews"]) == 31
+    assert len(many_reviews) == len(few_reviews)
+
+    response = client.get("/api/v1/review/instructor", query_string={"course_id": course_ids[0], "rating": 5})
+    reviews = response.json["reviews"]
+    assert len(reviews) == 3
+    assert {(review["course_id"], review["rating"]) for review in reviews} == {(course_ids[0], 5)}
+
+    materials = client.get("/api/v1/review/instructor", query_string={"course_id": course_ids[1]}).json["materials"]
+    assert len(materials) == 3
+    assert materials[0]["review_count"] == 5
+    assert materials[0]["average_rating"] == 3.0
+
+    response = client.get("/api/v1/review/instructor", query_string={"limit": 10})
+    assert "materials" not in client.get("/api/v1/review/instructor", query_string={
+        "limit": 10, "cursor": response.json["next_cursor"]
+    }).json
+    assert client.get("/api/v1/review/instructor", query_string={"rating": 9}).status_code == 400
+
+def test_instructor_reviews_walk_every_page(app, app_instructor_client):
+    """Test that following next_cursor returns every review exactly once, with the aggregates on the first page only"""
+    client = app_instructor_client
+    add_reviews(app, client.user_id, courses=2, materials_per_course=2, reviewers=2)
+    assert len(walk_pages(client, "/api/v1/review/instructor", "reviews", limit=3)) == 8
+    first_page = client.get("/api/v1/review/instructor", query_string={"limit": 3})
+    assert len(first_page.json["materials"]) == 3
+    second_page = client.get("/api/v1/review/instructor", query_string={"limit": 3, "cursor": first_page.json["next_cursor"]})
+    assert "materials" not in second_page.json
+
+    # The aggregates are capped like the reviews and continue at their own listing
+    materials = first_page.json["materials"] + client.get("/api/v1/review/instructor/materials", query_string={
+        "limit": 3, "cursor": first_page.json["materials_next_cursor"]
+    }).json["materials"]
+    assert [material["review_count"] for material in materials] == [2, 2, 2, 2]
+    assert len(walk_pages(client, "/api/v1/review/instructor/materials", "materials", id_field="material_id")) == 4
+    assert_rejects_bad_pages(client, "/api/v1/review/instructor/materials")
+    assert_rejects_bad_pages(client, "/api/v1/review/instructor")
+
+@pytest.mark.parametrize("url", ["/api/v1/review/instructor", "/api/v1/review/instructor/materials"])
+@pytest.mark.parametrize("params, error", [
+    ({"course_id": "abc"}, "course_id must be an integer"),
+    ({"course_id": ""}, "course_id must be an integer"),
+    ({"rating": "five"}, "rating must be an integer"),
+    ({"rating": "4.5"}, "rating must be an integer"),
+    ({"rating": 0}, "Rating must be between 1 and 5"),
+])
+def test_instructor_reviews_reject_bad_filters(app_instructor_client, url, params, error):
+    """Test that bad course_id and rating filters are rejected like a bad limit instead of being ignored"""
+    response = app_instructor_client.get(url, query_string=params)
+    assert response.status_code == 400
+    assert response.json["error"] == error
@@ -0,0 +1,161 @@
+import os
+import pytest
+
+def create_catalog(client):
+    """Course with a week and an assignment, created through the API"""
+    course = client.post("/api/v1/course/create", data={
+        "name": "Machine Learning Foundations",
+        "description": "Regression, classification and neural networks"
+    }).json["course"]
+    week_id = client.post(f"/api/v1/week/create/{course['id']}", data={"name": "Week 1"}).json["week"]["id"]
+    assignment_id = client.post(f"/api/v1/assignment/create/{week_id}", data={
+        "name": "Gradient Descent Quiz",
+        "description": "Learning rates and convergence"
+    }).json["assignment"]["id"]
+    return course["id"], week_id, assignment_id
+
+def signup_student(app):
+    client = app.test_client()
+    response = client.post("/api/v1/auth/signup", data={
+        "email": "searcher@mail.com",
+        "password": "password123",
+        "password_confirm": "password123",
+        "fname": "Search",
+        "lname": "Student",
+        "is_instructor": "false"
+    })
+    client.user_id = response.json["user"]["id"]
+    return client
+
+def search(client, query, **params):
+    response = client.get("/api/v1/search", query_string={"query": query, **params})
+    assert response.status_code == 200
+    return response.json
+
+def test_search_matches_prefixes_and_ranks_titles_first(app, app_instructor_client):
+    """Test that partial words match and a title match outranks a description match"""
+    course_id, week_id, assignment_id = create_catalog(app_instructor_client)
+
+    results = search(app_instructor_client, "gradie")["results"]
+    assert [(result["type"], result["id"]) for result in results] == [("assignment", assignment_id)]
+    assert results[0]["course_id"] == course_id
+    assert results[0]["week_id"] == week_id
+
+    results = search(app_instructor_client, "learn")["results"]
+    assert results[0] == {
+        "id": course_id,
+        "name": "Machine Learning Foundations",
+        "description": "Regression, classification and neural networks",
+        "type": "course"
+    }
+    assert results[1]["id"] == assignment_id
+
+def test_search_indexes_material_text(app, app_instructor_client, monkeypatch):
+    """Test that materials are found by their extracted text and dropped from the index on delete"""
+    from tests.test_ai import add_material
+    material_id = add_material(app, "search_notes.pdf", "Backpropagation applies the chain rule.",
+                               monkeypatch, app_instructor_client.user_id)
+
+    results = search(app_instructor_client, "backprop")["results"]
+    assert [(result["type"], result["id"]) for result in results] == [("material", material_id)]
+
+    assert app_instructor_client.delete(f"/api/v1/material/delete/{material_id}").status_code == 200
+    assert search(app_instructor_client, "backprop")["results"] == []
+
+def test_search_follows_edits(app, app_instructor_client):
+    course_id, _, _ = create_catalog(app_instructor_client)
+    response = app_instructor_client.put(f"/api/v1/course/edit/{course_id}", data={
+        "name": "Deep Learning", "description": "Transformers"
+    })
+    assert response.status_code == 200
+
+    assert [result["id"] for result in search(app_instructor_client, "transformers")["results"]] == [course_id]
+    assert search(app_instructor_client, "foundations")["results"] == []
+
+def test_search_only_returns_enrolled_courses(app, app_instructor_client):
+    """Test that students only find the content of courses they are enrolled in"""
+    from models import db, Enrollment
+    course_id, _, _ = create_catalog(app_instructor_client)
+    student = signup_student(app)
+    assert search(student, "gradient")["results"] == []
+
+    with app.app_context():
+        db.session.add(Enrollment(student_id=student.user_id, course_id=course_id))
+        db.session.commit()
+    assert [result["type"] for result in search(student, "gradient")["results"]] == ["assignment"]
+
+def test_search_pagination(app, app_instructor_client):
+    for number in range(5):
+        app_instructor_client.post("/api/v1/course/create", data={
+            "name": f"Statistics {number}", "description": "Probability"
+        })
+
+    first = search(app_instructor_client, "statistics", limit=3)
+    assert first["count"] == 3
+    assert first["next_offset"] == 3
+    second = search(app_instructor_client, "statistics", limit=3, offset=first["next_offset"])
+    assert second["count"] == 2
+    assert second["next_offset"] is None
+    ids = [result["id"] for result in first["results"] + second["results"]]
+    assert len(set(ids)) == 5
+
+@pytest.mark.parametrize("query", ['"unbalanced', "AND OR NOT", "c++ (x*"])
+def test_search_escapes_query_syntax(app, app_instructor_client, query):
+    assert app_instructor_client.get("/api/v1/search", query_string={"query": query}).status_code == 200
+
+def test_content_search_returns_highlighted_snippets(app, app_instructor_client, monkeypatch):
+    """Test that content search points into the material text and into the video for transcripts"""
+    import json
+    from models import db, Material
+    from services.material_text import refresh_material_text
+    from tests.test_ai import add_material, filler
+    text = f"{filler(300)} The chain rule drives backpropagation. {filler(300, 'ipsum')}"
+    pdf_id = add_material(app, "content_notes.pdf", text, monkeypatch, app_instructor_client.user_id)
+
+    results = search(app_instructor_client, "backpropagation", mode="content")["results"]
+    assert [result["id"] for result in results] == [pdf_id]
+    start, end = results[0]["highlights"][0]
+    assert results[0]["snippet"][start:end] == "backpropagation"
+    assert results[0]["timestamp"] is None
+
+    # A transcribed video: the match is in the third segment of the timeline
+    os.makedirs("uploads/transcripts", exist_ok=True)
+    with open("uploads/transcripts/video_notes.pdf", "w") as f:
+        f.write(text)
+    with open("uploads/transcripts/video_notes.json", "w") as f:
+        json.dump([[0.0, 0], [95.0, 200], [190.5, 290], [300.0, 400]], f)
+    with app.app_context():
+        material = Material.query.get(pdf_id)
+        material.filename = "video_notes.mp4"
+        material.file_path = "/uploads/materials/video_notes.mp4"
+        material.transcript_path = "/uploads/transcripts/video_notes.pdf"
+        refresh_material_text(material)
+        db.session.commit()
+
+    results = search(app_instructor_client, "backprop", mode="content")["results"]
+    assert results[0]["timestamp"] == 190.5
+
+    assert search(app_instructor_client, "chain", mode="catalog")["results"][0]["type"] == "material"
+    assert app_instructor_client.get("/api/v1/search", query_string={"query": "chain", "mode": "x"}).status_code == 400
+
+def test_search_query_count_does_not_grow_with_results(app, app_instructor_client):
+    """Test that search runs one statement per request, without per-result lookups"""
+    from tests.conftest import count_queries
+    course_id, _, _ = create_catalog(app_instructor_client)
+    week_id = app_instructor_client.post(f"/api/v1/week/create/{course_id}", data={"name": "Week 2"}).json["week"]["id"]
+    with count_queries(app) as few_results:
+        assert search(app_instructor_client, "gradient")["count"] == 1
+
+    for number in range(10):
+        app_instructor_client.post(f"/api/v1/assignment/create/{week_id}", data={
+            "name": f"Gradient Practice {number}", "description": "More gradients"
+        })
+    with count_queries(app) as many_results:
+        assert search(app_instructor_client, "gradient")["count"] == 11
+    assert len(many_results) == len(few_results)
+    assert sum("search_index" in statement for statement in many_results) == 1
+
+    results = search(app_instructor_client, "learning", types="course")["results"]
+    assert [result["type"] for result in results] == ["course"]
+    response = app_instructor_client.get("/api/v1/search", query_string={"query": "learning", "types": "week"})
+    assert response.status_code == 400
@@ -0,0 +1,115 @@
+from tests.conftest import count_queries, signup
+
+def create_quiz(client, correct_options, name="Quiz"):
+    course_id = client.post("/api/v1/course/create", data={"name": name, "description": "Quiz"}).json["course"]["id"]
+    week_id = client.post(f"/api/v1/week/create/{course_id}", data={"name": "Week 1"}).json["week"]["id"]
+    assignment_id = client.post(f"/api/v1/assignment/create/{week_id}", data={
+        "name": "Quiz", "description": "Quiz"
+    }).json["assignment"]["id"]
+    question_ids = []
+    for i, correct_option in enumerate(correct_options):
+        response = client.post(f"/api/v1/question/create/{assignment_id}", data={
+            "question_description": f"Question {i}?",
+            "option1": "A", "option2": "B", "option3": "C", "option4": "D",
+            "correct_option": str(correct_option)
+        })
+        question_ids.append(response.json["question"]["id"])
+    return assignment_id, question_ids
+
+def test_submission_grading_and_regrade(app, app_instructor_client):
+    """Test that string and integer options grade alike and that fixing the answer key regrades submissions"""
+    from services.grading import answer_keys
+    answer_keys.clear()  # other tests' databases reuse the same ids
+    instructor = app_instructor_client
+    assignment_id, question_ids = create_quiz(instructor, [1, 2, 3, 4])
+    first, second = signup(app, "first@mail.com", False), signup(app, "second@mail.com", False)
+
+    # Strings, padded strings and floats all mean the option number; unknown questions are ignored
+    response = first.post(f"/api/v1/assignment/submit/{assignment_id}", json={"answers": {
+        str(question_ids[0]): "1", str(question_ids[1]): 2, str(question_ids[2]): " 3 ", "999999": 4
+    }})
+    assert response.status_code == 201
+    assert response.json["score"] == {"correct": 3, "total": 4, "percentage": 75.0}
+    response = second.post(f"/api/v1/assignment/submit/{assignment_id}", json={"answers": {
+        str(question_ids[0]): True, str(question_ids[1]): "two", str(question_ids[3]): 1.0
+    }})
+    assert response.json["score"]["correct"] == 0
+    assert first.post(f"/api/v1/assignment/submit/{assignment_id}", json={"answers": {}}).status_code == 400
+
+    # The last question's key was wrong: both students answered it the other way
+    response = instructor.put(f"/api/v1/question/edit/{question_ids[3]}", data={"correct_option": "1"})
+    assert response.status_code == 200
+    assert response.json["regraded"] == {"regraded": 2, "changed": 1, "skipped": 0}
+    assert first.get(f"/api/v1/assignment/score/{assignment_id}").json["score"]["correct"] == 3
+    assert second.get(f"/api/v1/assignment/score/{assignment_id}").json["score"]["correct"] == 1
+
+    # A new question counts towards the total once regraded
+    create_response = instructor.post(f"/api/v1/question/create/{assignment_id}", data={
+        "question_description": "Question 4?", "option1": "A", "option2": "B", "option3": "C", "option4": "D",
+        "correct_option": "2"
+    })
+    assert create_response.status_code == 201
+    assert second.post(f"/api/v1/assignment/regrade/{assignment_id}").status_code == 403
+    response = instructor.post(f"/api/v1/assignment/regrade/{assignment_id}")
+    assert response.status_code == 200
+    assert response.json["changed"] == 2
+    assert first.get(f"/api/v1/assignment/score/{assignment_id}").json["score"]["total"] == 5
+
+def test_answer_key_cache(app, app_instructor_client):
+    """Test that submissions share a cached answer key, dropped whenever the questions change"""
+    from services.grading import answer_keys
+    answer_keys.clear()
+    instructor = app_instructor_client
+    assignment_id, question_ids = create_quiz(instructor, [2, 2])
+    students = [signup(app, f"student{i}@mail.com", False) for i in range(4)]
+    answers = {"answers": {str(question_id): "2" for question_id in question_ids}}
+
+    assert students[0].post(f"/api/v1/assignment/submit/{assignment_id}", json=answers).status_code == 201
+    with count_queries(app) as queries:
+        response = students[1].post(f"/api/v1/assignment/submit/{assignment_id}", json=answers)
+    assert response.json["score"]["correct"] == 2
+    assert not [statement for statement in queries if "FROM question" in statement]
+    assert instructor.get("/api/v1/assignment/cache/stats").json["answer_key_cache"] == {
+        "hits": 1, "misses": 1, "stale": 0, "invalidated": 0, "evicted": 0,
+        "keys": 1, "questions": 2, "bytes": 18, "hit_rate": 0.5
+    }
+
+    # A deleted question no longer counts, an added one does
+    assert instructor.delete(f"/api/v1/question/delete/{question_ids[0]}").status_code == 200
+    assert students[2].post(f"/api/v1/assignment/submit/{assignment_id}", json=answers).json["score"]["total"] == 1
+    instructor.post(f"/api/v1/question/create/{assignment_id}", data={
+        "question_description": "Question 2?", "option1": "A", "option2": "B", "option3": "C", "option4": "D",
+        "correct_option": "4"
+    })
+    assert students[3].post(f"/api/v1/assignment/submit/{assignment_id}", json=answers).json["score"] == {
+        "correct": 1, "total": 2, "percentage": 50.0
+    }
+    stats = instructor.get("/api/v1/assignment/cache/stats").json["answer_key_cache"]
+    assert (stats["invalidated"], stats["misses"], stats["hits"]) == (2, 3, 1)
+
+    # An assignment with submissions keeps them and cannot be deleted
+    response = instructor.delete(f"/api/v1/assignment/delete/{assignment_id}")
+    assert response.status_code == 400
+    assert response.json["error"] == "Assignment has submissions and cannot be deleted"
+    assert instructor.get(f"/api/v1/assignment/{assignment_id}/scores").json["total_submissions"] == 4
+
+    empty_assignment_id, _ = create_quiz(instructor, [1], name="Unanswered Quiz")
+    assert instructor.delete(f"/api/v1/assignment/delete/{empty_assignment_id}").status_code == 200
+    assert students[0].post(f"/api/v1/assignment/submit/{empty_assignment_id}", json=answers).status_code == 404
+    assert students[0].get("/api/v1/assignment/cache/stats").status_code == 403
+
+def test_answer_key_cache_is_bounded():
+    """Test that the least recently used keys are evicted and that other versions miss"""
+    from services.grading import AnswerKey, AnswerKeyCache
+    cache = AnswerKeyCache(max_keys=2)
+    key = AnswerKey.from_rows([(1, 3), (2, "4")])
+    for assignment_id in (1, 2):
+        cache.put(assignment_id, (1, None), key)
+    assert cache.get(1, (1, None)) is key
+    cache.put(3, (1, None), key)
+    assert cache.get(2, (1, None)) is None
+    assert cache.get(1, (2, None)) is None
+    assert cache.get(3, (1, None)) is key
+    stats = cache.get_stats()
+    assert (stats["evicted"], stats["stale"], stats["keys"], stats["hit_rate"]) == (1, 1, 1, 0.5)
+    assert list(key.correct_options) == [3, 4]
@@ -0,0 +1,87 @@
+import sys
+import threading
+import time
+import types
+import pytest
+
+class FakeWhisperModel:
+    def __init__(self, size):
+        self.size = size
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.release.set()
+
+    def transcribe(self, path, **options):
+        self.started.set()
+        assert self.release.wait(5)
+        return {"text": f"transcript of {path}", "segments": []}
+
+@pytest.fixture
+def fake_whisper(monkeypatch):
+    """Stub whisper.load_model (and torch's device check), recording the models it loads"""
+    loaded = []
+
+    def load_model(size, device=None):
+        loaded.append(FakeWhisperModel(size))
+        return loaded[-1]
+
+    monkeypatch.setitem(sys.modules, "whisper", types.SimpleNamespace(load_model=load_model))
+    monkeypatch.setitem(sys.modules, "torch", types.SimpleNamespace(cuda=types.SimpleNamespace(is_available=lambda: False)))
+    return loaded
+
+def test_model_is_loaded_lazily_and_reused(fake_whisper):
+    """Test that the model is loaded on the first transcription only, and reloaded for another size"""
+    from services.transcription import TranscriptionModelRegistry
+    registry = TranscriptionModelRegistry()
+    assert fake_whisper == [] and registry.get_stats()["loaded"] is False
+
+    assert registry.transcribe("a.mp4", model_size="base", idle_timeout=0)["text"] == "transcript of a.mp4"
+    registry.transcribe("b.mp4", model_size="base", idle_timeout=0)
+    assert len(fake_whisper) == 1
+    stats = registry.get_stats()
+    assert (stats["loads"], stats["transcriptions"], stats["model_size"]) == (1, 2, "base")
+
+    registry.transcribe("c.mp4", model_size="small", idle_timeout=0)
+    assert [model.size for model in fake_whisper] == ["base", "small"]
+    stats = registry.get_stats()
+    assert (stats["loads"], stats["unloads"], stats["loaded"]) == (2, 1, True)
+
+def test_model_is_unloaded_when_idle(fake_whisper):
+    """Test that the model is dropped after the idle timeout and loaded again when needed"""
+    from services.transcription import TranscriptionModelRegistry
+    registry = TranscriptionModelRegistry()
+    registry.transcribe("a.mp4", idle_timeout=0.05)
+    deadline = time.monotonic() + 5
+    while registry.get_stats()["loaded"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert registry.get_stats()["unloads"] == 1
+
+    registry.transcribe("b.mp4", idle_timeout=0)
+    assert registry.get_stats()["loads"] == 2
+
+def test_stats_do_not_wait_for_a_running_transcription(fake_whisper):
+    """Test that stats can be read while a transcription is in progress, and that an idle unload skips a busy model"""
+    from services.transcription import TranscriptionModelRegistry
+    registry = TranscriptionModelRegistry()
+    registry.transcribe("warmup.mp4", idle_timeout=0)
+    model = fake_whisper[0]
+    model.started.clear()
+    model.release.clear()
+
+    worker = threading.Thread(target=registry.transcribe, args=("long.mp4",), kwargs={"idle_timeout": 0})
+    worker.start()
+    try:
+        assert model.started.wait(5)
+        stats = {}
+        reader = threading.Thread(target=lambda: stats.update(registry.get_stats()))
+        reader.start()
+        reader.join(1)
+        assert not reader.is_alive()
+        assert stats["transcriptions"] == 1
+
+        registry._unload_if_idle(0)
+        assert registry.get_stats()["loaded"] is True
+    finally:
+        model.release.set()
+        worker.join(5)
+    assert registry.get_stats()["transcriptions"] == 2
@@ -1,5 +1,6 @@
 import requests
 from tests import ENDPOINTS
+from tests.conftest import signup, walk_pages, assert_rejects_bad_pages
 
 def test_get_user_profile(student_session):
     """Test retrieving the user's profile"""
@@ -69,3 +70,14 @@ def test_get_user_profile_unauthenticated():
     """Test accessing user profile without authentication"""
     response = requests.get(ENDPOINTS["user_profile"])
     assert response.status_code == 401  # Unauthorized
+
+def test_student_list_is_paginated(app, app_instructor_client):
+    """Test that walking the student list page by page returns every student once and no instructors"""
+    emails = [f"paged{i}@mail.com" for i in range(5)]
+    for email in emails:
+        signup(app, email, False)
+    signup(app, "other-instructor@mail.com", True)
+
+    students = walk_pages(app_instructor_client, "/api/v1/user/students", "students")
+    assert [student["email"] for student in students] == emails
+    assert_rejects_bad_pages(app_instructor_client, "/api/v1/user/students")
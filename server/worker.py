@@ -0,0 +1,27 @@
+import argparse
+from multiprocessing import Process
+from factory import create_app
+from services.jobs import run_worker
+
+def start_worker(kinds):
+    app = create_app({'JOB_WORKER_THREADS': 0})
+    run_worker(app, kinds=kinds)
+
+def main():
+    parser = argparse.ArgumentParser(description="Run background job workers")
+    parser.add_argument("--processes", type=int, default=1, help="Number of worker processes")
+    parser.add_argument("--kind", action="append", dest="kinds", help="Only run jobs of this kind (repeatable)")
+    args = parser.parse_args()
+
+    if args.processes == 1:
+        start_worker(args.kinds)
+        return
+
+    workers = [Process(target=start_worker, args=(args.kinds,)) for _ in range(args.processes)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+if __name__ == "__main__":
+    main()
@@ -12,9 +12,10 @@ export async function createCourseAPI(formData) {
     }
 }
 
-export async function getCourseAPI() {
+// One page of courses, the first page without a cursor; the response has the next page's next_cursor
+export async function getCourseAPI(cursor = null) {
     try {
-        const response = await apiConnector('GET', COURSE);
+        const response = await apiConnector('GET', COURSE, null, null, { cursor });
         return response;
     } catch (error) {
         return error.response;
@@ -12,18 +12,20 @@ export async function createEnrollmentRequestAPI(courseId, message = "") {
     }
 }
 
-export async function getStudentEnrollmentRequestsAPI() {
+// One page of requests, the first page without a cursor; the response has the next page's next_cursor
+export async function getStudentEnrollmentRequestsAPI(cursor = null) {
     try {
-        const response = await apiConnector('GET', STUDENT_REQUESTS);
+        const response = await apiConnector('GET', STUDENT_REQUESTS, null, null, { cursor });
         return response;
     } catch (error) {
         return error.response;
     }
 }
 
-export async function getInstructorEnrollmentRequestsAPI() {
+// One page of requests, optionally only those with `status`; the response has the next page's next_cursor
+export async function getInstructorEnrollmentRequestsAPI(cursor = null, status = null) {
     try {
-        const response = await apiConnector('GET', INSTRUCTOR_REQUESTS);
+        const response = await apiConnector('GET', INSTRUCTOR_REQUESTS, null, null, { cursor, status });
         return response;
     } catch (error) {
         return error.response;
@@ -14,10 +14,10 @@ export async function createMaterialDoubtAPI(materialId, doubtText) {
     }
 }
 
-// Get all doubts for a specific material
-export async function getMaterialDoubtsAPI(materialId) {
+// Get one page of the doubts for a specific material, the first page without a cursor
+export async function getMaterialDoubtsAPI(materialId, cursor = null) {
     try {
-        const response = await apiConnector('GET', MATERIAL_DOUBTS(materialId));
+        const response = await apiConnector('GET', MATERIAL_DOUBTS(materialId), null, null, { cursor });
         return response;
     } catch (error) {
         console.error('Get material doubts error:', error);
@@ -36,9 +36,10 @@ export async function deleteReviewAPI(reviewId) {
   }
 }
 
-export async function fetchInstructorReviewsAPI() {
+// One page of reviews, the first page without a cursor; the response has the next page's next_cursor
+export async function fetchInstructorReviewsAPI(cursor = null) {
   try {
-    const response = await apiConnector("GET", reviewEndpoints.INSTRUCTOR_REVIEWS);
+    const response = await apiConnector("GET", reviewEndpoints.INSTRUCTOR_REVIEWS, null, null, { cursor });
     return response;
   } catch (error) {
     throw error;
@@ -21,9 +21,10 @@ export async function updateUserProfile(formData) {
     }
 }
 
-export async function getUserStudents() {
+// One page of students, the first page without a cursor; the response has the next page's next_cursor
+export async function getUserStudents(cursor = null) {
     try {
-        const response = await apiConnector('GET', USER_STUDENT_LIST);
+        const response = await apiConnector('GET', USER_STUDENT_LIST, null, null, { cursor });
         return response;
     } catch (error) {
         return error.response;
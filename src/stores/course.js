@@ -4,6 +4,7 @@ export default {
     namespaced: true,
     state: {
         courses: [],
+        coursesNextCursor: null,
         enrolledCourses: [],
         instructorCourses: [],
         creatingCourse: null,
@@ -14,6 +15,12 @@ export default {
         SET_COURSES(state, courses) {
             state.courses = courses;
         },
+        APPEND_COURSES(state, courses) {
+            state.courses = [...state.courses, ...courses];
+        },
+        SET_COURSES_NEXT_CURSOR(state, cursor) {
+            state.coursesNextCursor = cursor;
+        },
         SET_ENROLLED_COURSES(state, courses) {
             state.enrolledCourses = courses;
         },
@@ -40,6 +47,19 @@ export default {
                 const response = await getCourseAPI();
                 if (response.status === 200) {
                     commit('SET_COURSES', response.data.courses);
+                    commit('SET_COURSES_NEXT_CURSOR', response.data.next_cursor || null);
+                }
+                return response;
+            } catch (error) {
+                return error.response;
+            }
+        },
+        async loadMoreCourses({ commit, state }) {
+            try {
+                const response = await getCourseAPI(state.coursesNextCursor);
+                if (response.status === 200) {
+                    commit('APPEND_COURSES', response.data.courses);
+                    commit('SET_COURSES_NEXT_CURSOR', response.data.next_cursor || null);
                 }
                 return response;
             } catch (error) {
@@ -77,6 +97,7 @@ export default {
     },
     getters: {
         getCourses: (state) => state.courses,
+        getCoursesNextCursor: (state) => state.coursesNextCursor,
         getEnrolledCourses: (state) => state.enrolledCourses,
         getInstructorCourses: (state) => state.instructorCourses,
         getCreatingCourse: (state) => state.creatingCourse,